@@ -0,0 +1,149 @@
+import time
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+
+import cachepolicy
+import pagecache
+from ratelimiter import HostRateScheduler
+from runstats import stats
+
+# Shared async fetching for the aiohttp-based scrapers (top10VORPold.py, totalplayoffgames.py).
+
+VERBOSE = False
+
+# Requests are throttled per host by a token-bucket scheduler (see ratelimiter.py), so
+# Wikipedia roster fetches and Basketball Reference player fetches no longer queue behind
+# each other. Adjust HOST_RATE_LIMITS there to change the allowed rate of a domain.
+rate_scheduler = HostRateScheduler()
+
+# When True, pages are only ever read from the local cache (fresh or not) and the network is never
+# touched. Useful for iterating on the parser or the CSV shape against a warm cache.
+CACHE_ONLY = False
+
+# Every scraper shares one persistent page cache (pagecache.py), so a page fetched by one script is
+# a cache hit for the others. How long a cached page is used before it's revalidated depends on the
+# season it's for (cachepolicy.py): pages of finished seasons never expire.
+
+# A 429 (Too Many Requests) or 503 is retried up to MAX_RETRIES times, after the server's
+# Retry-After (or DEFAULT_RETRY_AFTER seconds if it sends none). The whole host backs off meanwhile.
+RETRY_STATUSES = {429, 503}
+MAX_RETRIES = 3
+DEFAULT_RETRY_AFTER = 60
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Referer': 'https://www.google.com/'
+}
+
+
+class FetchError(Exception):
+    """A page that couldn't be loaded this time (network error, server error, still rate limited)."""
+
+
+class CachedSession:
+    """An aiohttp ClientSession (`http`) paired with the page cache its responses are stored in."""
+
+    def __init__(self, http, cache):
+        self.http = http
+        self.cache = cache
+
+    def get(self, url, **kwargs):
+        return self.http.get(url, **kwargs)
+
+    async def close(self):
+        await self.http.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def cached_session(headers=None, max_connections=10, cache=None):
+    """
+    Create a CachedSession on the shared page cache. Connections are pooled and kept alive between
+    requests, with at most `max_connections` open at once.
+    """
+    return CachedSession(
+        aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=max_connections, keepalive_timeout=60),
+                              headers=headers or DEFAULT_HEADERS),
+        cache or pagecache.cache)
+
+
+async def safe_get(url, session, season=None, raise_errors=False):
+    """
+    A helper that makes a GET request once the host of `url` has a free rate-limit slot.
+    Fresh cache hits are returned right away and don't use up any of the host's rate budget; a
+    stale cached page is revalidated with a conditional request, so an unchanged page costs a 304.
+    `season` is the season the caller needs from the page, if the URL doesn't say (see cachepolicy.py).
+    Returns None if the page couldn't be loaded. With `raise_errors`, None only means the server
+    answered that there is no such page (a 4xx); anything that might go through on another try (a
+    network error, a 5xx, a 429 after every retry, a page missing in offline mode) raises FetchError.
+    """
+    cache = getattr(session, "cache", None)
+    start = time.perf_counter()
+    page = cache.get(url) if cache is not None else None
+    fresh = page is not None and (CACHE_ONLY or cachepolicy.is_fresh(url, page.checked_at, season))
+    stats.cache_lookup(url, fresh, time.perf_counter() - start)
+    if fresh:
+        return page.text
+    if CACHE_ONLY:
+        if VERBOSE:
+            print(f"📦 Not in cache (offline mode): {url}")
+        if raise_errors:
+            raise FetchError(f"{url} is not in the cache (offline mode)")
+        return None
+    for attempt in range(MAX_RETRIES + 1):
+        start = time.perf_counter()
+        await rate_scheduler.acquire(url)
+        stats.rate_limit_wait(url, time.perf_counter() - start)
+        start = time.perf_counter()
+        body = None
+        try:
+            async with session.get(url, headers=pagecache.conditional_headers(page)) as response:
+                body = await response.read()
+                stats.request(url, response.status, len(body), time.perf_counter() - start)
+                if response.status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                    delay = retry_after(response.headers.get("Retry-After"))
+                    print(f"⏳ HTTP {response.status} for {url}, retrying in {delay:.0f}s")
+                    rate_scheduler.backoff(url, delay)
+                    continue
+                if response.status == 304 and page is not None:
+                    cache.touch(url)
+                    return page.text
+                if response.status >= 400:
+                    if VERBOSE:
+                        print(f"⚠️ HTTP {response.status} for {url}")
+                    if raise_errors and (response.status >= 500 or response.status in RETRY_STATUSES):
+                        raise FetchError(f"HTTP {response.status} for {url}")
+                    return None
+                if cache is None:
+                    return await response.text()
+                return cache.put(url, body, response.headers).text
+        except FetchError:
+            raise
+        except Exception as e:
+            if body is None:
+                stats.request(url, None, 0, time.perf_counter() - start)
+            print(f"⚠️ Error fetching {url}: {e}")
+            if raise_errors:
+                raise FetchError(f"Error fetching {url}: {e}") from e
+            return None
+    return None
+
+
+def retry_after(value, default=DEFAULT_RETRY_AFTER):
+    """Seconds to wait from a Retry-After header, which is either a number of seconds or an HTTP date."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
@@ -1,21 +1,41 @@
 import requests
-from bs4 import BeautifulSoup
+import argparse
 import csv
 import re
-import time
+
+import asyncfetch
+import sites
+from htmlparse import find_element_by_id, find_tables, make_soup, page_title
+from journal import Journal
+from pagecache import cached_get
+from runstats import stats, timed
+from seasons import parse_season_range
+
+def fetch(url):
+    """
+    The HTML of `url`, through the shared page cache (and recorded in the run stats). Requests take
+    their slot from the same per-host scheduler as the async scrapers, so build_dataset.py running
+    this next to top10VORPold.py stays within Basketball Reference's limit.
+    """
+    return cached_get(url, requests.get, scheduler=asyncfetch.rate_scheduler)
 
 def extract_team_stats(url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
+    return parse_team_stats(fetch(url))
 
-    title = soup.title.string
+@timed("parse")
+def parse_team_stats(html):
+    """Return the team's row of nba_team_stats_{year}.csv from a Basketball Reference team page."""
+    title = page_title(html) or ""
     match = re.match(r"(\d{4}-\d{2}) (.*?) Roster and Stats", title)
     if not match:
         raise ValueError("Page format is unexpected")
     season_str, team_name = match.groups()
     season = int(season_str[:4]) + 1
 
-    record_text = soup.get_text()
+    # Record, seed, SRS and ratings all live in the summary box at the top of the page,
+    # so only that element is parsed (falling back to the whole page if it moves).
+    info = find_element_by_id(html, 'div', 'info')
+    record_text = info.get_text() if info else make_soup(html).get_text()
 
     # Extract win/loss record
     record_match = re.search(r"Record:\s*(\d+)-(\d+)", record_text)
@@ -59,28 +79,204 @@ def write_to_csv(data_list, filename):
         for data in data_list:
             writer.writerow(data)
 
-def scrape_season(year):
-    teams = [
-        # Western Conference:
-        "HOU", "DAL", "SAS", "MEM", "NOP", # Southwest Division
-        "LAL", "LAC", "SAC", "GSW", "PHO", # Pacific Division
-        "DEN", "POR", "OKC", "UTA", "MIN", # Northwest Division
-        # Eastern Conference:
-        "ATL", "ORL", "MIA", "WAS", "CHO", # Southeast Division
-        "BOS", "PHI", "BRK", "NYK", "TOR", # Atlantic Division
-        "IND", "DET", "MIL", "CHI", "CLE"  # Central Division
-    ]
+TEAMS = [
+    # Western Conference:
+    "HOU", "DAL", "SAS", "MEM", "NOP", # Southwest Division
+    "LAL", "LAC", "SAC", "GSW", "PHO", # Pacific Division
+    "DEN", "POR", "OKC", "UTA", "MIN", # Northwest Division
+    # Eastern Conference:
+    "ATL", "ORL", "MIA", "WAS", "CHO", # Southeast Division
+    "BOS", "PHI", "BRK", "NYK", "TOR", # Atlantic Division
+    "IND", "DET", "MIL", "CHI", "CLE"  # Central Division
+]
+
+LEAGUE_TABLE_IDS = ["confs_standings_E", "confs_standings_W", "divs_standings_E", "divs_standings_W", "advanced-team"]
+TEAM_HREF_RE = re.compile(r"/teams/([A-Z]{3})/")
+
+def team_rows(table):
+    """Yield (abbreviation, team name, row) for every team row of a league page table."""
+    if table is None:
+        return
+    body = table.find('tbody') or table
+    for row in body.find_all('tr'):
+        link = row.find('a', href=TEAM_HREF_RE)
+        if link:
+            yield TEAM_HREF_RE.search(link['href']).group(1), link.get_text(strip=True), row
+
+def cell_number(row, *data_stats):
+    for data_stat in data_stats:
+        cell = row.find(['td', 'th'], {'data-stat': data_stat})
+        if cell:
+            try:
+                return float(cell.get_text(strip=True))
+            except ValueError:
+                return None
+    return None
+
+PRINTED_SEED_RE = re.compile(r"\((\d{1,2})\)")
+
+def printed_seed(row):
+    """The playoff seed Basketball Reference prints after a team's name in the standings, e.g. "(4)", or None."""
+    cell = row.find(['th', 'td'], {'data-stat': 'team_name'}) or row
+    match = PRINTED_SEED_RE.search(cell.get_text())
+    return int(match.group(1)) if match else None
+
+def conference_seeds(tables):
+    """
+    Return {abbreviation: conference rank}. Uses the conference standings when the page has them.
+    Older seasons (before 2016) only have division standings, where division winners were guaranteed
+    a top-4 seed, so the eight playoff teams take the seed printed next to their name instead. The
+    rest are ranked 9th and down by win percentage; teams tied on it are left out (None), since the
+    page doesn't say how the tie was broken.
+    """
+    seeds = {}
+    for conf in ("E", "W"):
+        conf_table = tables.get(f"confs_standings_{conf}")
+        if conf_table is not None:
+            for rank, (abbr, _, _) in enumerate(team_rows(conf_table), start=1):
+                seeds[abbr] = rank
+            continue
+        playoff_teams = 0
+        unseeded = []
+        for abbr, _, row in team_rows(tables.get(f"divs_standings_{conf}")):
+            seed = printed_seed(row)
+            if seed is not None:
+                seeds[abbr] = seed
+                playoff_teams += 1
+                continue
+            wins, losses = cell_number(row, 'wins'), cell_number(row, 'losses')
+            if wins is not None and losses is not None and wins + losses:
+                unseeded.append((wins / (wins + losses), abbr))
+        if not playoff_teams:
+            # No printed seeds (e.g. the standings markup changed): win percentage alone would misplace
+            # division winners, so the conference is left for the team pages / manual entry.
+            continue
+        unseeded.sort(reverse=True)
+        win_pcts = [win_pct for win_pct, _ in unseeded]
+        for rank, (win_pct, abbr) in enumerate(unseeded, start=playoff_teams + 1):
+            if win_pcts.count(win_pct) == 1:
+                seeds[abbr] = rank
+    return seeds
+
+@timed("parse")
+def extract_league_stats(year, html):
+    """
+    Build every team's row of nba_team_stats_{year}.csv from the season's league page
+    (https://www.basketball-reference.com/leagues/NBA_{year}.html): W/L, ratings and SRS come from
+    the advanced team table, seeds from the conference standings. Rows follow TEAMS order, with any
+    team not in TEAMS (e.g. historical franchises like CHA or SEA) appended after.
+    """
+    tables = find_tables(html, LEAGUE_TABLE_IDS)
+    seeds = conference_seeds(tables)
+    rows = {}
+    for abbr, name, row in team_rows(tables["advanced-team"]):
+        wins, losses = cell_number(row, 'wins'), cell_number(row, 'losses')
+        off_rtg, def_rtg = cell_number(row, 'off_rtg'), cell_number(row, 'def_rtg')
+        net_rtg = cell_number(row, 'net_rtg')
+        if net_rtg is None and off_rtg is not None and def_rtg is not None:
+            net_rtg = round(off_rtg - def_rtg, 1)
+        rows[abbr] = {
+            'team': name.rstrip('*').strip(),
+            'season': year,
+            'seed': seeds.get(abbr),
+            'win_pct': round(wins / (wins + losses), 3) if wins is not None and losses is not None and wins + losses else None,
+            'off_rtg': off_rtg,
+            'def_rtg': def_rtg,
+            'net_rtg': net_rtg,
+            'srs': cell_number(row, 'srs')
+        }
+    ordered = [abbr for abbr in TEAMS if abbr in rows] + [abbr for abbr in rows if abbr not in TEAMS]
+    return {abbr: rows[abbr] for abbr in ordered}
+
+JOURNAL_PATH = "nba_team_stats.journal.jsonl"
+REPORT_PATH = "basketballreferencescrapertocsv.report.json"
+
+def scrape_season_bulk(year, journal=None):
+    """
+    Scrape a whole season from its league page: one request instead of 30. Teams whose row is
+    incomplete on the league page are filled in from their own team page. If the league page
+    can't be used at all, falls back to scrape_season().
+    """
+    done = journal.get(year, "LEAGUE") if journal else None
+    if done:
+        print(f"Skipping {year} (already done)")
+        write_to_csv(done["stats"], f"nba_team_stats_{year}.csv")
+        return done["stats"]
+    url = sites.url("basketball-reference", f"/leagues/NBA_{year}.html")
+    print(f"Scraping league page for {year}...")
+    try:
+        rows = extract_league_stats(year, fetch(url))
+    except Exception as e:
+        print(f"Failed to scrape league page for {year}: {e}")
+        rows = {}
+    if not rows:
+        print(f"Falling back to team pages for {year}")
+        return scrape_season(year, journal)
+
+    for abbr, row in rows.items():
+        if any(value is None for value in row.values()):
+            print(f"Incomplete league row for {abbr} {year}, scraping its team page...")
+            team_url = sites.url("basketball-reference", f"/teams/{abbr}/{year}.html")
+            try:
+                rows[abbr] = extract_team_stats(team_url)
+            except Exception as e:
+                print(f"Failed to scrape {abbr} {year}: {e}")
+    all_data = list(rows.values())
+    if journal:
+        journal.append({"season": year, "team": "LEAGUE", "stats": all_data})
+    write_to_csv(all_data, f"nba_team_stats_{year}.csv")
+    return all_data
+
+def scrape_seasons(first_year, last_year, bulk=True, journal=None):
+    """Scrape every season from first_year to last_year (inclusive), one CSV per season."""
+    for year in range(first_year, last_year + 1):
+        if bulk:
+            scrape_season_bulk(year, journal)
+        else:
+            scrape_season(year, journal)
+
+
+def scrape_season(year, journal=None, teams=TEAMS):
     all_data = []
+    stats.expect_teams(len(teams))
     for team in teams:
-        url = f"https://www.basketball-reference.com/teams/{team}/{year}.html"
+        # Teams finished by an interrupted run are read back from the journal instead of re-scraped.
+        done = journal.get(year, team) if journal else None
+        if done:
+            print(f"Skipping {team} {year} (already done)")
+            all_data.append(done["stats"])
+            stats.finish_team(f"team_stats {year} {team}")
+            continue
+        url = sites.url("basketball-reference", f"/teams/{team}/{year}.html")
+        stats.start_team(f"team_stats {year} {team}")
         try:
             print(f"Scraping {team} {year}...")
             data = extract_team_stats(url)
             all_data.append(data)
-            time.sleep(2) # Be kind to the server
+            if journal:
+                journal.append({"season": year, "team": team, "stats": data})
         except Exception as e:
             print(f"Failed to scrape {team} {year}: {e}")
+        stats.finish_team(f"team_stats {year} {team}")
     write_to_csv(all_data, f"nba_team_stats_{year}.csv")
+    return all_data
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape every team's advanced stats for a season.")
+    parser.add_argument("--seasons", type=parse_season_range, default="2015",
+                        help="season end year or range of them, e.g. 2015 or 2014-2025 (default: 2015)")
+    parser.add_argument("--per-team", action="store_true",
+                        help="scrape the 30 team pages instead of the season's single league page")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"skip teams already recorded in {JOURNAL_PATH} by an interrupted run")
+    parser.add_argument("--report", default=REPORT_PATH,
+                        help=f"where to write the JSON run report (default: {REPORT_PATH})")
+    parser.add_argument("--progress", action="store_true", help="show a live progress/ETA line on stderr")
+    args = parser.parse_args()
 
-# Season to scrape:
-scrape_season(2015) # Change this to the desired season as needed
+    stats.reset("basketballreferencescrapertocsv.py", live=args.progress)
+    journal = Journal(JOURNAL_PATH, ("season", "team"), resume=args.resume)
+    # Seasons to scrape (change the --seasons default above as needed):
+    scrape_seasons(args.seasons[0], args.seasons[-1], bulk=not args.per_team, journal=journal)
+    journal.close()
+    stats.write(args.report)
@@ -0,0 +1,91 @@
+"""
+Cost and accuracy drift of incremental model updates (incremental.py) against a full refit.
+
+Replays a season arriving in blocks: the latest finished season is held out for scoring, the model
+is fitted on the seasons before the one preceding it, and that season's rows are then added in
+--blocks growing blocks. After each block the model is both updated incrementally and refitted
+from scratch, and the two are scored on the held-out season, which neither has trained on.
+
+    python benchmarks/bench_incremental.py
+    python benchmarks/bench_incremental.py --blocks 10 --new-trees 25 --repeat 3
+
+"refit rmse" and "update rmse" are each model's error on the held-out season, and "drift" is the
+RMSE between their predictions for it.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from sklearn.metrics import mean_squared_error  # noqa: E402
+
+from incremental import season_hashes, season_stats, update_model  # noqa: E402
+from train_model import BASELINE_PARAMS, FEATURE_COLS, TARGET, load_training_data, make_model  # noqa: E402
+
+
+def rmse(a, b):
+    return mean_squared_error(a, b) ** 0.5
+
+
+def fit_artifact(df, params):
+    model = make_model(params, n_jobs=-1).fit(df[FEATURE_COLS], df[TARGET])
+    return {"model": model, "features": FEATURE_COLS, "params": params,
+            "season_stats": season_stats(df), "season_hashes": season_hashes(df)}
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=6, help="blocks the held-back season arrives in")
+    parser.add_argument("--new-trees", type=int, default=25, help="trees grown by each incremental update")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per step (the fastest is shown)")
+    args = parser.parse_args()
+
+    df = load_training_data()
+    season, held_out = sorted(df['season'].unique())[-2:]
+    test = df[df['season'] == held_out]
+    history, current = df[df['season'] < season], df[df['season'] == season]
+    blocks = np.array_split(np.arange(len(current)), args.blocks)
+    params = BASELINE_PARAMS
+
+    artifact = fit_artifact(history, params)
+    print(f"Season {season} arriving: {len(current)} rows in {args.blocks} blocks, "
+          f"{args.new_trees} new trees per update, {params}; scored on {held_out}")
+    print(f"{'block':>6}{'rows':>6}{'refit ms':>10}{'update ms':>11}{'speedup':>9}"
+          f"{'refit rmse':>12}{'update rmse':>13}{'drift':>8}{'trees':>7}")
+
+    refit_total = update_total = 0.0
+    for i in range(1, args.blocks + 1):
+        rows = current.iloc[np.concatenate(blocks[:i])]
+        data = pd.concat([history, rows])
+        refit, refit_ms = timed(lambda: make_model(params, n_jobs=-1).fit(data[FEATURE_COLS], data[TARGET]), args.repeat)
+        updated, update_ms = timed(lambda: update_model(artifact, data, new_trees=args.new_trees), args.repeat)
+        artifact = updated
+        refit_total += refit_ms
+        update_total += update_ms
+
+        refit_pred = refit.predict(test[FEATURE_COLS])
+        update_pred = updated["model"].predict(test[FEATURE_COLS])
+        truth = test[TARGET].to_numpy()
+        print(f"{i:>6}{len(rows):>6}{refit_ms:>10.0f}{update_ms:>11.0f}{refit_ms / update_ms:>8.1f}x"
+              f"{rmse(truth, refit_pred):>12.3f}{rmse(truth, update_pred):>13.3f}"
+              f"{rmse(refit_pred, update_pred):>8.3f}{len(updated['model'][-1].estimators_):>7}")
+    print(f"\nTotal: refit {refit_total:.0f} ms, incremental {update_total:.0f} ms "
+          f"({refit_total / update_total:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Offline benchmark of every scraper's parse functions over a page corpus (benchmarks/fixtures/).
+
+The default corpus is synthetic: pages generated by make_fixtures.py with the structure and size
+of the real ones but made-up stats, so it measures parse speed, not correctness against real data.
+Pass --fixtures to run over pages recorded with `python replayserver.py record`.
+Each case in manifest.json names a parser, a page and the parser's arguments. A directory without
+a manifest.json (like a freshly recorded one) gets its cases from the page paths instead: roster
+pages from the season and team in their name, player pages for the last season and team they list,
+and Wikipedia player pages for every playoff game of the career. For
+every parser the suite reports throughput (pages/s), latency percentiles, peak memory (tracemalloc)
+and a digest of its output, so a parser change can be shown to be faster *and* to return exactly
+the same results. Nothing touches the network.
+
+    python benchmarks/bench_parsers.py --save before.json         # on the old commit
+    python benchmarks/bench_parsers.py --compare before.json      # on the new one
+
+--compare exits with status 1 if any parser's output digest changed.
+Parsers: roster_names, verify_player, player_vorp (top10VORPold.py), roster_links, playoff_games
+(totalplayoffgames.py), team_stats (basketballreferencescrapertocsv.py), 2k_ovrs (topten2kratingscraper.py).
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import htmlparse  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def roster_names(html, season, team):
+    return importlib.import_module("top10VORPold").parse_team_player_names(html, season, team)
+
+
+def verify_player(html, target_season, target_team_abbr):
+    return importlib.import_module("top10VORPold").verify_player_team_season(html, target_season, target_team_abbr)
+
+
+def player_vorp(html, season_str):
+    # get_player_vorp() without the fetch.
+    return importlib.import_module("top10VORPold").PlayerPage(html).vorp(season_str)
+
+
+def roster_links(html, season, team):
+    return importlib.import_module("totalplayoffgames").parse_team_player_links(html, season, team)
+
+
+def playoff_games(html, cutoff_year):
+    # get_player_playoff_games() without the fetch.
+    module = importlib.import_module("totalplayoffgames")
+    return module.PlayoffHistory(module.parse_playoff_games_by_year(html)).games_before(cutoff_year)
+
+
+def team_stats(html):
+    return importlib.import_module("basketballreferencescrapertocsv").parse_team_stats(html)
+
+
+def two_k_ovrs(html):
+    # get_top_10_ovrs() without the fetch, for every 2K year on the page.
+    return importlib.import_module("topten2kratingscraper").extract_all_ovrs(html)
+
+
+PARSERS = {
+    "roster_names": roster_names,
+    "verify_player": verify_player,
+    "player_vorp": player_vorp,
+    "roster_links": roster_links,
+    "playoff_games": playoff_games,
+    "team_stats": team_stats,
+    "2k_ovrs": two_k_ovrs,
+}
+
+
+WIKI_SEASON_RE = re.compile(r"^wikipedia/wiki/(\d{4})[-–](\d{2})_(.+)_season\.html$")
+# Past every season, so playoff_games counts the player's whole career.
+CAREER_CUTOFF = 9999
+
+
+def page_cases(page, html):
+    """The cases for one page of a pages directory without a manifest.json, from its path (and for player pages, its seasons)."""
+    season = WIKI_SEASON_RE.match(page)
+    if season:
+        args = {"season": f"{season[1]}-{season[2]}", "team": season[3]}
+        return [{"parser": "roster_names", "args": args}, {"parser": "roster_links", "args": args}]
+    if page.startswith("wikipedia/wiki/"):
+        return [{"parser": "playoff_games", "args": {"cutoff_year": CAREER_CUTOFF}}]
+    if re.match(r"^basketball-reference/teams/[A-Z]{3}/\d{4}\.html$", page):
+        return [{"parser": "team_stats", "args": {}}]
+    if re.match(r"^basketball-reference/players/[a-z]/[a-z0-9]+\.html$", page):
+        # Rows of a single team (not a 2TM/TOT total) in a season like 2022-23.
+        team_seasons = [(season, team) for season, team in importlib.import_module("top10VORPold").PlayerPage(html).team_seasons
+                        if re.fullmatch(r"\d{4}-\d{2}", season) and re.fullmatch(r"[A-Z]{3}", team) and team != "TOT"]
+        if not team_seasons:
+            return []
+        season_str, team = team_seasons[-1]
+        return [{"parser": "verify_player", "args": {"target_season": int(season_str[:4]) + 1, "target_team_abbr": team}},
+                {"parser": "player_vorp", "args": {"season_str": season_str}}]
+    if page.startswith("2kratings/teams/"):
+        return [{"parser": "2k_ovrs", "args": {}}]
+    return []
+
+
+def infer_cases(fixtures_dir):
+    """Cases for every page under `fixtures_dir` that one of the parsers reads, in path order."""
+    cases = []
+    for root, _, files in sorted(os.walk(fixtures_dir)):
+        for name in sorted(files):
+            page = os.path.relpath(os.path.join(root, name), fixtures_dir).replace(os.sep, "/")
+            if not page.endswith(".html"):
+                continue
+            with open(os.path.join(fixtures_dir, page), encoding="utf-8", errors="replace") as f:
+                html = f.read()
+            cases += [dict(case, page=page) for case in page_cases(page, html)]
+    return cases
+
+
+def load_cases(fixtures_dir):
+    """The cases in `fixtures_dir`'s manifest.json, or inferred from its page paths if it has none."""
+    manifest = os.path.join(fixtures_dir, "manifest.json")
+    if not os.path.exists(manifest):
+        cases = infer_cases(fixtures_dir)
+        if not cases:
+            sys.exit(f"❌ No manifest.json and no pages any parser reads in {fixtures_dir}")
+        print(f"No manifest.json in {fixtures_dir}, {len(cases)} cases inferred from the page paths")
+        return cases_with_html(fixtures_dir, cases)
+    with open(manifest, encoding="utf-8") as f:
+        return cases_with_html(fixtures_dir, json.load(f))
+
+
+def cases_with_html(fixtures_dir, cases):
+    pages = {}
+    for case in cases:
+        if case["page"] not in pages:
+            with open(os.path.join(fixtures_dir, case["page"]), encoding="utf-8", errors="replace") as f:
+                pages[case["page"]] = f.read()
+        case["html"] = pages[case["page"]]
+    return cases
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def digest(outputs):
+    encoded = json.dumps(outputs, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def bench_parser(func, cases, repeat):
+    """Time every case `repeat` times, then run each once more under tracemalloc for its peak memory."""
+    outputs = [func(case["html"], **case["args"]) for case in cases]  # Warm-up (imports, regex compiles).
+    latencies = []
+    for _ in range(repeat):
+        for case in cases:
+            start = time.perf_counter()
+            func(case["html"], **case["args"])
+            latencies.append(time.perf_counter() - start)
+
+    peak = 0
+    tracemalloc.start()
+    for case in cases:
+        tracemalloc.reset_peak()
+        func(case["html"], **case["args"])
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "pages": len(cases),
+        "kb_per_page": sum(len(case["html"]) for case in cases) / len(cases) / 1024,
+        "pages_per_s": len(latencies) / sum(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "peak_kb": peak / 1024,
+        "digest": digest(outputs),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(cases, repeat, only=None):
+    results = {}
+    for name, func in PARSERS.items():
+        parser_cases = [case for case in cases if case["parser"] == name]
+        if not parser_cases or (only and name not in only):
+            continue
+        try:
+            results[name] = bench_parser(func, parser_cases, repeat)
+        except ImportError as e:
+            # A scraper's own dependencies (e.g. cloudscraper) aren't installed.
+            print(f"⚠️ Skipping {name}: {e}")
+    return {"commit": git_commit(), "python": platform.python_version(), "parser_backend": htmlparse.PARSER,
+            "repeat": repeat, "results": results}
+
+
+def print_results(report):
+    print(f"Commit {report['commit']}, Python {report['python']}, parser backend {report['parser_backend']}")
+    print(f"{'parser':<15}{'pages':>6}{'KB/page':>9}{'pages/s':>10}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"
+          f"{'peak KB':>10}  digest")
+    for name, r in report["results"].items():
+        print(f"{name:<15}{r['pages']:>6}{r['kb_per_page']:>9.0f}{r['pages_per_s']:>10.1f}{r['p50_ms']:>9.2f}"
+              f"{r['p90_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['peak_kb']:>10.0f}  {r['digest']}")
+
+
+def compare(report, baseline):
+    """Print the speedup over `baseline` and whether each parser's output is unchanged. Returns False on any change."""
+    print(f"\nCompared with {baseline.get('commit')} (parser backend {baseline.get('parser_backend')}):")
+    print(f"{'parser':<15}{'p50 before':>12}{'p50 after':>11}{'speedup':>9}{'peak before':>13}{'peak after':>12}  output")
+    same = True
+    for name, r in report["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:<15}{'(new)':>12}")
+            continue
+        unchanged = old["digest"] == r["digest"]
+        same = same and unchanged
+        print(f"{name:<15}{old['p50_ms']:>12.2f}{r['p50_ms']:>11.2f}{old['p50_ms'] / r['p50_ms']:>8.2f}x"
+              f"{old['peak_kb']:>13.0f}{r['peak_kb']:>12.0f}  {'same' if unchanged else 'CHANGED'}")
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="pages directory, with or without a manifest.json (default: the synthetic benchmarks/fixtures)")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs of every case (default: 20)")
+    parser.add_argument("--parser", action="append", choices=sorted(PARSERS), help="only benchmark these parsers")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare with results saved by --save")
+    args = parser.parse_args()
+
+    report = run(load_cases(args.fixtures), args.repeat, args.parser)
+    print_results(report)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results saved to {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(report, baseline):
+            print("\n❌ Some parsers' output changed")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Parse time per page, before and after the shared htmlparse layer.
+
+"before" is what the scrapers used to do: a full BeautifulSoup(html, 'html.parser') of the page and a
+search for the element. "after" is the targeted htmlparse call each scraper makes now. Both have to
+find the same thing: every page's outputs are compared, and the run fails if any kind differs.
+
+    python benchmarks/bench_parsing.py                    # synthetic.py's pages
+    python benchmarks/bench_parsing.py --pages saved/     # saved pages named <kind>-*.html
+
+Kinds: roster (Wikipedia season page), playoffs (Wikipedia player page), player (Basketball
+Reference player page), team (Basketball Reference team page), 2k (2kratings team page).
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup, Comment  # noqa: E402
+
+import htmlparse  # noqa: E402
+from benchmarks import synthetic  # noqa: E402
+from top10VORPold import PlayerPage, extract_advanced_rows, extract_team_seasons  # noqa: E402
+
+ROSTER_CAPTION = "2022–23 Los Angeles Lakers roster"
+
+
+def before_roster(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return [c.find_parent('table') for c in soup.find_all('caption') if ROSTER_CAPTION in c.text]
+
+
+def after_roster(html):
+    return htmlparse.find_captioned_tables(html, ROSTER_CAPTION)
+
+
+def before_playoffs(html):
+    heading = BeautifulSoup(html, 'html.parser').find(id="Playoffs")
+    return heading.find_next('table', class_='wikitable') if heading else None
+
+
+def after_playoffs(html):
+    return htmlparse.find_after(html, "Playoffs", "table", {"class": "wikitable"})
+
+
+def before_player(html):
+    # verify_player_team_season + get_player_vorp used to build three full soups and parse every comment.
+    found = {}
+    for table_id in ("per_game_stats", "advanced"):
+        soup = BeautifulSoup(html, 'html.parser')
+        table = soup.find('table', id=table_id)
+        if table is None:
+            for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+                table = BeautifulSoup(comment, 'html.parser').find('table', id=table_id)
+                if table is not None:
+                    break
+        found[table_id] = table
+    BeautifulSoup(html, 'html.parser').find('title')
+    return found
+
+
+def after_player(html):
+    return PlayerPage(html)
+
+
+def before_team(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return soup.title.string, soup.get_text()
+
+
+def after_team(html):
+    info = htmlparse.find_element_by_id(html, 'div', 'info')
+    return htmlparse.page_title(html), info.get_text() if info else None
+
+
+def before_2k(html):
+    nav = BeautifulSoup(html, 'html.parser').find('h5', id="nav-2k23-tab")
+    return nav.find_next('table') if nav else None
+
+
+def after_2k(html):
+    return htmlparse.find_after(html, "nav-2k23-tab", "table")
+
+
+CASES = {
+    "roster": (before_roster, after_roster),
+    "playoffs": (before_playoffs, after_playoffs),
+    "player": (before_player, after_player),
+    "team": (before_team, after_team),
+    "2k": (before_2k, after_2k),
+}
+
+
+def table_text(table):
+    return table.get_text(" ", strip=True) if table is not None else None
+
+
+TEAM_SUMMARY_RES = [re.compile(r"Record:\s*(\d+)-(\d+)"),
+                    re.compile(r"Finished\s+(\d+)(?:st|nd|rd|th)\s+in\s+NBA\s+(Eastern|Western)\s+Conference"),
+                    re.compile(r"SRS: ([\-\+\d\.]+) \(")]
+
+
+def team_summary(result):
+    """Title and the record/seed/SRS the team scraper reads out of the page (or summary box) text."""
+    title, text = result
+    matches = [pattern.search(text or "") for pattern in TEAM_SUMMARY_RES]
+    return title, [match.groups() if match else None for match in matches]
+
+
+# What each kind's before/after results are compared on: what the scraper goes on to read from them.
+OUTPUTS = {
+    "roster": (lambda tables: [table_text(t) for t in tables], lambda tables: [table_text(t) for t in tables]),
+    "playoffs": (table_text, table_text),
+    "player": (lambda found: (extract_team_seasons(found["per_game_stats"]), extract_advanced_rows(found["advanced"])),
+               lambda page: (page.team_seasons, page.advanced_rows)),
+    "team": (team_summary, team_summary),
+    "2k": (table_text, table_text),
+}
+
+
+def same_output(kind, html):
+    before, after = CASES[kind]
+    before_output, after_output = OUTPUTS[kind]
+    return before_output(before(html)) == after_output(after(html))
+
+
+# Which synthetic.py pages each kind is timed on. Only the Lakers season page has ROSTER_CAPTION.
+SYNTHETIC_PAGES = {
+    "roster": ["wikipedia/wiki/2022-23_Los_Angeles_Lakers_season.html"],
+    "playoffs": ["wikipedia/wiki/LeBron_James.html", "wikipedia/wiki/Al_Horford.html"],
+    "player": ["basketball-reference/players/j/jamesle01.html", "basketball-reference/players/d/davisan02.html",
+               "basketball-reference/players/h/horfoal01.html"],
+    "team": ["basketball-reference/teams/LAL/2023.html", "basketball-reference/teams/BOS/2016.html"],
+    "2k": ["2kratings/teams/los-angeles-lakers.html", "2kratings/teams/boston-celtics.html"],
+}
+
+
+def synthetic_pages():
+    pages = synthetic.pages()
+    return {kind: [pages[path] for path in paths] for kind, paths in SYNTHETIC_PAGES.items()}
+
+
+def load_pages(directory):
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        kind = os.path.basename(path).split("-", 1)[0]
+        if kind in CASES:
+            with open(path, encoding="utf-8") as f:
+                pages.setdefault(kind, []).append(f.read())
+    return pages
+
+
+def time_per_page(func, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            func(html)
+    return (time.perf_counter() - start) / (repeat * len(pages)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", help="directory of saved pages named <kind>-*.html")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages) if args.pages else synthetic_pages()
+    print(f"Parser backend: {htmlparse.PARSER}")
+    print(f"{'page':<10}{'pages':>6}{'KB/page':>10}{'before ms':>12}{'after ms':>12}{'speedup':>10}{'same':>6}")
+    differ = []
+    for kind, (before, after) in CASES.items():
+        kind_pages = pages.get(kind)
+        if not kind_pages:
+            continue
+        same = all(same_output(kind, html) for html in kind_pages)
+        if not same:
+            differ.append(kind)
+        size = sum(len(html) for html in kind_pages) / len(kind_pages) / 1024
+        before_ms = time_per_page(before, kind_pages, args.repeat)
+        after_ms = time_per_page(after, kind_pages, args.repeat)
+        print(f"{kind:<10}{len(kind_pages):>6}{size:>10.0f}{before_ms:>12.1f}{after_ms:>12.1f}{before_ms / after_ms:>9.1f}x"
+              f"{'✅' if same else '❌':>6}")
+    if differ:
+        print(f"\n❌ Before and after found different elements on: {', '.join(differ)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
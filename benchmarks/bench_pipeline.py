@@ -0,0 +1,134 @@
+"""
+End-to-end load test of the async scrapers against the local replay server (replayserver.py).
+
+Starts the replay server on free ports in a background thread, points the scrapers at it
+(sites.py) and runs a whole scraper (top10VORPold.py or totalplayoffgames.py) in a scratch
+directory with a cold cache. Both the server's per-client limits and the scrapers' own rate
+limits are the real ones sped up by --scale, so a season that takes an hour against the real
+sites replays in seconds, and any request the scheduler sends over the limit shows up as a 429.
+
+    python benchmarks/bench_pipeline.py --scraper vorp --seasons 2023 --scale 200
+    python benchmarks/bench_pipeline.py --scraper playoffs --seasons 2016 --latency 80 --error-rate 0.05
+
+The default pages are the synthetic ones in benchmarks/fixtures/ (see make_fixtures.py): two
+rosters and a few of their players, so against them a run is only a smoke test of the pipeline,
+and most of its requests are 404s. For a real load test, record the pages of a season the
+scrapers have already fetched and serve those:
+
+    python replayserver.py record --pages replay_pages
+    python benchmarks/bench_pipeline.py --pages replay_pages --seasons 2023
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import asyncfetch  # noqa: E402
+import pagecache  # noqa: E402
+import sites  # noqa: E402
+from ratelimiter import HostRateScheduler  # noqa: E402
+from replayserver import ReplayServer, real_limits  # noqa: E402
+from runstats import stats as run_stats  # noqa: E402
+
+PAGES_DIR = os.path.join(REPO_DIR, "benchmarks", "fixtures")
+
+
+def start_in_thread(server):
+    """Run `server` on its own event loop in a daemon thread, so parsing in the scraper doesn't stall it."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    base_urls = asyncio.run_coroutine_threadsafe(server.start(port=0), loop).result()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+    return base_urls, stop
+
+
+def scraper_main(name, seasons):
+    if name == "vorp":
+        import top10VORPold
+        return top10VORPold.main(seasons=seasons)
+    import totalplayoffgames
+    return totalplayoffgames.main(seasons=seasons)
+
+
+def run(args):
+    server = ReplayServer(os.path.abspath(args.pages), args.latency / 1000, args.jitter / 1000,
+                          args.error_rate, args.retry_after, real_limits(args.scale), seed=args.seed)
+    base_urls, stop = start_in_thread(server)
+    for site, base_url in base_urls.items():
+        sites.set_base_url(site, base_url)
+    asyncfetch.rate_scheduler = HostRateScheduler(replay_scale=args.scale)
+
+    cwd = os.getcwd()
+    output = io.StringIO()
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            # Cache, journal, player index and CSVs all go to the scratch directory.
+            os.chdir(scratch)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(sys.stdout if args.verbose else output):
+                asyncio.run(scraper_main(args.scraper, args.seasons))
+            elapsed = time.perf_counter() - start
+            pagecache.cache.close()
+    finally:
+        os.chdir(cwd)
+        stop()
+        for site in base_urls:
+            sites.set_base_url(site)
+    return elapsed, server.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scraper", choices=["vorp", "playoffs"], default="vorp",
+                        help="vorp: top10VORPold.py (default), playoffs: totalplayoffgames.py")
+    parser.add_argument("--seasons", type=lambda text: [int(year) for year in text.split(",")], default=[2023],
+                        help="comma-separated season end years (default: 2023)")
+    parser.add_argument("--pages", default=PAGES_DIR, help="pages to serve (default: the synthetic benchmarks/fixtures)")
+    parser.add_argument("--scale", type=float, default=200, help="speed-up of every rate limit (default: 200)")
+    parser.add_argument("--latency", type=float, default=20, help="server response time in ms (default: 20)")
+    parser.add_argument("--jitter", type=float, default=10, help="random +/- ms on the latency (default: 10)")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of requests answered with a 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds of those 429s")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="show the scraper's own output")
+    args = parser.parse_args()
+
+    elapsed, stats = run(args)
+    print(f"{args.scraper} scraper, seasons {args.seasons}, limits x{args.scale:g}, "
+          f"latency {args.latency:g}±{args.jitter:g} ms: {elapsed:.2f} s")
+    print(f"{'site':<22}{'requests':>9}{'ok':>6}{'304':>6}{'404':>6}{'over limit':>11}{'injected':>9}{'KB':>8}{'req/s':>8}")
+    for site, s in stats.items():
+        print(f"{site:<22}{s['requests']:>9}{s['ok']:>6}{s['not_modified']:>6}{s['not_found']:>6}{s['rate_limited']:>11}"
+              f"{s['injected_429']:>9}{s['bytes'] / 1024:>8.0f}{s['requests'] / elapsed:>8.1f}")
+    # The scraper's own view of the run (runstats.py), summed over its concurrent tasks.
+    report = run_stats.report()
+    print("\nScraper time by stage (task-seconds): "
+          + ", ".join(f"{stage} {seconds:.2f}" for stage, seconds in report["stage_s"].items()))
+    probes = report["slug_probes"]
+    if probes["players"]:
+        print(f"Slug probes: {probes['probes']} for {probes['players']} players ({probes['mean']:.1f} each)")
+    requests = sum(s["requests"] for s in stats.values())
+    not_found = sum(s["not_found"] for s in stats.values())
+    if not_found:
+        print(f"\n⚠️ {not_found} of {requests} requests were for pages {args.pages} doesn't have, so this run was "
+              f"only a smoke test. Record real pages with `python replayserver.py record` for a load test.")
+    over = sum(s["rate_limited"] for s in stats.values())
+    if over:
+        print(f"\n❌ {over} requests went over a rate limit")
+        sys.exit(1)
+    print(f"\n✅ No request went over a rate limit{' (smoke test)' if not_found else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Writes the synthetic pages (synthetic.py) to benchmarks/fixtures/, with their manifest.json.
+
+The fixtures are not recorded from the real sites: see synthetic.py for how they're made. They're
+fine for timing parsers and load-testing the replay server, but not as reference data. To
+benchmark against real pages, fill a directory with `python replayserver.py record` and pass it
+to bench_parsers.py / bench_pipeline.py.
+
+    python benchmarks/make_fixtures.py                  # rewrite benchmarks/fixtures/
+    python benchmarks/make_fixtures.py --out /tmp/fx    # somewhere else
+
+Output is deterministic: running it again reproduces the committed files byte for byte.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import synthetic  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def write(out, path, html):
+    full = os.path.join(out, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+CASES = [
+    {"parser": "roster_names", "page": "wikipedia/wiki/2022-23_Los_Angeles_Lakers_season.html",
+     "args": {"season": "2022-23", "team": "Los_Angeles_Lakers"}},
+    {"parser": "roster_names", "page": "wikipedia/wiki/2015-16_Boston_Celtics_season.html",
+     "args": {"season": "2015-16", "team": "Boston_Celtics"}},
+    {"parser": "roster_links", "page": "wikipedia/wiki/2022-23_Los_Angeles_Lakers_season.html",
+     "args": {"season": "2022-23", "team": "Los_Angeles_Lakers"}},
+    {"parser": "roster_links", "page": "wikipedia/wiki/2015-16_Boston_Celtics_season.html",
+     "args": {"season": "2015-16", "team": "Boston_Celtics"}},
+    {"parser": "playoff_games", "page": "wikipedia/wiki/LeBron_James.html", "args": {"cutoff_year": 2023}},
+    {"parser": "playoff_games", "page": "wikipedia/wiki/Al_Horford.html", "args": {"cutoff_year": 2016}},
+    {"parser": "verify_player", "page": "basketball-reference/players/j/jamesle01.html",
+     "args": {"target_season": 2023, "target_team_abbr": "LAL"}},
+    {"parser": "verify_player", "page": "basketball-reference/players/d/davisan02.html",
+     "args": {"target_season": 2016, "target_team_abbr": "LAL"}},
+    {"parser": "verify_player", "page": "basketball-reference/players/h/horfoal01.html",
+     "args": {"target_season": 2016, "target_team_abbr": "ATL"}},
+    {"parser": "player_vorp", "page": "basketball-reference/players/j/jamesle01.html", "args": {"season_str": "2022-23"}},
+    {"parser": "player_vorp", "page": "basketball-reference/players/d/davisan02.html", "args": {"season_str": "2019-20"}},
+    {"parser": "player_vorp", "page": "basketball-reference/players/h/horfoal01.html", "args": {"season_str": "2015-16"}},
+    {"parser": "team_stats", "page": "basketball-reference/teams/LAL/2023.html", "args": {}},
+    {"parser": "team_stats", "page": "basketball-reference/teams/BOS/2016.html", "args": {}},
+    {"parser": "2k_ovrs", "page": "2kratings/teams/los-angeles-lakers.html", "args": {}},
+    {"parser": "2k_ovrs", "page": "2kratings/teams/boston-celtics.html", "args": {}},
+]
+
+
+def generate(out):
+    """Write every page and manifest.json under `out`. The same seed always gives the same bytes."""
+    for path, html in synthetic.pages().items():
+        write(out, path, html)
+    with open(os.path.join(out, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(CASES, f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=FIXTURES_DIR, help="directory to write the pages to (default: benchmarks/fixtures)")
+    args = parser.parse_args()
+    generate(args.out)
+    print(f"✅ {len(set(case['page'] for case in CASES))} pages and manifest.json written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
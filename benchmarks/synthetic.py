@@ -0,0 +1,238 @@
+"""
+The synthetic page generator shared by the benchmarks: pages with the structure the scrapers parse
+(the same element ids, captions, data-stat cells and commented-out tables) and about the size of
+the real ones, padded with navigation markup. Player names and team/season histories are real,
+but every stat, height, rating and game log is made up from a seeded random generator.
+
+make_fixtures.py writes these pages to benchmarks/fixtures/ for bench_parsers.py and the replay
+server, and bench_parsing.py parses them in memory. pages() always returns the same pages.
+"""
+import random
+
+SEED = 7
+rng = random.Random(SEED)
+
+
+def chrome(n, site):
+    """Navigation, sidebar and footer markup, which is most of what a real page is made of."""
+    parts = []
+    for i in range(n):
+        parts.append(
+            f'<div class="{site}-nav-block" id="nav-block-{i}"><ul class="menu">'
+            + "".join(f'<li class="menu-item"><a href="/{site}/section/{i}/{j}" title="Section {i}.{j}">Section {i}.{j}</a></li>'
+                      for j in range(6))
+            + f'</ul><p class="blurb">Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor '
+              f'incididunt ut labore et dolore magna aliqua ({i}).</p></div>')
+    return "".join(parts)
+
+
+def head(title):
+    scripts = "".join(f'<script src="/static/js/bundle-{i}.js" defer></script>' for i in range(8))
+    styles = "".join(f'<link rel="stylesheet" href="/static/css/site-{i}.css">' for i in range(6))
+    return (f'<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>{title}</title>'
+            f'{styles}{scripts}</head>')
+
+
+# ---------------------------------------------------------------- Wikipedia
+
+LAKERS_2023 = [
+    ("F", 6, "LeBron James"), ("F", 3, "Anthony Davis"), ("G", 15, "Austin Reaves"),
+    ("G", 1, "D'Angelo Russell"), ("F", 28, "Rui Hachimura"), ("G", 5, "Malik Beasley"),
+    ("F", 11, "Jarred Vanderbilt"), ("G", 4, "Lonnie Walker IV"), ("G", 10, "Max Christie"),
+    ("C", 7, "Mo Bamba"), ("G", 0, "Shaquille Harrison"), ("C", 12, "Tristan Thompson"),
+    ("F", 9, "Wenyen Gabriel"), ("G", 2, "Dennis Schröder"), ("F", 17, "Cole Swider"),
+    ("G", 55, "Troy Brown Jr."), ("C", 40, "Scotty Pippen Jr."),
+]
+
+CELTICS_2016 = [
+    ("G", 4, "Isaiah Thomas"), ("G", 36, "Marcus Smart"), ("G", 0, "Avery Bradley"),
+    ("F", 42, "Al Horford"), ("F", 13, "Jae Crowder"), ("F", 7, "Jaylen Brown"),
+    ("F", 90, "Amir Johnson"), ("C", 44, "Kelly Olynyk"), ("G", 8, "Terry Rozier"),
+    ("F", 99, "Gerald Green"), ("C", 41, "Jonas Jerebko"), ("G", 26, "Demetrius Jackson"),
+    ("C", 27, "Jordan Mickey"), ("F", 28, "Tyler Zeller"), ("F", 77, "James Young"),
+]
+
+
+def wiki_slug(name):
+    return name.replace(" ", "_").replace("'", "%27")
+
+
+def wikipedia_season(season_label, team, players):
+    season_dash = season_label.replace("-", "–")
+    team_spaces = team.replace("_", " ")
+    rows = "".join(
+        f'<tr><td style="text-align:center;"><a href="/wiki/Position_{pos}" title="{pos}">{pos}</a></td>'
+        f'<td style="text-align:center;">{number}</td>'
+        f'<td><span data-sort-value="{name.split()[-1]}, {name.split()[0]}"><a href="/wiki/{wiki_slug(name)}" '
+        f'title="{name}">{name}</a></span></td>'
+        f'<td>6 ft {rng.randint(1, 11)} in (1.{rng.randint(80, 99)} m)</td><td>{rng.randint(180, 260)} lb</td>'
+        f'<td>{rng.randint(1985, 2003)}–{rng.randint(1, 12):02d}–{rng.randint(1, 28):02d}</td>'
+        f'<td><a href="/wiki/College_{i}">College {i}</a></td></tr>'
+        for i, (pos, number, name) in enumerate(players))
+    roster = (f'<table class="toccolours"><tbody><tr><td><table class="sortable" style="background:transparent">'
+              f'<caption>{season_dash} {team_spaces} roster</caption>'
+              f'<tr><th>Pos.</th><th>No.</th><th>Name</th><th>Height</th><th>Weight</th><th>DOB (YYYY–MM–DD)</th>'
+              f'<th>From</th></tr>{rows}</table></td></tr></tbody></table>')
+    games = "".join(
+        f'<table class="wikitable"><caption>Game log {month}</caption><tr><th>Game</th><th>Date</th><th>Team</th>'
+        f'<th>Score</th><th>High points</th><th>Record</th></tr>'
+        + "".join(f'<tr><td>{g}</td><td>Month {month} {g}</td><td>Opponent {g}</td><td>W {rng.randint(90, 130)}–'
+                  f'{rng.randint(90, 130)}</td><td>Player ({rng.randint(15, 45)})</td><td>{g}–{g}</td></tr>'
+                  for g in range(1, 15))
+        + '</table>' for month in range(1, 4))
+    title = f"{season_dash} {team_spaces} season - Wikipedia"
+    return (f'{head(title)}<body><div id="content"><h1 id="firstHeading">{season_dash} {team_spaces} season</h1>'
+            f'{chrome(60, "wiki")}<h2 id="Roster">Roster</h2>{roster}<h2 id="Game_log">Game log</h2>{games}'
+            f'{chrome(40, "wiki")}</div></body></html>')
+
+
+def wikipedia_player(name, first_year, playoff_years):
+    regular = "".join(
+        f'<tr><td style="text-align:left;"><a href="/wiki/{y}-{str(y + 1)[-2:]}_NBA_season">{y}–{str(y + 1)[-2:]}</a></td>'
+        f'<td style="text-align:left;">Team</td><td>{rng.randint(40, 82)}</td><td>{rng.randint(40, 82)}</td>'
+        + "".join(f'<td>{rng.uniform(0, 40):.1f}</td>' for _ in range(10)) + '</tr>'
+        for y in range(first_year, 2024))
+    playoff_rows = []
+    for y, team, gp in playoff_years:
+        mark = "†" if rng.random() < 0.2 else ""
+        playoff_rows.append(
+            f'<tr><td style="text-align:left;"><a href="/wiki/{y + 1}_NBA_playoffs">{y + 1}</a>{mark}</td>'
+            f'<td style="text-align:left;">{team}</td><td>{gp}</td><td>{gp}</td>'
+            + "".join(f'<td>{rng.uniform(0, 40):.1f}</td>' for _ in range(10)) + '</tr>')
+    header = ('<tr><th>Year</th><th>Team</th><th>GP</th><th>GS</th><th>MPG</th><th>FG%</th><th>3P%</th><th>FT%</th>'
+              '<th>RPG</th><th>APG</th><th>SPG</th><th>BPG</th><th>PPG</th><th>+/-</th></tr>')
+    title = f"{name} - Wikipedia"
+    return (f'{head(title)}<body><div id="content"><h1 id="firstHeading">{name}</h1>{chrome(60, "wiki")}'
+            f'<h2 id="NBA_career_statistics">NBA career statistics</h2><h3 id="Regular_season">Regular season</h3>'
+            f'<table class="wikitable sortable">{header}{regular}</table>'
+            f'<h3 id="Playoffs">Playoffs</h3><table class="wikitable sortable">{header}{"".join(playoff_rows)}</table>'
+            f'{chrome(40, "wiki")}</div></body></html>')
+
+
+# ------------------------------------------------------- Basketball Reference
+
+ADVANCED_STATS = ["age", "team_name_abbr", "pos", "games", "mp", "per", "ts_pct", "fg3a_per_fga_pct", "fta_per_fga_pct",
+                  "orb_pct", "drb_pct", "trb_pct", "ast_pct", "stl_pct", "blk_pct", "tov_pct", "usg_pct", "ows", "dws",
+                  "ws", "ws_per_48", "obpm", "dbpm", "bpm", "vorp"]
+PER_GAME_STATS = ["age", "team_name_abbr", "comp_name_abbr", "pos", "games", "games_started", "mp_per_g", "fg_per_g",
+                  "fga_per_g", "fg_pct", "fg3_per_g", "fg3a_per_g", "fg3_pct", "fg2_per_g", "fg2a_per_g", "fg2_pct",
+                  "efg_pct", "ft_per_g", "fta_per_g", "ft_pct", "orb_per_g", "drb_per_g", "trb_per_g", "ast_per_g",
+                  "stl_per_g", "blk_per_g", "tov_per_g", "pf_per_g", "pts_per_g"]
+
+
+def bbr_cell(stat, season_teams, year, i):
+    if stat == "age":
+        return f'<td class="right" data-stat="age">{20 + i}</td>'
+    if stat == "team_name_abbr":
+        team = season_teams[year]
+        return f'<td class="left" data-stat="team_name_abbr"><a href="/teams/{team}/{year}.html">{team}</a></td>'
+    if stat in ("comp_name_abbr", "pos"):
+        return f'<td class="left" data-stat="{stat}">{"NBA" if stat == "comp_name_abbr" else "PF"}</td>'
+    return f'<td class="right" data-stat="{stat}">{rng.uniform(-2, 12):.1f}</td>'
+
+
+def bbr_stat_table(table_id, stats, season_teams, caption):
+    rows = []
+    for i, year in enumerate(sorted(season_teams)):
+        season = f"{year - 1}-{str(year)[-2:]}"
+        rows.append(f'<tr id="{table_id}.{year}" data-row="{i}"><th scope="row" class="left" data-stat="year_id">'
+                    f'<a href="/leagues/NBA_{year}.html">{season}</a></th>'
+                    + "".join(bbr_cell(stat, season_teams, year, i) for stat in stats) + '</tr>')
+    head_row = '<tr><th data-stat="year_id">Season</th>' + "".join(f'<th data-stat="{s}">{s}</th>' for s in stats) + '</tr>'
+    return (f'<div class="table_container" id="div_{table_id}"><table class="stats_table sortable row_summable" '
+            f'id="{table_id}" data-cols-to-freeze=",1"><caption>{caption}</caption><thead>{head_row}</thead>'
+            f'<tbody>{"".join(rows)}</tbody></table></div>')
+
+
+def bbr_player(name, season_teams):
+    commented = "".join(
+        f'<div id="all_{t}" class="table_wrapper"><div class="placeholder"></div>\n<!--\n'
+        f'{bbr_stat_table(t, PER_GAME_STATS, season_teams, t.replace("_", " ").title())}\n-->\n</div>'
+        for t in ("totals_stats", "per_minute_stats", "per_poss",
+                  "playoffs_per_game"))
+    advanced = (f'<div id="all_advanced" class="table_wrapper"><div class="placeholder"></div>\n<!--\n'
+                f'{bbr_stat_table("advanced", ADVANCED_STATS, season_teams, "Advanced")}\n-->\n</div>')
+    title = f"{name} Stats, Height, Weight, Position, Draft Status and more | Basketball-Reference.com"
+    return (f'{head(title)}<body><div id="wrap"><div id="info"><h1><span>{name}</span></h1></div>{chrome(30, "bbr")}'
+            f'<div id="all_per_game_stats" class="table_wrapper">'
+            f'{bbr_stat_table("per_game_stats", PER_GAME_STATS, season_teams, "Per Game")}</div>'
+            f'{advanced}{commented}{chrome(20, "bbr")}</div></body></html>')
+
+
+def bbr_team(season_label, team_name, record, place, conference, srs, rank, off_rtg, def_rtg):
+    net = off_rtg - def_rtg
+    info = (f'<div id="info"><div id="meta"><div><h1><span>{season_label}</span> <span>{team_name}</span> '
+            f'<span>Roster and Stats</span></h1>'
+            f'<p><strong>Record:</strong> {record}, Finished {place} in <a href="/leagues/NBA_x_standings.html">NBA</a> '
+            f'{conference} Conference</p>'
+            f'<p><strong>Coach:</strong> <a href="/coaches/x.html">Coach Name</a> ({record})</p>'
+            f'<p><strong>Executive:</strong> <a href="/executives/x.html">Executive Name</a></p>'
+            f'<p><strong>PTS/G:</strong> 117.2 (5th of 30) <strong>Opp PTS/G:</strong> 116.6 (25th of 30)</p>'
+            f'<p><a href="/about/ratings.html">SRS</a>: {srs:+.2f} ({rank} of 30) <strong>Pace</strong>: 101.9 (4th of 30)</p>'
+            f'<p><strong>Off Rtg</strong>: {off_rtg:.1f} (16th of 30) <strong>Def Rtg</strong>: {def_rtg:.1f} (11th of 30) '
+            f'<strong>Net Rtg</strong>: {net:+.1f} (15th of 30)</p>'
+            f'<p><strong>Expected W-L:</strong> 42-40 (14th of 30)</p>'
+            f'<p><strong>Arena:</strong> Arena Name <strong>Attendance:</strong> 764,831 (8th of 30)</p></div></div></div>')
+    commented = "".join(f'<div id="all_{t}" class="table_wrapper">\n<!--\n'
+                        f'{bbr_stat_table(t, PER_GAME_STATS, {2016 + i: "LAL" for i in range(8)}, t)}\n-->\n</div>'
+                        for t in ("roster", "team_and_opponent", "team_misc", "per_game", "totals", "per_minute",
+                                  "advanced"))
+    title = f"{season_label} {team_name} Roster and Stats | Basketball-Reference.com"
+    return f'{head(title)}<body><div id="wrap">{info}{chrome(25, "bbr")}{commented}{chrome(20, "bbr")}</div></body></html>'
+
+
+# ------------------------------------------------------------------ 2kratings
+
+def two_k_team(team_name, first, last):
+    sections = []
+    for year in range(first, last + 1):
+        yy = f"{year % 100:02d}"
+        rows = "".join(
+            f'<tr><td>{i + 1}</td><td class="entry-font"><a href="/player-{year}-{i}">Player {year}-{i}</a>'
+            f'<span class="entry-subtext-font">G | #{i}</span></td>'
+            f'<td><span class="attribute-box" data-order="{ovr}">{ovr}</span></td>'
+            f'<td><span class="attribute-box" data-order="{rng.randint(40, 99)}">3PT</span></td>'
+            f'<td><span class="attribute-box" data-order="{rng.randint(40, 99)}">DNK</span></td></tr>'
+            for i, ovr in enumerate(sorted((rng.randint(60, 97) for _ in range(15)), reverse=True)))
+        sections.append(f'<h5 class="nav-title" id="nav-2k{yy}-tab">NBA 2K{yy}</h5>'
+                        f'<div class="table-responsive"><table class="table table-striped"><thead><tr><th>#</th>'
+                        f'<th>Player</th><th>OVR</th><th>3PT</th><th>DNK</th></tr></thead><tbody>{rows}</tbody>'
+                        f'</table></div>{chrome(2, "2k")}')
+    title = f"{team_name} NBA 2K Roster and Ratings | 2KRatings"
+    return f'{head(title)}<body>{chrome(30, "2k")}{"".join(sections)}{chrome(20, "2k")}</body></html>'
+
+
+LEBRON_TEAMS = {y: ("CLE" if y <= 2010 or 2015 <= y <= 2018 else "MIA" if y <= 2014 else "LAL") for y in range(2004, 2024)}
+DAVIS_TEAMS = {y: ("NOH" if y <= 2013 else "NOP" if y <= 2019 else "LAL") for y in range(2013, 2024)}
+HORFORD_TEAMS = {y: ("ATL" if y <= 2016 else "BOS" if y <= 2019 else "PHI" if y == 2020 else "OKC" if y == 2021 else "BOS")
+                 for y in range(2008, 2024)}
+
+def pages():
+    """Every synthetic page as {path under a pages directory: HTML}. The same seed always gives the same pages."""
+    rng.seed(SEED)
+    return {
+        "wikipedia/wiki/2022-23_Los_Angeles_Lakers_season.html":
+            wikipedia_season("2022-23", "Los_Angeles_Lakers", LAKERS_2023),
+        "wikipedia/wiki/2015-16_Boston_Celtics_season.html": wikipedia_season("2015-16", "Boston_Celtics", CELTICS_2016),
+        "wikipedia/wiki/LeBron_James.html": wikipedia_player("LeBron James", 2003, [
+            (y, t, rng.randint(4, 25)) for y, t in [(2005, "Cleveland"), (2006, "Cleveland"), (2007, "Cleveland"),
+                                                    (2008, "Cleveland"), (2009, "Cleveland"), (2010, "Miami"),
+                                                    (2011, "Miami"), (2012, "Miami"), (2013, "Miami"), (2014, "Cleveland"),
+                                                    (2015, "Cleveland"), (2016, "Cleveland"), (2017, "Cleveland"),
+                                                    (2019, "L.A. Lakers"), (2020, "L.A. Lakers"), (2022, "L.A. Lakers")]]),
+        "wikipedia/wiki/Al_Horford.html": wikipedia_player("Al Horford", 2007, [
+            (y, t, rng.randint(4, 20)) for y, t in [(2007, "Atlanta"), (2008, "Atlanta"), (2009, "Atlanta"),
+                                                    (2010, "Atlanta"), (2012, "Atlanta"), (2013, "Atlanta"),
+                                                    (2014, "Atlanta"), (2015, "Atlanta"), (2016, "Boston"), (2017, "Boston"),
+                                                    (2018, "Boston"), (2021, "Boston"), (2022, "Boston"),
+                                                    (2022, "Philadelphia")]]),
+        "basketball-reference/players/j/jamesle01.html": bbr_player("LeBron James", LEBRON_TEAMS),
+        "basketball-reference/players/d/davisan02.html": bbr_player("Anthony Davis", DAVIS_TEAMS),
+        "basketball-reference/players/h/horfoal01.html": bbr_player("Al Horford", HORFORD_TEAMS),
+        "basketball-reference/teams/LAL/2023.html":
+            bbr_team("2022-23", "Los Angeles Lakers", "43-39", "7th", "Western", 0.43, "16th", 114.5, 114.1),
+        "basketball-reference/teams/BOS/2016.html":
+            bbr_team("2015-16", "Boston Celtics", "48-34", "5th", "Eastern", 2.84, "8th", 106.8, 103.6),
+        "2kratings/teams/los-angeles-lakers.html": two_k_team("Los Angeles Lakers", 2014, 2025),
+        "2kratings/teams/boston-celtics.html": two_k_team("Boston Celtics", 2014, 2025),
+    }
@@ -0,0 +1,243 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import datastore
+from train_model import FEATURE_COLS
+
+# Monte Carlo playoff simulator. Turns per-team strength (the model's score by default) into real
+# title odds by playing out the bracket many times:
+#   python bracket_sim.py                             # latest season, 1,000,000 brackets
+#   python bracket_sim.py --season 2024 --strength srs --workers 4
+# Each conference's top 8 seeds play 1v8, 4v5, 3v6, 2v7, then the winners meet in the bracket
+# order up to the Finals. Series odds are computed exactly from per-game odds, so a simulated
+# bracket is only one random draw per series, and every round is done for all brackets at once.
+# From 2021 on, the dataset's seeds are standings ranks before the play-in, so seeds 7 and 8 are
+# played for in each bracket: 7 hosts 8 (the winner is the 7 seed), 9 hosts 10, and the loser of
+# 7v8 hosts the winner of 9v10 for the 8 seed.
+
+CONFERENCES = {
+    "West": ["Dallas Mavericks", "Denver Nuggets", "Golden State Warriors", "Houston Rockets",
+             "Los Angeles Clippers", "Los Angeles Lakers", "Memphis Grizzlies", "Minnesota Timberwolves",
+             "New Orleans Pelicans", "Oklahoma City Thunder", "Phoenix Suns", "Portland Trail Blazers",
+             "Sacramento Kings", "San Antonio Spurs", "Utah Jazz"],
+    "East": ["Atlanta Hawks", "Boston Celtics", "Brooklyn Nets", "Charlotte Hornets", "Chicago Bulls",
+             "Cleveland Cavaliers", "Detroit Pistons", "Indiana Pacers", "Miami Heat", "Milwaukee Bucks",
+             "New York Knicks", "Orlando Magic", "Philadelphia 76ers", "Toronto Raptors", "Washington Wizards"],
+}
+team_conference_map = {team: conference for conference, names in CONFERENCES.items() for team in names}
+
+# Seeds in bracket order: 1v8 and 4v5 meet in the second round, as do 3v6 and 2v7.
+BRACKET_SEEDS = [1, 8, 4, 5, 3, 6, 2, 7]
+# First season (end year) with a play-in tournament for seeds 7 to 10.
+PLAY_IN_SEASON = 2021
+PLAY_IN_SEEDS = [9, 10]
+
+# Per-game log-odds of team A beating team B are SCALE * (strength A - strength B), plus HOME_EDGE
+# for the home team. ~0.14 per point is the usual fit for point-differential ratings; model scores
+# run from 0 to 1, so they need a much larger scale.
+DEFAULT_SCALES = {"model": 2.5, "srs": 0.14, "net_rtg": 0.14}
+HOME_EDGE = 0.24  # About a 56% home win rate between equal teams.
+# Home games of the team with home-court advantage in a 2-2-1-1-1 best-of-seven.
+HOME_GAMES = (True, True, False, False, True, False, True)
+
+N_SIMULATIONS = 1_000_000
+
+
+def game_win_prob(strength_diff, home, scale):
+    return 1 / (1 + np.exp(-(scale * strength_diff + (HOME_EDGE if home else -HOME_EDGE))))
+
+
+def series_win_prob(p_home, p_away):
+    """
+    Exact odds that the team with home-court advantage wins a best-of-seven, given its per-game
+    odds at home and away. Works elementwise on arrays.
+    """
+    p_home, p_away = np.broadcast_arrays(np.asarray(p_home, float), np.asarray(p_away, float))
+    # state[w, l]: probability of being at w wins and l losses with the series still going.
+    state = np.zeros((4, 4) + p_home.shape)
+    state[0, 0] = 1
+    won = np.zeros(p_home.shape)
+    for game, home in enumerate(HOME_GAMES):
+        p = p_home if home else p_away
+        after = np.zeros_like(state)
+        for wins in range(4):
+            losses = game - wins
+            if not 0 <= losses < 4:
+                continue
+            if wins == 3:
+                won += state[wins, losses] * p
+            else:
+                after[wins + 1, losses] += state[wins, losses] * p
+            if losses < 3:
+                after[wins, losses + 1] += state[wins, losses] * (1 - p)
+        state = after
+    return won
+
+
+def series_matrix(strength, home_rank, scale):
+    """
+    P[i, j]: odds that team i beats team j in a series. Home court goes to the lower `home_rank`
+    (seed within a conference, record in the Finals).
+    """
+    diff = strength[:, None] - strength[None, :]
+    p_if_home = series_win_prob(game_win_prob(diff, True, scale), game_win_prob(diff, False, scale))
+    i_has_home = home_rank[:, None] < home_rank[None, :]
+    return np.where(i_has_home, p_if_home, 1 - p_if_home.T)
+
+
+def game_matrix(strength, home_rank, scale):
+    """P[i, j]: odds that team i beats team j in a single game, hosted by the lower `home_rank`."""
+    diff = strength[:, None] - strength[None, :]
+    i_has_home = home_rank[:, None] < home_rank[None, :]
+    return np.where(i_has_home, game_win_prob(diff, True, scale), game_win_prob(diff, False, scale))
+
+
+def play_in(matrix, seven, eight, nine, ten, n_simulations, rng):
+    """The teams that end up as seeds 7 and 8 after one conference's play-in, per bracket."""
+    won_first = rng.random(n_simulations) < matrix[seven, eight]
+    winner_78, loser_78 = np.where(won_first, seven, eight), np.where(won_first, eight, seven)
+    winner_910 = np.where(rng.random(n_simulations) < matrix[nine, ten], nine, ten)
+    return winner_78, np.where(rng.random(n_simulations) < matrix[loser_78, winner_910], loser_78, winner_910)
+
+
+def play_round(matrix, teams, rng):
+    """Play every pair of adjacent columns of `teams` (brackets x slots) against each other."""
+    a, b = teams[:, 0::2], teams[:, 1::2]
+    return np.where(rng.random(a.shape) < matrix[a, b], a, b)
+
+
+def simulate(conference_matrix, finals_matrix, n_teams, n_simulations, seed=None, play_in_matrix=None):
+    """
+    Play `n_simulations` brackets of 16 teams (indices 0-7 West, 8-15 East, each in BRACKET_SEEDS
+    order). With a `play_in_matrix` (single-game odds), the 9 and 10 seeds follow (16-17 West,
+    18-19 East) and seeds 7 and 8 are played for first. Returns per-team counts of playoff
+    appearances, conference finals, Finals and titles.
+    """
+    rng = np.random.default_rng(seed)
+    teams = np.broadcast_to(np.arange(16), (n_simulations, 16))
+    if play_in_matrix is not None:
+        teams = teams.copy()
+        for conference in range(2):
+            first, extra = 8 * conference, 16 + 2 * conference
+            seven, eight = play_in(play_in_matrix, first + BRACKET_SEEDS.index(7), first + BRACKET_SEEDS.index(8),
+                                   extra, extra + 1, n_simulations, rng)
+            teams[:, first + BRACKET_SEEDS.index(7)] = seven
+            teams[:, first + BRACKET_SEEDS.index(8)] = eight
+    playoff_teams = teams
+    teams = play_round(conference_matrix, teams, rng)          # first round: 8 left
+    conf_finalists = play_round(conference_matrix, teams, rng)  # second round: 4 left
+    finalists = play_round(conference_matrix, conf_finalists, rng)
+    champions = play_round(finals_matrix, finalists, rng)
+    return (np.bincount(playoff_teams.ravel(), minlength=n_teams),
+            np.bincount(conf_finalists.ravel(), minlength=n_teams),
+            np.bincount(finalists.ravel(), minlength=n_teams),
+            np.bincount(champions.ravel(), minlength=n_teams))
+
+
+def has_play_in(season):
+    return season >= PLAY_IN_SEASON
+
+
+def bracket_teams(season_rows):
+    """
+    The 16 playoff teams of one season, West then East, each in BRACKET_SEEDS order. In play-in
+    seasons the West's and then the East's 9 and 10 seeds follow.
+    """
+    rows = season_rows.assign(conference=season_rows['team'].map(team_conference_map))
+    seeds = {"bracket": BRACKET_SEEDS}
+    if has_play_in(rows['season'].max()):
+        seeds["play_in"] = PLAY_IN_SEEDS
+    bracket = {part: [] for part in seeds}
+    for conference in CONFERENCES:
+        used_seeds = [seed for part in seeds.values() for seed in part]
+        by_seed = rows[rows['conference'] == conference].set_index('seed')
+        # Only the seeds the bracket and play-in use have to be unique: the standings can leave
+        # lottery teams tied on record sharing a rank (the West's 10th in 2016).
+        shared = by_seed.index[by_seed.index.duplicated() & by_seed.index.isin(used_seeds)]
+        if len(shared):
+            raise ValueError(f"{conference} has teams sharing a seed: {sorted(set(shared))}")
+        missing = [seed for seed in used_seeds if seed not in by_seed.index]
+        if missing:
+            raise ValueError(f"{conference} is missing seeds {missing}")
+        for part, part_seeds in seeds.items():
+            bracket[part].append(by_seed.loc[part_seeds].reset_index())
+    return pd.concat([frame for part in bracket.values() for frame in part], ignore_index=True)
+
+
+def title_odds(bracket, strength, scale, n_simulations=N_SIMULATIONS, workers=1, seed=42):
+    """
+    Simulate the bracket and return playoff (after any play-in), conference finals, Finals and
+    title odds (%) per team.
+    With `workers` > 1 the brackets are split across processes with independent random streams.
+    """
+    strength = bracket[strength].to_numpy(float)
+    n_teams = len(bracket)
+    # Seeds decide home court within a conference (East and West seeds never meet before the Finals).
+    seed_rank = bracket['seed'].to_numpy(float)
+    conference_matrix = series_matrix(strength, seed_rank, scale)
+    finals_matrix = series_matrix(strength, -bracket['win_pct'].to_numpy(float), scale)
+    # bracket_teams() adds the 9 and 10 seeds only in play-in seasons.
+    play_in_matrix = game_matrix(strength, seed_rank, scale) if n_teams > 16 else None
+
+    if workers > 1:
+        chunks = np.array_split(np.arange(n_simulations), workers)
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        with ProcessPoolExecutor(workers) as pool:
+            counts = list(pool.map(simulate, [conference_matrix] * workers, [finals_matrix] * workers,
+                                   [n_teams] * workers, [len(chunk) for chunk in chunks], seeds,
+                                   [play_in_matrix] * workers))
+        counts = [sum(parts) for parts in zip(*counts)]
+    else:
+        counts = simulate(conference_matrix, finals_matrix, n_teams, n_simulations, seed, play_in_matrix)
+
+    odds = bracket[['team', 'conference', 'seed']].copy()
+    odds['strength'] = strength
+    for column, count in zip(['playoffs_%', 'conf_finals_%', 'finals_%', 'champion_%'], counts):
+        odds[column] = count / n_simulations * 100
+    return odds.sort_values('champion_%', ascending=False).reset_index(drop=True)
+
+
+def season_strength(season, strength="model"):
+    """
+    The season's rows with a `strength` column: the model's score, or a dataset column like srs.
+    The model is fitted without `season`, so a finished season's odds don't already know its
+    champion. It's cached like predict.py's (keyed by its training data, so by the season left out).
+    """
+    rows = datastore.load('merged', columns=['team', 'season'] + FEATURE_COLS, seasons=[season])
+    if strength == "model":
+        from predict import get_model, score
+        from train_model import load_training_data
+        training = load_training_data()
+        model = get_model(training[training['season'] != season].reset_index(drop=True))
+        rows = score(model, rows).rename(columns={'pred_score': 'model'})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate the playoff bracket for title, Finals and conference finals odds.")
+    parser.add_argument("--season", type=int, help="season end year (default: the latest in the store)")
+    parser.add_argument("--strength", choices=sorted(DEFAULT_SCALES), default="model",
+                        help="per-team strength: the model's score (default) or a rating column")
+    parser.add_argument("--scale", type=float, help="per-game log-odds per unit of strength difference")
+    parser.add_argument("--simulations", type=int, default=N_SIMULATIONS,
+                        help=f"brackets to simulate (default: {N_SIMULATIONS:,})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"processes to split the brackets over (this machine has {os.cpu_count()} cores)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    season = args.season or datastore.require_seasons('merged')[-1]
+    bracket = bracket_teams(season_strength(season, args.strength))
+    start = time.perf_counter()
+    odds = title_odds(bracket, args.strength, args.scale or DEFAULT_SCALES[args.strength],
+                      args.simulations, args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+
+    pd.set_option("display.width", 200)
+    print(odds.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    print(f"\n🎲 {args.simulations:,} brackets of {season} simulated in {elapsed:.2f} s")
@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+import csv
+import os
+import time
+from datetime import date
+
+import basketballreferencescrapertocsv
+import datastore
+import top10VORPold
+import totalplayoffgames
+from cachepolicy import current_season, season_end, season_finished
+from journal import Journal
+from runstats import stats
+from seasons import parse_season_range
+from top10VORPold import TOP9_HEADER, abbr_team_map, team_abbr_map
+
+# Builds merged_nba_data_all_seasons.csv from the three scrapers in one run:
+#   python build_dataset.py --seasons 2014-2025    # any missing or stale season
+#   python build_dataset.py --current              # in-season daily refresh
+# Each season's partition is the three per-season CSVs the scrapers already write. Seasons whose
+# partition is up to date are not scraped again, they are only re-merged. Every merged season is
+# also written to the Parquet store (datastore.py), which is what the model loads.
+
+MERGED_PATH = "merged_nba_data_all_seasons.csv"
+REPORT_PATH = "build_dataset.report.json"
+STAT_FIELDS = ['seed', 'win_pct', 'off_rtg', 'def_rtg', 'net_rtg', 'srs']
+VORP_FIELDS = TOP9_HEADER[2:]
+MERGED_HEADER = ['team', 'season'] + STAT_FIELDS + ['total_playoff_games'] + VORP_FIELDS + ['champ_scr']
+
+# A season in progress is re-scraped once its partition is older than this.
+MAX_PARTITION_AGE = 24 * 60 * 60
+
+# Names the sources use for past franchises, mapped to today's team.
+historical_team_map = {
+    "Charlotte Bobcats": "CHO", "New Jersey Nets": "BRK", "New Orleans Hornets": "NOP",
+    "New Orleans/Oklahoma City Hornets": "NOP", "Seattle SuperSonics": "OKC", "Vancouver Grizzlies": "MEM",
+    "LA Clippers": "LAC"
+}
+
+
+def team_key(name):
+    """The canonical key every source is joined on: today's Basketball Reference abbreviation."""
+    name = name.replace("_", " ").rstrip("*").strip()
+    return team_abbr_map.get(name) or historical_team_map.get(name) or name
+
+
+def partition_paths(season):
+    """The season's CSV from each scraper, keyed by its dataset name in the Parquet store."""
+    return {
+        "team_stats": f"nba_team_stats_{season}.csv",
+        "playoff_experience": f"team_playoff_experience_{season}.csv",
+        "top9_vorp": f"team_top9_vorp_{season}.csv",
+    }
+
+
+def partition_is_fresh(season, now=None):
+    """
+    True if all three of the season's CSVs exist and are up to date: scraped after the season
+    finished, or scraped less than MAX_PARTITION_AGE ago while it is still being played.
+    """
+    now = now or time.time()
+    paths = partition_paths(season).values()
+    if not all(os.path.exists(path) for path in paths):
+        return False
+    built = min(os.path.getmtime(path) for path in paths)
+    if built >= season_end(season):
+        return True
+    return not season_finished(season, date.fromtimestamp(now)) and now - built < MAX_PARTITION_AGE
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def merge_season(season, champ_scores):
+    """Join one season's three partition CSVs on team_key() into merged rows."""
+    paths = partition_paths(season)
+    playoffs = {team_key(row["Team"]): row["Total Playoff Games"] for row in read_csv(paths["playoff_experience"])}
+    vorps = {team_key(row["team"]): row for row in read_csv(paths["top9_vorp"])}
+    rows = []
+    for team_row in read_csv(paths["team_stats"]):
+        key = team_key(team_row["team"])
+        vorp = vorps.get(key, {})
+        if key not in playoffs or not vorp:
+            print(f"⚠️ {team_row['team']} {season} is missing from the playoff or VORP partition")
+        row = {'team': abbr_team_map.get(key, team_row["team"]), 'season': season}
+        row.update({field: team_row[field] for field in STAT_FIELDS})
+        row['total_playoff_games'] = playoffs.get(key, "")
+        row.update({field: vorp.get(field, "") for field in VORP_FIELDS})
+        # Championship scores aren't scraped; they're carried over from the existing merged file.
+        row['champ_scr'] = champ_scores.get((key, season), "")
+        rows.append(row)
+    return rows
+
+
+def read_merged(path=MERGED_PATH):
+    if not os.path.exists(path):
+        return []
+    return read_csv(path)
+
+
+def write_merged(rows, path=MERGED_PATH):
+    rows = sorted(rows, key=lambda row: (int(row['season']), row['team']))
+    with open(path, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=MERGED_HEADER)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"✅ {len(rows)} rows written to {path}")
+
+
+def scrape_team_stats(seasons, resume):
+    journal = Journal(basketballreferencescrapertocsv.JOURNAL_PATH, ("season", "team"), resume=resume)
+    try:
+        # fetch() takes each request's slot from the shared per-host scheduler, which cache hits skip.
+        for year in seasons:
+            basketballreferencescrapertocsv.scrape_season_bulk(year, journal)
+    finally:
+        journal.close()
+
+
+async def scrape_partitions(seasons, resume=False, vorp_source="rosters"):
+    """Run the team-stats, playoff-experience and VORP scrapers for `seasons` concurrently."""
+    await asyncio.gather(
+        # The team-stats scraper is synchronous (requests), so it runs on a worker thread. Its requests
+        # go through the same per-host rate scheduler as the VORP scraper's, which also hits Basketball Reference.
+        asyncio.to_thread(scrape_team_stats, seasons, resume),
+        # Both write into the shared run stats; build() writes one report for all three.
+        totalplayoffgames.main(seasons=seasons, resume=resume, report_path=None),
+        top10VORPold.main(seasons=seasons, resume=resume, source=vorp_source, report_path=None),
+    )
+
+
+def build(seasons, force=False, resume=False, vorp_source="rosters", report_path=REPORT_PATH, progress=False):
+    stale = [season for season in seasons if force or not partition_is_fresh(season)]
+    for season in seasons:
+        print(f"{'🔄 Rebuilding' if season in stale else '⏭️ Up to date:'} {season}")
+    if stale:
+        stats.reset("build_dataset.py", live=progress)
+        asyncio.run(scrape_partitions(stale, resume=resume, vorp_source=vorp_source))
+        stats.write(report_path)
+        for season in stale:
+            for dataset, path in partition_paths(season).items():
+                if os.path.exists(path):
+                    datastore.write_partition(dataset, season, read_csv(path))
+
+    existing = read_merged()
+    champ_scores = {(team_key(row['team']), int(row['season'])): row['champ_scr'] for row in existing}
+    merged = {season: merge_season(season, champ_scores) for season in seasons
+              if all(os.path.exists(path) for path in partition_paths(season).values())}
+    # Seasons outside the range (or whose partition couldn't be built) keep their existing rows.
+    rows = [row for row in existing if int(row['season']) not in merged]
+    for season, season_rows in merged.items():
+        rows.extend(season_rows)
+        datastore.write_partition("merged", season, season_rows)
+    # The CSV is kept for compatibility (and for anything that can't read Parquet).
+    write_merged(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"Scrape and merge every source into {MERGED_PATH}.")
+    parser.add_argument("--seasons", type=parse_season_range,
+                        help="season end year or range of them, e.g. 2025 or 2014-2025 (default: current season)")
+    parser.add_argument("--current", action="store_true",
+                        help="only the season being played, e.g. for a daily refresh during the season")
+    parser.add_argument("--force", action="store_true", help="re-scrape seasons even if they're up to date")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip players and teams already journaled by an interrupted run")
+    parser.add_argument("--vorp-source", choices=["rosters", "league"], default="rosters",
+                        help="how top10VORPold.py gets VORPs (default: rosters, matching the existing merged rows; league is one fetch per season)")
+    parser.add_argument("--report", default=REPORT_PATH,
+                        help=f"where to write the JSON run report of the scrapers (default: {REPORT_PATH})")
+    parser.add_argument("--progress", action="store_true", help="show a live progress/ETA line on stderr")
+    args = parser.parse_args()
+    seasons = [current_season()] if args.current or not args.seasons else args.seasons
+    build(seasons, force=args.force, resume=args.resume, vorp_source=args.vorp_source, report_path=args.report,
+          progress=args.progress)
@@ -0,0 +1,67 @@
+import re
+import time
+from datetime import date, datetime
+
+# How long a cached page can be used before it has to be revalidated, by the season it's for:
+#   - a finished season's page never expires, once it was fetched after that season ended
+#     (a 2016 roster or team page scraped in 2024 will never change again);
+#   - a page for the season being played expires after CURRENT_SEASON_TTL;
+#   - a page that isn't tied to a season (the player index, 2K team pages) after DEFAULT_TTL.
+# An expired page isn't thrown away: it's revalidated with a conditional request
+# (If-None-Match / If-Modified-Since), so an unchanged page costs a 304 with no body.
+# The season comes from the URL where it's in it (/leagues/NBA_2016.html, /teams/BOS/2016.html,
+# /wiki/2015-16_Boston_Celtics_season); callers pass it for pages like player pages that hold
+# every season, naming the season they need from the page.
+
+CURRENT_SEASON_TTL = 6 * 60 * 60
+DEFAULT_TTL = 24 * 60 * 60
+
+SEASON_URL_RES = [
+    re.compile(r"/leagues/NBA_(\d{4})"),
+    re.compile(r"/teams/[A-Z]{3}/(\d{4})\.html"),
+]
+WIKI_SEASON_RE = re.compile(r"/wiki/(\d{4})[-–]\d{2}_")
+
+
+def current_season(today=None):
+    """End year of the season being played (or most recently finished) on `today`."""
+    today = today or date.today()
+    return today.year + 1 if today.month >= 10 else today.year
+
+
+def season_finished(season, today=None):
+    """True once the season's playoffs are over (taken as July 1st of its end year)."""
+    return (today or date.today()) >= date(season, 7, 1)
+
+
+def season_end(season):
+    """Timestamp from which a page for `season` is final."""
+    return datetime(season, 7, 1).timestamp()
+
+
+def season_of_url(url):
+    """The season end year a URL is for, e.g. 2016 for /teams/BOS/2016.html, or None."""
+    for pattern in SEASON_URL_RES:
+        match = pattern.search(url)
+        if match:
+            return int(match.group(1))
+    match = WIKI_SEASON_RE.search(url)
+    return int(match.group(1)) + 1 if match else None
+
+
+def ttl(url, season=None):
+    """Seconds a page fetched for `season` stays fresh, or None if it never expires once final."""
+    season = season if season is not None else season_of_url(url)
+    if season is None:
+        return DEFAULT_TTL
+    return None if season_finished(season) else CURRENT_SEASON_TTL
+
+
+def is_fresh(url, checked_at, season=None, now=None):
+    """True if a copy of `url` last fetched or revalidated at `checked_at` can be used as is."""
+    now = now or time.time()
+    season = season if season is not None else season_of_url(url)
+    max_age = ttl(url, season)
+    if max_age is None:
+        return checked_at >= season_end(season)
+    return now - checked_at < max_age
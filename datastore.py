@@ -0,0 +1,158 @@
+import argparse
+import csv
+import glob
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# A season-partitioned Parquet store for the scraped and merged datasets:
+#   datastore/<dataset>/<season>.parquet
+# Each partition holds one season with a typed schema, so adding a season writes a single file and
+# loading reads only the requested seasons and columns, without parsing any text.
+#   python datastore.py import merged merged_nba_data_all_seasons.csv
+#   python datastore.py export merged merged_nba_data_all_seasons.csv
+
+STORE_DIR = "datastore"
+
+VORP_COLUMNS = [f"player{i}vorp" for i in range(1, 10)]
+
+SCHEMAS = {
+    "team_stats": pa.schema([
+        ("team", pa.string()), ("season", pa.int16()), ("seed", pa.int8()), ("win_pct", pa.float64()),
+        ("off_rtg", pa.float64()), ("def_rtg", pa.float64()), ("net_rtg", pa.float64()), ("srs", pa.float64()),
+    ]),
+    "playoff_experience": pa.schema([
+        ("team", pa.string()), ("season", pa.int16()), ("total_playoff_games", pa.int32()),
+    ]),
+    "top9_vorp": pa.schema([("team", pa.string()), ("season", pa.int16())]
+                           + [(column, pa.float64()) for column in VORP_COLUMNS]),
+    "merged": pa.schema([
+        ("team", pa.string()), ("season", pa.int16()), ("seed", pa.int8()), ("win_pct", pa.float64()),
+        ("off_rtg", pa.float64()), ("def_rtg", pa.float64()), ("net_rtg", pa.float64()), ("srs", pa.float64()),
+        ("total_playoff_games", pa.int32()),
+    ] + [(column, pa.float64()) for column in VORP_COLUMNS] + [("champ_scr", pa.float64())]),
+}
+
+# CSV headers that differ from the store's column names.
+CSV_COLUMN_NAMES = {
+    "playoff_experience": {"Team": "team", "Season": "season", "Total Playoff Games": "total_playoff_games"},
+}
+
+
+def partition_path(dataset, season, store_dir=STORE_DIR):
+    return os.path.join(store_dir, dataset, f"{season}.parquet")
+
+
+def stored_seasons(dataset, store_dir=STORE_DIR):
+    paths = glob.glob(os.path.join(store_dir, dataset, "*.parquet"))
+    return sorted(int(os.path.basename(path).split(".")[0]) for path in paths)
+
+
+def require_seasons(dataset, store_dir=STORE_DIR):
+    """
+    The seasons stored for `dataset`. The store isn't checked in (datastore/ is gitignored), so if
+    there are none this raises FileNotFoundError saying how to fill it.
+    """
+    seasons = stored_seasons(dataset, store_dir)
+    if not seasons:
+        source = "merged_nba_data_all_seasons.csv" if dataset == "merged" else "<csv>"
+        raise FileNotFoundError(
+            f"No {dataset} data in {os.path.join(store_dir, dataset)}/. Fill the store first with "
+            f"`python datastore.py import {dataset} {source}` or `python build_dataset.py --seasons <first>-<last>`.")
+    return seasons
+
+
+def convert(value, field_type):
+    """Convert a CSV cell (or an already typed value) to the Python value of `field_type`."""
+    if value is None or value == "":
+        return None
+    if pa.types.is_integer(field_type):
+        return int(float(value))
+    if pa.types.is_floating(field_type):
+        return float(value)
+    return str(value)
+
+
+def to_table(dataset, rows):
+    """Build a typed table from dicts keyed by column name (values may be CSV strings)."""
+    schema = SCHEMAS[dataset]
+    renames = CSV_COLUMN_NAMES.get(dataset, {})
+    rows = [{renames.get(key, key): value for key, value in row.items()} for row in rows]
+    columns = {field.name: [convert(row.get(field.name), field.type) for row in rows] for field in schema}
+    return pa.table(columns, schema=schema)
+
+
+def write_partition(dataset, season, rows, store_dir=STORE_DIR):
+    """Write (or replace) one season of `dataset`. The other seasons' files are left alone."""
+    table = to_table(dataset, rows)
+    path = partition_path(dataset, season, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Written next to the partition and renamed over it, so a crash never leaves a half-written file.
+    pq.write_table(table, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def load_table(dataset, columns=None, seasons=None, store_dir=STORE_DIR):
+    """
+    Read `columns` (default: all) of the given `seasons` (default: all stored) as one Arrow table.
+    Raises FileNotFoundError if nothing at all is stored for `dataset`.
+    """
+    available = require_seasons(dataset, store_dir)
+    seasons = available if seasons is None else [season for season in seasons if season in available]
+    schema = SCHEMAS[dataset]
+    if columns is not None:
+        schema = pa.schema([schema.field(column) for column in columns])
+    tables = [pq.read_table(partition_path(dataset, season, store_dir), columns=columns) for season in seasons]
+    if not tables:
+        return schema.empty_table()
+    return pa.concat_tables(tables)
+
+
+def load(dataset, columns=None, seasons=None, store_dir=STORE_DIR):
+    """Like load_table(), as a pandas DataFrame."""
+    return load_table(dataset, columns, seasons, store_dir).to_pandas()
+
+
+def import_csv(dataset, csv_path, store_dir=STORE_DIR):
+    """Split a CSV by season and write each season as a partition. Returns the seasons written."""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    season_column = "Season" if "Season" in CSV_COLUMN_NAMES.get(dataset, {}) else "season"
+    by_season = {}
+    for row in rows:
+        by_season.setdefault(int(row[season_column]), []).append(row)
+    for season, season_rows in sorted(by_season.items()):
+        write_partition(dataset, season, season_rows, store_dir)
+    return sorted(by_season)
+
+
+def format_value(value):
+    if value is None or value != value:  # None or NaN
+        return ""
+    return value
+
+
+def export_csv(dataset, csv_path, seasons=None, store_dir=STORE_DIR):
+    """Write `dataset` back out as a single CSV with the store's column names."""
+    table = load_table(dataset, seasons=seasons, store_dir=store_dir)
+    with open(csv_path, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(table.column_names)
+        for row in table.to_pylist():
+            writer.writerow([format_value(value) for value in row.values()])
+    print(f"✅ {table.num_rows} rows of {dataset} written to {csv_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import CSVs into or export CSVs from the Parquet store.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("dataset", choices=sorted(SCHEMAS))
+    parser.add_argument("csv_path")
+    args = parser.parse_args()
+    if args.command == "import":
+        seasons = import_csv(args.dataset, args.csv_path)
+        print(f"✅ {args.dataset}: wrote seasons {', '.join(map(str, seasons))} to {STORE_DIR}/")
+    else:
+        export_csv(args.dataset, args.csv_path)
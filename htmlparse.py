@@ -0,0 +1,121 @@
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Shared HTML parsing helpers for the scrapers.
+# Pages are parsed with lxml when it's installed (C-backed, several times faster than the
+# pure-Python html.parser), and each helper only builds a tree for the element it needs
+# instead of the whole page.
+
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+
+def make_soup(markup, parse_only=None):
+    """BeautifulSoup with the fastest available parser, optionally restricted by a SoupStrainer."""
+    return BeautifulSoup(markup, PARSER, parse_only=parse_only)
+
+
+def page_title(html):
+    """Return the text of the page's <title>, without parsing the page."""
+    match = TITLE_RE.search(html)
+    if not match:
+        return None
+    return BeautifulSoup(match.group(1), "html.parser").get_text().strip()
+
+
+def parse_tables(html, **attrs):
+    """Parse only the <table> elements matching `attrs` (e.g. id=["advanced", "per_game_stats"])."""
+    return make_soup(html, SoupStrainer("table", attrs=attrs))
+
+
+def find_table(html, table_id):
+    """Return the <table id=table_id> from the page's main HTML, or None."""
+    return find_element_by_id(html, "table", table_id)
+
+
+def find_captioned_tables(html, caption_text):
+    """Return every table whose <caption> contains `caption_text` (e.g. a Wikipedia roster)."""
+    soup = parse_tables(html)
+    tables = []
+    for caption in soup.find_all("caption"):
+        if caption_text in caption.text:
+            table = caption.find_parent("table")
+            if table:
+                tables.append(table)
+    return tables
+
+
+def find_after(html, anchor_id, name, attrs=None):
+    """
+    Return the first `name` element (matching `attrs`) that comes after the element with
+    id=anchor_id, e.g. the Playoffs wikitable that follows the "Playoffs" heading.
+    Only the part of the page after the anchor is parsed.
+    """
+    match = re.search(r'\bid="%s"' % re.escape(anchor_id), html)
+    if not match:
+        return None
+    # Skip past the rest of the anchor's opening tag before parsing.
+    start = html.find(">", match.end())
+    if start == -1:
+        return None
+    # The strainer only matches on the tag name: it compares class="wikitable sortable" as one
+    # string, while find() matches each of the element's classes.
+    soup = make_soup(html[start + 1:], SoupStrainer(name))
+    return soup.find(name, attrs=attrs or {})
+
+
+def find_commented_tables(html, table_ids):
+    """
+    Find tables that are shipped inside HTML comments (Basketball Reference hides most of its tables
+    this way). The page is scanned as a plain string for each id="..." and only the comment that
+    contains it is parsed, so the dozens of other commented blocks are never touched. All ids are
+    located in a single pass. Returns {table_id: table} for the ids that were found.
+    """
+    if not table_ids:
+        return {}
+    pattern = re.compile(r'<table\b[^>]*?\bid="(%s)"' % "|".join(re.escape(table_id) for table_id in table_ids))
+    ids_by_comment = {}
+    for match in pattern.finditer(html):
+        comment_start = html.rfind("<!--", 0, match.start())
+        if comment_start == -1 or html.rfind("-->", comment_start, match.start()) != -1:
+            continue  # Not inside a comment.
+        comment_end = html.find("-->", match.end())
+        if comment_end == -1:
+            continue
+        ids_by_comment.setdefault((comment_start + 4, comment_end), []).append(match.group(1))
+
+    tables = {}
+    for (start, end), ids in ids_by_comment.items():
+        ids = [table_id for table_id in ids if table_id not in tables]
+        if not ids:
+            continue
+        fragment = parse_tables(html[start:end], id=ids)
+        for table_id in ids:
+            table = fragment.find("table", id=table_id)
+            if table is not None:
+                tables[table_id] = table
+    return tables
+
+
+def find_tables(html, table_ids):
+    """
+    Return {table_id: table or None} for every id, whether the table is in the main HTML or in a comment.
+    Only the wanted tables are parsed.
+    """
+    soup = parse_tables(html, id=list(table_ids))
+    tables = {table_id: soup.find("table", id=table_id) for table_id in table_ids}
+    missing = [table_id for table_id, table in tables.items() if table is None]
+    if missing:
+        tables.update(find_commented_tables(html, missing))
+    return tables
+
+
+def find_element_by_id(html, name, element_id):
+    """Return the `name` element with id=element_id, parsing only that element."""
+    return make_soup(html, SoupStrainer(name, id=element_id)).find(name, id=element_id)
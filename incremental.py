@@ -0,0 +1,100 @@
+import copy
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from train_model import FEATURE_COLS, TARGET
+
+# Warm-start updates of a fitted model (StandardScaler + RandomForestRegressor) when the dataset
+# changes during the season, instead of refitting from scratch:
+#   1. The scaler is rebuilt from per-season sufficient statistics (count, sum, sum of squares),
+#      so only the seasons whose rows changed are re-read.
+#   2. The existing trees are moved into the new scaled space by rewriting their split thresholds.
+#      A split on x_scaled <= t is x <= t * s + m in raw units, which is
+#      x_new_scaled <= (t * s + m - m2) / s2 with the new mean m2 and scale s2. Predictions of the
+#      old trees are unchanged by this, except for a value lying exactly on a split (e.g. 4.9 VORP
+#      between 4.8 and 5.0), which float32 rounding can send either way in either space.
+#   3. New trees are grown on the current data with warm_start and added to the forest.
+
+# Trees grown by each update, and the most trees kept (the oldest are dropped beyond it).
+N_NEW_TREES = 25
+MAX_TREES = 400
+
+
+def season_hashes(df):
+    """{season: hash of its rows}, to tell which seasons changed since the model was fitted."""
+    return {int(season): int(pd.util.hash_pandas_object(rows[['team', TARGET] + FEATURE_COLS], index=False).sum())
+            for season, rows in df.groupby('season')}
+
+
+def season_stats(df):
+    """{season: (count, sum, sum of squares)} of every feature, ignoring missing values like StandardScaler does."""
+    stats = {}
+    for season, rows in df.groupby('season'):
+        values = rows[FEATURE_COLS].to_numpy(float)
+        present = ~np.isnan(values)
+        values = np.where(present, values, 0.0)
+        stats[int(season)] = (present.sum(axis=0), values.sum(axis=0), (values ** 2).sum(axis=0))
+    return stats
+
+
+def scaler_from_stats(stats):
+    """A fitted StandardScaler equivalent to fitting on every season in `stats`."""
+    count, total, squares = (np.sum(parts, axis=0) for parts in zip(*stats.values()))
+    mean = total / count
+    var = np.maximum(squares / count - mean ** 2, 0.0)
+    scaler = StandardScaler()
+    scaler.mean_, scaler.var_ = mean, var
+    scaler.scale_ = np.where(var > 0, np.sqrt(var), 1.0)
+    scaler.n_samples_seen_ = count if len(set(count)) > 1 else int(count[0])
+    scaler.n_features_in_ = len(FEATURE_COLS)
+    scaler.feature_names_in_ = np.array(FEATURE_COLS, dtype=object)
+    return scaler
+
+
+def rescale_thresholds(forest, old_scaler, new_scaler):
+    """Rewrite the split thresholds of every tree in `forest` from `old_scaler`'s space to `new_scaler`'s."""
+    for tree in forest.estimators_:
+        feature = tree.tree_.feature
+        threshold = tree.tree_.threshold  # A view: writing to it changes the tree.
+        split = feature >= 0  # Leaves have feature -2.
+        f = feature[split]
+        raw = threshold[split] * old_scaler.scale_[f] + old_scaler.mean_[f]
+        threshold[split] = (raw - new_scaler.mean_[f]) / new_scaler.scale_[f]
+
+
+def changed_seasons(artifact, hashes):
+    old = artifact.get("season_hashes", {})
+    return sorted(season for season, value in hashes.items() if old.get(season) != value)
+
+
+def update_model(artifact, df, new_trees=N_NEW_TREES, max_trees=MAX_TREES):
+    """
+    Return a new artifact for `df`, built from `artifact` by re-fitting only the scaler statistics
+    of changed seasons, moving the old trees into the new scaled space and growing `new_trees` more.
+    `artifact` itself is left as it was.
+    """
+    artifact = copy.deepcopy(artifact)
+    model = artifact["model"]
+    old_scaler, forest = model[0], model[-1]
+
+    hashes = season_hashes(df)
+    changed = changed_seasons(artifact, hashes)
+    stats = {season: values for season, values in artifact.get("season_stats", {}).items()
+             if season in hashes and season not in changed}
+    stats.update(season_stats(df[df['season'].isin(changed)] if stats else df))
+    new_scaler = scaler_from_stats(stats)
+    rescale_thresholds(forest, old_scaler, new_scaler)
+
+    # Keep the newest trees when the forest would outgrow max_trees.
+    keep = max(0, max_trees - new_trees)
+    forest.estimators_ = forest.estimators_[-keep:] if keep else []
+    forest.set_params(warm_start=True, n_estimators=len(forest.estimators_) + new_trees, n_jobs=-1)
+    forest.fit(new_scaler.transform(df[FEATURE_COLS]), df[TARGET])
+    forest.set_params(warm_start=False, n_jobs=1)
+
+    model.steps[0] = (model.steps[0][0], new_scaler)
+    artifact.update(season_stats=stats, season_hashes=hashes, seasons=sorted(hashes),
+                    updated_seasons=changed)
+    return artifact
@@ -0,0 +1,50 @@
+import json
+import os
+
+
+class Journal:
+    """
+    An append-only JSON-lines journal of completed work, so an interrupted scraper run can pick up
+    where it left off instead of starting from scratch. Every record is flushed and fsynced as soon
+    as it's written. Records are keyed by `key_fields`, e.g. ("season", "team", "player").
+    """
+
+    def __init__(self, path, key_fields, resume=False):
+        self.path = path
+        self.key_fields = tuple(key_fields)
+        self.records = {}
+        if resume and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A line cut short by a crash.
+                    self.records[self.key(record)] = record
+            print(f"📒 Resuming from {path}: {len(self.records)} records already done")
+        # Without --resume the journal starts over, like the CSV it backs.
+        self.file = open(path, "a" if resume else "w", encoding="utf-8")
+        if resume and self.file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self.file.write("\n")  # Don't glue the next record onto a half-written one.
+
+    def key(self, record):
+        return tuple(record[field] for field in self.key_fields)
+
+    def get(self, *key):
+        """Return the finished record for `key`, or None if that work still has to be done."""
+        return self.records.get(tuple(key))
+
+    def __contains__(self, key):
+        return tuple(key) in self.records
+
+    def append(self, record):
+        self.records[self.key(record)] = record
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,383 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import timezone
+
+import cachepolicy
+from runstats import stats
+
+try:
+    import zstandard
+    CODEC = "zstd"
+except ImportError:
+    zstandard = None
+    CODEC = "zlib"
+
+# The page store every scraper shares (page_cache.sqlite), so a page fetched by one script
+# is a cache hit for the others. Each page is stored with its ETag / Last-Modified and the times it
+# was fetched and last checked; cachepolicy.py decides how long a copy can be used before it has to
+# be revalidated. The async scrapers go through asyncfetch.safe_get(), the requests/cloudscraper
+# ones through cached_get().
+#
+# Bodies are content-addressed: `urls` maps each URL (with its fetch time, validators and charset)
+# to the SHA-256 of its body, and `blobs` holds every distinct body once, compressed with zstd (or
+# zlib if the zstandard package isn't installed). Basketball Reference pages are large and mostly
+# markup, so they shrink several times over, and a page that comes back unchanged, or under two
+# URLs, costs no extra space. Once the compressed bodies outgrow MAX_STORE_BYTES, the least recently
+# used pages are evicted; `python pagecache.py prune` does the same on demand.
+#
+# This replaces aiohttp_client_cache, which can't revalidate and deletes an expired page outright.
+# Its file (basketball_cache.sqlite) has a different schema, so the store uses a file of its own.
+# Pages it cached before can be carried over with:
+#   python pagecache.py import-aiohttp
+
+CACHE_PATH = "page_cache.sqlite"
+AIOHTTP_CACHE_NAME = "basketball_cache"
+CHARSET_RE = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+
+# Compressed bytes the store may hold before the least recently used pages are evicted, down to
+# EVICT_TO of the limit so that eviction doesn't run again on the very next page.
+MAX_STORE_BYTES = 1024 ** 3
+EVICT_TO = 0.9
+
+# A page's last-used time is only written back when it's older than this, so cache hits stay reads.
+USED_AT_RESOLUTION = 60 * 60
+
+
+def charset_of(content_type, default="utf-8"):
+    """The charset of a Content-Type header value, or `default` if it names none."""
+    match = CHARSET_RE.search(content_type or "")
+    return match.group(1) if match else default
+
+
+def compress(body, codec):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return zlib.compress(body, ZLIB_LEVEL)
+
+
+def decompress(data, codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("this page store was written with zstd compression: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class Page:
+    """A cached page: its raw body and the validators to revalidate it with."""
+
+    def __init__(self, url, body, encoding, etag, last_modified, fetched_at, checked_at):
+        self.url = url
+        self.body = body
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.checked_at = checked_at
+
+    @property
+    def text(self):
+        return self.body.decode(self.encoding, errors="replace")
+
+
+def conditional_headers(page):
+    """If-None-Match / If-Modified-Since headers to revalidate `page` with (none if there's no page)."""
+    headers = {}
+    if page is not None:
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+    return headers
+
+
+class PageCache:
+    """
+    A persistent SQLite store of pages by URL, with each distinct body stored once, compressed.
+    The connection is opened on first use (so the file lands in the working directory at that
+    point) and shared by every thread, under a lock. Holds at most `max_bytes` of compressed
+    bodies (None for no limit).
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_STORE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.conn = None
+        self.stored_bytes = 0
+        self.lock = threading.Lock()
+
+    def connect(self):
+        if self.conn is None:
+            if not os.path.exists(self.path) and os.path.exists(AIOHTTP_CACHE_NAME + ".sqlite"):
+                print(f"ℹ️ Starting a new page store in {self.path}. Pages cached by aiohttp_client_cache in "
+                      f"{AIOHTTP_CACHE_NAME}.sqlite can be carried over with `python pagecache.py import-aiohttp`.")
+            self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._check_not_aiohttp()
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    codec TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    stored INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS urls (
+                    url TEXT PRIMARY KEY,
+                    hash TEXT NOT NULL REFERENCES blobs (hash),
+                    encoding TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    checked_at REAL NOT NULL,
+                    used_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS urls_hash ON urls (hash);
+                CREATE INDEX IF NOT EXISTS urls_fetched_at ON urls (fetched_at);
+                CREATE INDEX IF NOT EXISTS urls_used_at ON urls (used_at);
+            """)
+            self.stored_bytes = self.conn.execute("SELECT COALESCE(SUM(stored), 0) FROM blobs").fetchone()[0]
+        return self.conn
+
+    def _check_not_aiohttp(self):
+        """Refuse to open an aiohttp_client_cache file (a `responses` table of pickled responses) as a store."""
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "responses" in tables and "urls" not in tables:
+            self.conn.close()
+            self.conn = None
+            raise RuntimeError(f"{self.path} is an aiohttp_client_cache cache, not a page store. Import its "
+                               f"pages with `python pagecache.py --path {CACHE_PATH} import-aiohttp "
+                               f"--cache {os.path.splitext(self.path)[0]}`.")
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def get(self, url):
+        """The cached Page for `url`, fresh or not, or None."""
+        with self.lock:
+            row = self.connect().execute(
+                "SELECT url, data, codec, encoding, etag, last_modified, fetched_at, checked_at, used_at"
+                " FROM urls JOIN blobs USING (hash) WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if row[8] < now - USED_AT_RESOLUTION:
+                with self.conn:
+                    self.conn.execute("UPDATE urls SET used_at = ? WHERE url = ?", (now, url))
+        url, data, codec, *rest, _ = row
+        return Page(url, decompress(data, codec), *rest)
+
+    def put(self, url, body, headers, fetched_at=None):
+        """Store a 200 response's body and validators; returns the new Page."""
+        now = fetched_at or time.time()
+        page = Page(url, bytes(body), charset_of(headers.get("Content-Type")), headers.get("ETag"),
+                    headers.get("Last-Modified"), now, now)
+        with self.lock, self.connect():
+            self._store(page)
+            if self.max_bytes is not None and self.stored_bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * EVICT_TO), keep=url)
+        return page
+
+    def _store(self, page):
+        digest = hashlib.sha256(page.body).hexdigest()
+        if not self.conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone():
+            data = compress(page.body, CODEC)
+            self.conn.execute("INSERT INTO blobs (hash, codec, data, size, stored) VALUES (?, ?, ?, ?, ?)",
+                              (digest, CODEC, data, len(page.body), len(data)))
+            self.stored_bytes += len(data)
+        old = self.conn.execute("SELECT hash FROM urls WHERE url = ?", (page.url,)).fetchone()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO urls (url, hash, encoding, etag, last_modified, fetched_at, checked_at, used_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (page.url, digest, page.encoding, page.etag, page.last_modified, page.fetched_at, page.checked_at,
+             time.time()))
+        if old and old[0] != digest:
+            self._drop_orphans(old[0])
+
+    def _drop_orphans(self, digest=None):
+        """Delete the bodies no URL points to any more (or only body `digest`, if that's the case for it)."""
+        if digest is None:
+            self.conn.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT hash FROM urls)")
+        else:
+            self.conn.execute("DELETE FROM blobs WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM urls WHERE hash = ?)",
+                              (digest, digest))
+        self.stored_bytes = self.conn.execute("SELECT COALESCE(SUM(stored), 0) FROM blobs").fetchone()[0]
+
+    def _evict(self, max_bytes, keep=None):
+        """Delete the least recently used pages (but not `keep`) until the bodies fit in `max_bytes`. Returns the count."""
+        evicted = 0
+        candidates = self.conn.execute(
+            "SELECT url, hash, stored FROM urls JOIN blobs USING (hash) WHERE url IS NOT ? ORDER BY used_at",
+            (keep,)).fetchall()
+        for url, digest, stored in candidates:
+            if self.stored_bytes <= max_bytes:
+                break
+            self.conn.execute("DELETE FROM urls WHERE url = ?", (url,))
+            if not self.conn.execute("SELECT 1 FROM urls WHERE hash = ?", (digest,)).fetchone():
+                self.conn.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+                self.stored_bytes -= stored
+            evicted += 1
+        return evicted
+
+    def touch(self, url):
+        """Mark the cached copy of `url` as just revalidated (the server answered 304 Not Modified)."""
+        now = time.time()
+        with self.lock, self.connect():
+            self.conn.execute("UPDATE urls SET checked_at = ?, used_at = ? WHERE url = ?", (now, now, url))
+
+    def prune(self, max_bytes=None, unused_for=None, vacuum=False):
+        """
+        Drop pages not used in the last `unused_for` seconds, then evict down to `max_bytes` of
+        compressed bodies (default: the store's own limit). VACUUM gives the space back to the
+        file system. Returns (pages removed, bytes freed).
+        """
+        with self.lock, self.connect():
+            before_pages = self.conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+            before_bytes = self.stored_bytes
+            if unused_for is not None:
+                self.conn.execute("DELETE FROM urls WHERE used_at < ?", (time.time() - unused_for,))
+            self._drop_orphans()
+            max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+            if max_bytes is not None:
+                self._evict(max_bytes)
+            removed = before_pages - self.conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+            freed = before_bytes - self.stored_bytes
+        if vacuum:
+            with self.lock:
+                self.conn.execute("VACUUM")
+        return removed, freed
+
+    def summary(self):
+        """Pages, distinct bodies and their sizes: as fetched, deduplicated, and compressed on disk."""
+        with self.lock:
+            conn = self.connect()
+            pages, fetched = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM urls JOIN blobs USING (hash)").fetchone()
+            bodies, unique, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored), 0) FROM blobs").fetchone()
+            oldest, newest = conn.execute("SELECT MIN(fetched_at), MAX(fetched_at) FROM urls").fetchone()
+            codecs = dict(conn.execute("SELECT codec, COUNT(*) FROM blobs GROUP BY codec").fetchall())
+        return {"pages": pages, "bodies": bodies, "fetched_bytes": fetched, "unique_bytes": unique,
+                "stored_bytes": stored, "codecs": codecs, "oldest_fetch": oldest, "newest_fetch": newest}
+
+    def urls(self, fetched_since=None):
+        """Every cached URL, or only those fetched at or after the `fetched_since` timestamp."""
+        with self.lock:
+            return [row[0] for row in self.connect().execute(
+                "SELECT url FROM urls WHERE fetched_at >= ? ORDER BY url", (fetched_since or 0,))]
+
+
+cache = PageCache()
+
+
+def cached_get(url, get, season=None, page_cache=None, scheduler=None):
+    """
+    Return the text of `url` for the synchronous scrapers. `get` is requests.get or a (cloud)scraper
+    session's get. A fresh cached copy is returned as is, a stale one is revalidated with a
+    conditional request, and a new page is stored. `season` is the season the caller needs from the
+    page if the URL doesn't say (see cachepolicy.py). Requests wait for a slot from `scheduler` (a
+    ratelimiter.HostRateScheduler) if one is given. HTTP errors raise like raise_for_status().
+    """
+    page_cache = page_cache or cache
+    start = time.perf_counter()
+    page = page_cache.get(url)
+    fresh = page is not None and cachepolicy.is_fresh(url, page.checked_at, season)
+    stats.cache_lookup(url, fresh, time.perf_counter() - start)
+    if fresh:
+        return page.text
+    if scheduler is not None:
+        stats.rate_limit_wait(url, scheduler.acquire_blocking(url))
+    start = time.perf_counter()
+    try:
+        response = get(url, headers=conditional_headers(page))
+    except Exception:
+        stats.request(url, None, 0, time.perf_counter() - start)
+        raise
+    stats.response(url, response, time.perf_counter() - start)
+    if response.status_code == 304 and page is not None:
+        page_cache.touch(url)
+        return page.text
+    response.raise_for_status()
+    return page_cache.put(url, response.content, response.headers).text
+
+
+async def import_aiohttp(cache_name, page_cache):
+    """Copy every 200 response of the aiohttp_client_cache cache `cache_name` into `page_cache`. Returns the count."""
+    import aiohttp_client_cache
+
+    backend = aiohttp_client_cache.SQLiteBackend(cache_name=cache_name)
+    imported = 0
+    try:
+        async for response in backend.responses.values():
+            if response is None or response.status != 200:
+                continue
+            # Pages keep the time they were fetched (stored as naive UTC), so only those fetched after
+            # their season ended count as final; the rest get revalidated on first use.
+            fetched_at = response.created_at.replace(tzinfo=timezone.utc).timestamp()
+            page_cache.put(str(response.url), await response.read(), response.headers, fetched_at)
+            imported += 1
+    finally:
+        await backend.close()
+    return imported
+
+
+def print_summary(summary, path):
+    mb = 1024 * 1024
+    print(f"📦 {path}: {summary['pages']} pages, {summary['bodies']} distinct bodies "
+          f"({', '.join(f'{codec} {n}' for codec, n in summary['codecs'].items()) or 'empty'})")
+    print(f"   fetched {summary['fetched_bytes'] / mb:.1f} MB, deduplicated {summary['unique_bytes'] / mb:.1f} MB, "
+          f"stored {summary['stored_bytes'] / mb:.1f} MB", end="")
+    if summary["stored_bytes"]:
+        print(f" ({summary['fetched_bytes'] / summary['stored_bytes']:.1f}x smaller)")
+    else:
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the shared page store.")
+    parser.add_argument("--path", default=CACHE_PATH, help=f"page store file (default: {CACHE_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="show how many pages are stored and how much space they take")
+    list_parser = commands.add_parser("list", help="list the cached URLs")
+    list_parser.add_argument("--since-days", type=float, help="only pages fetched in the last N days")
+    prune_parser = commands.add_parser("prune", help="evict pages to free space")
+    prune_parser.add_argument("--max-mb", type=float,
+                              help=f"evict least recently used pages down to this size "
+                                   f"(default: {MAX_STORE_BYTES // (1024 * 1024)} MB)")
+    prune_parser.add_argument("--unused-days", type=float, help="drop every page not used in the last N days")
+    prune_parser.add_argument("--no-vacuum", action="store_true", help="don't shrink the file afterwards")
+    import_parser = commands.add_parser("import-aiohttp", help="import the pages of an aiohttp_client_cache cache")
+    import_parser.add_argument("--cache", default=AIOHTTP_CACHE_NAME,
+                               help=f"aiohttp cache name (default: {AIOHTTP_CACHE_NAME})")
+    args = parser.parse_args()
+
+    store = PageCache(args.path)
+    if args.command == "import-aiohttp":
+        count = asyncio.run(import_aiohttp(args.cache, store))
+        print(f"✅ {count} pages imported into {store.path}")
+    elif args.command == "prune":
+        max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+        unused_for = args.unused_days * 24 * 60 * 60 if args.unused_days is not None else None
+        removed, freed = store.prune(max_bytes, unused_for, vacuum=not args.no_vacuum)
+        print(f"🧹 Removed {removed} pages, freed {freed / (1024 * 1024):.1f} MB")
+        print_summary(store.summary(), store.path)
+    elif args.command == "stats":
+        print_summary(store.summary(), store.path)
+    else:
+        since = time.time() - args.since_days * 24 * 60 * 60 if args.since_days is not None else None
+        for url in store.urls(since):
+            print(url)
+    store.close()
@@ -0,0 +1,175 @@
+import difflib
+import re
+import sqlite3
+import string
+import time
+import unicodedata
+
+import sites
+from htmlparse import find_table
+from runstats import timed
+
+# Local name -> slug index built from Basketball Reference's per-letter player index pages
+# (https://www.basketball-reference.com/players/a/ ... /z/). Building it takes one fetch per letter,
+# after which resolving a Wikipedia roster name to a BBR page is a local lookup instead of
+# probing lastnfi01 ... lastnfi08 slugs over the network.
+# A letter is fetched again once it's older than INDEX_TTL, and every letter when a season past
+# every year_max in the index is asked for (new rookies, and active players still listed up to last
+# season). Players active in the index's newest season are matched for any later season too, so a
+# lookup never misses an active player just because the index hasn't caught up yet.
+
+INDEX_PATH = "player_index.sqlite"
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+
+# How close (0-1) a fuzzy match has to be before we consider it.
+FUZZY_CUTOFF = 0.82
+
+INDEX_TTL = 7 * 24 * 60 * 60
+
+# Players active in `season`. Those active in the index's newest season count as active from then on.
+ACTIVE_IN = "year_min <= ? AND (? <= year_max OR year_max = (SELECT MAX(year_max) FROM players))"
+
+
+def ascii_only(text):
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def normalize_name(name):
+    """
+    Normalize a player name for matching: ASCII only, lower case, no punctuation and no
+    generational suffixes, e.g. "P.J. Tucker" -> "pj tucker", "Nikola Jokić" -> "nikola jokic",
+    "Gary Trent Jr." -> "gary trent".
+    """
+    name = ascii_only(name).lower()
+    name = re.sub(r"[^\w\s-]", "", name).replace("-", " ")
+    tokens = [token for token in name.split() if token not in SUFFIXES]
+    return " ".join(tokens)
+
+
+@timed("parse")
+def parse_player_index(html):
+    """Return (slug, name, year_min, year_max) for every player on a per-letter index page."""
+    table = find_table(html, "players")
+    if not table:
+        return []
+    players = []
+    for row in table.find_all("tr"):
+        link = row.find("a", href=re.compile(r"^/players/[a-z]/[a-z0-9]+\.html$"))
+        if not link:
+            continue
+        slug = link["href"].rsplit("/", 1)[-1][:-len(".html")]
+        year_min = row.find("td", {"data-stat": "year_min"})
+        year_max = row.find("td", {"data-stat": "year_max"})
+        try:
+            year_min = int(year_min.get_text(strip=True)) if year_min else None
+            year_max = int(year_max.get_text(strip=True)) if year_max else None
+        except ValueError:
+            year_min = year_max = None
+        players.append((slug, link.get_text(strip=True), year_min, year_max))
+    return players
+
+
+def player_url(slug):
+    return sites.url("basketball-reference", f"/players/{slug[0]}/{slug}.html")
+
+
+class PlayerIndex:
+    """A persistent SQLite index of every Basketball Reference player: slug, name and active seasons."""
+
+    def __init__(self, path=INDEX_PATH):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS players (
+                slug TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                norm_name TEXT NOT NULL,
+                year_min INTEGER,
+                year_max INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS players_norm_name ON players (norm_name);
+            CREATE TABLE IF NOT EXISTS letters (
+                letter TEXT PRIMARY KEY,
+                fetched_at REAL NOT NULL
+            );
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def missing_letters(self):
+        fetched = {row[0] for row in self.conn.execute("SELECT letter FROM letters")}
+        return [letter for letter in string.ascii_lowercase if letter not in fetched]
+
+    def stale_letters(self, season=None, now=None):
+        """
+        Fetched letters that are older than INDEX_TTL. With a `season` past every year_max in the
+        index (the pages predate that season), all of them.
+        """
+        cutoff = (now or time.time()) - INDEX_TTL
+        newest = self.conn.execute("SELECT MAX(year_max) FROM players").fetchone()[0]
+        outdated = season is not None and newest is not None and season > newest
+        return [letter for letter, fetched_at in self.conn.execute("SELECT letter, fetched_at FROM letters ORDER BY letter")
+                if outdated or fetched_at < cutoff]
+
+    def add_players(self, letter, players):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO players (slug, name, norm_name, year_min, year_max) VALUES (?, ?, ?, ?, ?)",
+                [(slug, name, normalize_name(name), year_min, year_max) for slug, name, year_min, year_max in players])
+            self.conn.execute("INSERT OR REPLACE INTO letters (letter, fetched_at) VALUES (?, ?)",
+                              (letter, time.time()))
+
+    def _exact(self, norm, season):
+        if season is None:
+            rows = self.conn.execute("SELECT slug FROM players WHERE norm_name = ? ORDER BY slug", (norm,))
+        else:
+            rows = self.conn.execute(f"SELECT slug FROM players WHERE norm_name = ? AND {ACTIVE_IN} ORDER BY slug",
+                                     (norm, season, season))
+        return [row[0] for row in rows]
+
+    def _active_in(self, season):
+        if season is None:
+            return self.conn.execute("SELECT slug, norm_name FROM players").fetchall()
+        return self.conn.execute(f"SELECT slug, norm_name FROM players WHERE {ACTIVE_IN}", (season, season)).fetchall()
+
+    def lookup(self, player_name, season=None, limit=3):
+        """
+        Return candidate slugs for `player_name`, best first. `season` is the season end year
+        (e.g. 2023) and restricts candidates to players active that season (or still active in the
+        index's newest season, which may predate it). Exact matches on the
+        normalized name come first, then close fuzzy matches for spelling differences between
+        Wikipedia and Basketball Reference.
+        """
+        norm = normalize_name(player_name)
+        if not norm:
+            return []
+        # Exact matches go through the norm_name index; only the fuzzy fallback needs every active player.
+        exact = self._exact(norm, season)
+        if exact:
+            return exact[:limit]
+        slugs_by_name = {}
+        for slug, norm_name in self._active_in(season):
+            slugs_by_name.setdefault(norm_name, []).append(slug)
+        close = difflib.get_close_matches(norm, slugs_by_name.keys(), n=limit, cutoff=FUZZY_CUTOFF)
+        return [slug for name in close for slug in sorted(slugs_by_name[name])][:limit]
+
+
+async def build_player_index(index, fetch, refresh=False, season=None):
+    """
+    Fill `index` from the per-letter index pages. `fetch` is an async callable taking a URL and
+    returning its HTML (or None). Letters already in the index are skipped unless `refresh` is set,
+    or they're stale for looking up players of `season` (see PlayerIndex.stale_letters).
+    """
+    letters = (list(string.ascii_lowercase) if refresh
+               else sorted(index.missing_letters() + index.stale_letters(season)))
+    for letter in letters:
+        url = sites.url("basketball-reference", f"/players/{letter}/")
+        print(f"📇 Indexing Basketball Reference players: {url}")
+        html = await fetch(url)
+        if not html:
+            print(f"⚠️ Could not load player index page: {url}")
+            continue
+        players = parse_player_index(html)
+        if players:
+            index.add_players(letter, players)
+    return index
@@ -0,0 +1,153 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+
+import joblib
+import pandas as pd
+import sklearn
+
+import datastore
+from incremental import season_hashes, season_stats, update_model
+from seasons import parse_season_range
+from train_model import BASELINE_PARAMS, FEATURE_COLS, TARGET, load_training_data, train
+
+# Scores team-seasons with the title model without refitting it every time:
+#   python predict.py                        # the latest season in the store
+#   python predict.py what_if_rosters.csv    # any rows with the model's feature columns
+# The fitted scaler + forest are saved under model_cache/, keyed by a hash of the training data,
+# the hyperparameters and the feature list, and are only refitted when one of those changes.
+# With --incremental, a change in the rows of the seasons a cached model was fitted on (a re-scrape
+# or a manual fix) updates that model (see incremental.py) instead of refitting it. Only finished
+# seasons have a champ_scr, so the season being played isn't training data: refreshing it leaves
+# the model as it is, and a newly finished season (a new set of seasons) is always a full refit.
+
+MODEL_CACHE_DIR = "model_cache"
+
+
+def artifact_key(df, params=BASELINE_PARAMS):
+    """Hash of everything the fitted model depends on."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df[['season', TARGET] + FEATURE_COLS], index=False).to_numpy().tobytes())
+    digest.update(json.dumps({"params": params, "features": FEATURE_COLS, "sklearn": sklearn.__version__},
+                             sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def artifact_path(key, cache_dir=MODEL_CACHE_DIR):
+    return os.path.join(cache_dir, f"{key}.joblib")
+
+
+def metadata_path(key, cache_dir=MODEL_CACHE_DIR):
+    """The JSON sidecar next to an artifact: what it was fitted with, readable without unpickling the model."""
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def artifact_metadata(artifact):
+    return {name: artifact[name] for name in ("key", "params", "features", "seasons")}
+
+
+def latest_artifact(params, seasons, cache_dir=MODEL_CACHE_DIR):
+    """
+    The most recently saved artifact fitted with `params` on exactly `seasons`, or None. Models fitted
+    on other seasons (like bracket_sim.py's, which leave the simulated season out) never match, so an
+    update can't silently drop or add a season. Only the sidecars are read; just the match is loaded.
+    """
+    paths = sorted(glob.glob(os.path.join(cache_dir, "*.json")), key=os.path.getmtime, reverse=True)
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["params"] == params and meta["features"] == FEATURE_COLS and meta["seasons"] == seasons:
+            return joblib.load(artifact_path(meta["key"], cache_dir))
+    return None
+
+
+def get_model(df=None, params=BASELINE_PARAMS, cache_dir=MODEL_CACHE_DIR, incremental=False):
+    """
+    Return the artifact {"model", "features", "params", "seasons", "key", ...} for `df` (default:
+    every finished season) and `params`, loading it from the cache or fitting and caching it on a
+    miss. With `incremental`, a miss updates the latest artifact with the same params and seasons
+    instead, and falls back to fitting when there's none.
+    """
+    df = load_training_data() if df is None else df
+    key = artifact_key(df, params)
+    path = artifact_path(key, cache_dir)
+    if os.path.exists(path):
+        return joblib.load(path)
+
+    seasons = sorted(df['season'].unique().tolist())
+    previous = latest_artifact(params, seasons, cache_dir) if incremental else None
+    if previous is not None:
+        artifact = update_model(previous, df)
+        print(f"🔁 Updated model {previous['key']} -> {key} (changed seasons: {artifact['updated_seasons']})")
+        artifact["key"] = key
+    else:
+        print(f"🔧 No cached model for this data ({key}), fitting one...")
+        model = train(df, params)
+        # Batches are a handful of rows, which one thread scores faster than a pool.
+        model[-1].set_params(n_jobs=1)
+        artifact = {"model": model, "features": FEATURE_COLS, "params": params,
+                    "seasons": seasons, "key": key,
+                    # Kept so a later incremental update only re-reads the seasons that changed.
+                    "season_stats": season_stats(df), "season_hashes": season_hashes(df)}
+    os.makedirs(cache_dir, exist_ok=True)
+    joblib.dump(artifact, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    # Written after the artifact, so a sidecar always has its model next to it.
+    meta_path = metadata_path(key, cache_dir)
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(artifact_metadata(artifact), f)
+    os.replace(meta_path + ".tmp", meta_path)
+    return artifact
+
+
+def score(artifact, rows):
+    """
+    Add the model's `pred_score` and the notebook's `champion_likelihood_%` (the scores as a share
+    of their season's total) to a copy of `rows`.
+    """
+    rows = rows.copy()
+    rows['pred_score'] = artifact["model"].predict(rows[artifact["features"]])
+    if 'season' in rows:
+        totals = rows.groupby('season')['pred_score'].transform('sum')
+    else:
+        totals = rows['pred_score'].sum()
+    rows['champion_likelihood_%'] = rows['pred_score'] / totals * 100
+    return rows
+
+
+def load_rows(path=None, seasons=None):
+    """Rows to score: a CSV of team-seasons, or the given (default: latest) seasons of the store."""
+    if path:
+        return pd.read_csv(path)
+    if seasons is None:
+        seasons = datastore.require_seasons('merged')[-1:]
+    return datastore.load('merged', columns=['team', 'season'] + FEATURE_COLS, seasons=seasons)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score team-seasons with the cached title model.")
+    parser.add_argument("input", nargs="?", help="CSV of rows to score (default: the latest season in the store)")
+    parser.add_argument("--seasons", type=parse_season_range,
+                        help="seasons of the store to score, e.g. 2025 or 2014-2025 (default: the latest)")
+    parser.add_argument("--params", type=json.loads, default=BASELINE_PARAMS,
+                        help='model hyperparameters as JSON, e.g. \'{"n_estimators": 300, "max_depth": 8}\'')
+    parser.add_argument("--output", help="write the scored rows to this CSV")
+    parser.add_argument("--incremental", action="store_true",
+                        help="if rows of the model's seasons changed, update the cached model instead of refitting it")
+    args = parser.parse_args()
+
+    artifact = get_model(params=args.params, incremental=args.incremental)
+    rows = load_rows(args.input, args.seasons)
+    start = time.perf_counter()
+    scored = score(artifact, rows)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    columns = [column for column in ('team', 'season') if column in scored] + ['pred_score', 'champion_likelihood_%']
+    print(scored.sort_values('champion_likelihood_%', ascending=False)[columns].to_string(index=False))
+    print(f"\n⚡ Scored {len(scored)} rows in {elapsed:.1f} ms with model {artifact['key']}")
+    if args.output:
+        scored.to_csv(args.output, index=False)
+        print(f"✅ Scored rows written to {args.output}")
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import sites
+
+# Requests per minute and burst size allowed for each host we scrape.
+# Basketball Reference blocks clients that go over 20 req/min, so it gets no burst.
+# Wikipedia is far more tolerant, so its roster fetches don't need to wait on BBR.
+HOST_RATE_LIMITS = {
+    "www.basketball-reference.com": {"per_minute": 20, "burst": 1},
+    "en.wikipedia.org": {"per_minute": 120, "burst": 5},
+}
+DEFAULT_RATE_LIMIT = {"per_minute": 30, "burst": 1}
+
+# Speed-up applied to the limits of hosts pointed at a local replay server (see sites.py), so a
+# whole-season load test runs in seconds. The real sites are always held to HOST_RATE_LIMITS.
+REPLAY_RATE_SCALE = float(os.environ.get("REPLAY_RATE_SCALE", "1"))
+
+# Extra random delay (in seconds) added on top of each wait so our requests don't land on an exact beat.
+RATE_LIMIT_JITTER = 0.5
+
+
+class TokenBucket:
+    """
+    A token bucket that refills at `per_minute` tokens per minute, holding at most `burst` tokens.
+    Async tasks and synchronous threads can share one bucket: each side queues on its own lock, and
+    the tokens themselves are only ever checked and taken under a thread lock. Async tasks queue on
+    a lock per event loop, since an asyncio.Lock can't be used from a loop other than its own (e.g.
+    a scraper run with asyncio.run() on a worker thread next to the main loop's scrapers).
+    """
+
+    def __init__(self, per_minute, burst=1, jitter=0.0):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.tokens = burst
+        self.jitter = jitter
+        self.updated = time.monotonic()
+        self.loop_locks = weakref.WeakKeyDictionary()
+        self.thread_lock = threading.Lock()
+        self.tokens_lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _take(self):
+        """Take a token and return 0, or return how long to wait before trying again."""
+        with self.tokens_lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate + random.uniform(0, self.jitter)
+
+    def _loop_lock(self):
+        """The asyncio.Lock for the running event loop, created on its first use there."""
+        loop = asyncio.get_running_loop()
+        with self.tokens_lock:
+            lock = self.loop_locks.get(loop)
+            if lock is None:
+                lock = self.loop_locks[loop] = asyncio.Lock()
+        return lock
+
+    async def acquire(self):
+        """Wait until a token is available, take it, and return the number of seconds spent waiting."""
+        waited = 0.0
+        async with self._loop_lock():
+            delay = self._take()
+            while delay:
+                await asyncio.sleep(delay)
+                waited += delay
+                delay = self._take()
+        return waited
+
+    def acquire_blocking(self):
+        """acquire() for synchronous code: sleeps the calling thread until a token is available."""
+        waited = 0.0
+        with self.thread_lock:
+            delay = self._take()
+            while delay:
+                time.sleep(delay)
+                waited += delay
+                delay = self._take()
+        return waited
+
+    def backoff(self, seconds):
+        """Hold back every request for at least `seconds`, e.g. after the server answered 429 Retry-After."""
+        with self.tokens_lock:
+            self._refill()
+            self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class HostRateScheduler:
+    """
+    Hands out request slots per host, so each host is used at its own allowed rate at the same time.
+    One scheduler is shared by everything that fetches in a process (asyncfetch.rate_scheduler), the
+    async scrapers and the synchronous ones on worker threads alike, so that scrapers running side by
+    side stay within a host's limit together.
+    """
+
+    def __init__(self, limits=None, default=None, jitter=RATE_LIMIT_JITTER, replay_scale=None):
+        self.limits = dict(HOST_RATE_LIMITS if limits is None else limits)
+        self.default = default or DEFAULT_RATE_LIMIT
+        self.jitter = jitter
+        self.replay_scale = REPLAY_RATE_SCALE if replay_scale is None else replay_scale
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket_for(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                # A replay server stands in for a real host, so it gets that host's limits.
+                limit = self.limits.get(sites.real_host(url), self.default)
+                per_minute, jitter = limit["per_minute"], self.jitter
+                if sites.is_overridden(url):
+                    per_minute, jitter = per_minute * self.replay_scale, jitter / self.replay_scale
+                bucket = TokenBucket(per_minute, limit.get("burst", 1), jitter)
+                self.buckets[host] = bucket
+        return bucket
+
+    async def acquire(self, url):
+        """Wait for a request slot on the host of `url`. Returns the seconds spent waiting."""
+        return await self.bucket_for(url).acquire()
+
+    def acquire_blocking(self, url):
+        """acquire() for synchronous code, e.g. a requests-based scraper on a worker thread."""
+        return self.bucket_for(url).acquire_blocking()
+
+    def backoff(self, url, seconds):
+        """Hold back every request to the host of `url` for at least `seconds`."""
+        self.bucket_for(url).backoff(seconds)
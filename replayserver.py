@@ -0,0 +1,278 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import time
+from collections import deque
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import unquote, urlsplit
+
+from aiohttp import web
+
+import sites
+from pagecache import CACHE_PATH, PageCache
+from ratelimiter import HOST_RATE_LIMITS
+
+# A local stand-in for Wikipedia, Basketball Reference and 2kratings that serves saved pages,
+# so whole scraper runs can be load-tested offline. Each site gets its own port (in
+# sites.DEFAULT_BASE_URLS order), and the scrapers are pointed at it through sites.py:
+#   python replayserver.py serve --scale 100 --latency 50
+#   WIKIPEDIA_URL=http://127.0.0.1:8801 BASKETBALL_REFERENCE_URL=http://127.0.0.1:8802 \
+#       REPLAY_RATE_SCALE=100 python top10VORPold.py --seasons 2023
+# Like the real sites it can be slow (--latency, --jitter), answer 429 with a Retry-After to a
+# client that sends more than its limit of requests in a window (the real limits, with the window
+# shrunk by --scale; --ban), and throw in random 429s (--error-rate). Every page carries an ETag and
+# Last-Modified, and a conditional request for an unchanged page gets a 304. Pages live in a directory
+# laid out by URL, e.g. wikipedia/wiki/LeBron_James.html for /wiki/LeBron_James. The default is the
+# synthetic set in benchmarks/fixtures/ (benchmarks/make_fixtures.py); `python replayserver.py record`
+# fills one with real pages from the scrapers' page cache.
+
+PAGES_DIR = os.path.join("benchmarks", "fixtures")
+DEFAULT_PORT = 8801
+
+
+def page_file(path):
+    """The file under a site's directory that holds the page at URL path `path`, or None for a bad path."""
+    local = path.lstrip("/")
+    if not local or local.endswith("/"):
+        local += "index.html"
+    elif not os.path.splitext(local)[1]:
+        local += ".html"
+    if any(part in ("", ".", "..") for part in local.split("/")):
+        return None
+    return local
+
+
+class ClientWindow:
+    """One client's requests to a site over the last `window` seconds, of which at most `requests` are allowed."""
+
+    def __init__(self, requests, window):
+        self.requests = requests
+        self.window = window
+        self.times = deque()
+        self.banned_until = 0.0
+
+    def take(self, ban=0.0):
+        """Count a request and return 0, or return the seconds until the client may send one if it's over the limit."""
+        now = time.monotonic()
+        if now < self.banned_until:
+            return self.banned_until - now
+        while self.times and self.times[0] <= now - self.window:
+            self.times.popleft()
+        if len(self.times) < self.requests:
+            self.times.append(now)
+            return 0.0
+        if ban:
+            self.banned_until = now + ban
+            return ban
+        return self.times[0] + self.window - now
+
+
+class ReplayServer:
+    """
+    Serves the pages under `pages_dir` for every site in sites.DEFAULT_BASE_URLS.
+    `limits` is {site: {"requests": ..., "window": seconds}} and applies to each client (remote address)
+    separately. Every response is counted in `stats`, which is also served as JSON at /_stats.
+    """
+
+    def __init__(self, pages_dir=PAGES_DIR, latency=0.0, jitter=0.0, error_rate=0.0, retry_after=1,
+                 limits=None, ban=0.0, seed=0):
+        self.pages_dir = pages_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.limits = limits or {}
+        self.ban = ban
+        self.random = random.Random(seed)
+        self.windows = {}
+        self.runners = []
+        self.base_urls = {}
+        self.stats = {site: {"requests": 0, "ok": 0, "not_modified": 0, "not_found": 0, "rate_limited": 0,
+                             "injected_429": 0, "bytes": 0} for site in sites.DEFAULT_BASE_URLS}
+
+    def read_page(self, site, path):
+        """Return (body, modification time) of the page at `path`, or (None, None) if there's none."""
+        local = page_file(path)
+        if local is None:
+            return None, None
+        file_path = os.path.join(self.pages_dir, site, local)
+        try:
+            with open(file_path, "rb") as f:
+                return f.read(), int(os.path.getmtime(file_path))
+        except OSError:
+            return None, None
+
+    def over_limit(self, site, client):
+        """Seconds the client has to wait before its next request to `site`, or 0 if it may go ahead."""
+        limit = self.limits.get(site)
+        if limit is None:
+            return 0.0
+        window = self.windows.get((site, client))
+        if window is None:
+            window = ClientWindow(limit["requests"], limit["window"])
+            self.windows[(site, client)] = window
+        return window.take(self.ban)
+
+    def handler(self, site):
+        stats = self.stats[site]
+
+        async def handle(request):
+            if request.path == "/_stats":
+                return web.json_response(self.stats)
+            stats["requests"] += 1
+            wait = self.over_limit(site, request.remote)
+            if wait:
+                stats["rate_limited"] += 1
+                return web.Response(status=429, headers={"Retry-After": str(math.ceil(wait))})
+            if self.error_rate and self.random.random() < self.error_rate:
+                stats["injected_429"] += 1
+                return web.Response(status=429, headers={"Retry-After": str(self.retry_after)})
+            if self.latency or self.jitter:
+                await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+            body, mtime = self.read_page(site, request.path)
+            if body is None:
+                stats["not_found"] += 1
+                return web.Response(status=404, text="Not Found")
+            headers = {"ETag": f'"{hashlib.sha1(body).hexdigest()[:16]}"',
+                       "Last-Modified": formatdate(mtime, usegmt=True)}
+            if not_modified(request.headers, headers["ETag"], mtime):
+                stats["not_modified"] += 1
+                return web.Response(status=304, headers=headers)
+            stats["ok"] += 1
+            stats["bytes"] += len(body)
+            return web.Response(body=body, content_type="text/html", charset="utf-8", headers=headers)
+
+        return handle
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Serve every site, the i-th on `port` + i (or on free ports if `port` is 0). Returns {site: base URL}."""
+        for i, site in enumerate(sites.DEFAULT_BASE_URLS):
+            app = web.Application()
+            app.router.add_get("/{path:.*}", self.handler(site))
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            tcp_site = web.TCPSite(runner, host, port + i if port else 0)
+            await tcp_site.start()
+            self.runners.append(runner)
+            bound_port = runner.addresses[0][1]
+            self.base_urls[site] = f"http://{host}:{bound_port}"
+        return self.base_urls
+
+    async def close(self):
+        for runner in self.runners:
+            await runner.cleanup()
+        self.runners = []
+
+
+def not_modified(request_headers, etag, mtime):
+    """True if a conditional request already has the current page: If-None-Match wins over If-Modified-Since."""
+    if_none_match = request_headers.get("If-None-Match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request_headers.get("If-Modified-Since")
+    if if_modified_since is None:
+        return False
+    try:
+        return mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def real_limits(scale=1.0):
+    """
+    The real sites' limits (ratelimiter.HOST_RATE_LIMITS) as requests per minute, sped up by
+    `scale`: the same number of requests in a window of 60 / `scale` seconds.
+    """
+    limits = {}
+    for site, base_url in sites.DEFAULT_BASE_URLS.items():
+        limit = HOST_RATE_LIMITS.get(urlsplit(base_url).netloc)
+        if limit:
+            limits[site] = {"requests": limit["per_minute"], "window": 60 / scale}
+    return limits
+
+
+def parse_limit(text):
+    """Parse 'site=requests/seconds', e.g. 'basketball-reference=20/60'."""
+    site, _, limit = text.partition("=")
+    if site not in sites.DEFAULT_BASE_URLS:
+        raise argparse.ArgumentTypeError(f"unknown site {site!r}, expected one of {sorted(sites.DEFAULT_BASE_URLS)}")
+    requests, _, window = limit.partition("/")
+    return site, {"requests": int(requests), "window": float(window or 60)}
+
+
+def record(page_cache, pages_dir):
+    """Write every page of `page_cache` (a pagecache.PageCache) on a known site into `pages_dir`. Returns the count."""
+    written = 0
+    for url in page_cache.urls():
+        # Files are named by the decoded path, which is what the server looks pages up by
+        # (/wiki/Nikola_Joki%C4%87 is stored as wikipedia/wiki/Nikola_Jokić.html).
+        site, local = sites.site_of(url), page_file(unquote(urlsplit(url).path))
+        if site is None or local is None:
+            continue
+        path = os.path.join(pages_dir, site, local)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(page_cache.get(url).body)
+        written += 1
+    return written
+
+
+async def serve(server, host, port):
+    base_urls = await server.start(host, port)
+    print(f"🎬 Replaying pages from {server.pages_dir}")
+    for site, base_url in base_urls.items():
+        limit = server.limits.get(site)
+        limit_text = f", {limit['requests']} requests per {limit['window']:g} s per client" if limit else ""
+        print(f"   {site}: {base_url}{limit_text}")
+    print("Point the scrapers at it with:")
+    print("   " + " ".join(f"{sites.ENV_VARS[site]}={base_url}" for site, base_url in base_urls.items()))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+        print(json.dumps(server.stats, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded pages in place of the scraped sites.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="serve the pages until interrupted")
+    serve_parser.add_argument("--pages", default=PAGES_DIR, help=f"pages to serve (default: the synthetic {PAGES_DIR})")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                              help=f"port of the first site, the others follow (default: {DEFAULT_PORT})")
+    serve_parser.add_argument("--latency", type=float, default=0, help="response time in ms (default: 0)")
+    serve_parser.add_argument("--jitter", type=float, default=0, help="random +/- ms added to the latency")
+    serve_parser.add_argument("--error-rate", type=float, default=0, help="share of requests answered with a 429")
+    serve_parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds of those 429s")
+    serve_parser.add_argument("--scale", type=float, default=1,
+                              help="enforce the real sites' rate limits per client, sped up this much (default: 1)")
+    serve_parser.add_argument("--limit", type=parse_limit, action="append", default=[],
+                              help="override one site's limit, e.g. basketball-reference=20/60 (requests/seconds)")
+    serve_parser.add_argument("--no-limits", action="store_true", help="don't rate limit clients at all")
+    serve_parser.add_argument("--ban", type=float, default=0,
+                              help="seconds a client over the limit gets nothing but 429s (default: 0)")
+    serve_parser.add_argument("--seed", type=int, default=0)
+
+    record_parser = commands.add_parser("record", help="copy the pages of a scraper cache into a pages directory")
+    record_parser.add_argument("--cache", default=CACHE_PATH, help=f"page cache file (default: {CACHE_PATH})")
+    record_parser.add_argument("--pages", default="replay_pages", help="pages directory to write (default: replay_pages)")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        count = record(PageCache(args.cache), args.pages)
+        print(f"✅ {count} pages written to {args.pages}")
+    else:
+        limits = {} if args.no_limits else real_limits(args.scale)
+        limits.update(args.limit)
+        server = ReplayServer(args.pages, args.latency / 1000, args.jitter / 1000, args.error_rate,
+                              args.retry_after, limits, args.ban, args.seed)
+        try:
+            asyncio.run(serve(server, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,222 @@
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlsplit
+
+# Run-level instrumentation shared by every scraper: requests, cache hits and bytes per host,
+# where the time goes (rate-limit waits, fetching, cache reads, parsing), slug probes per player
+# and wall time per team. Scrapers record into the module-level `stats` and write it out as a
+# JSON run report at the end (--report); --progress also keeps a live progress/ETA line on stderr.
+# When several scrapers run in one process (build_dataset.py), they share one report.
+#
+# build_dataset.py runs the synchronous team-stats scraper on a worker thread, so the counters
+# are updated under a lock. Stage times are summed over tasks, so with many concurrent fetches "fetch" and
+# "rate_limit_wait" can add up to more than the run's wall time.
+
+STAGES = ("rate_limit_wait", "fetch", "cache", "parse")
+
+# How often (seconds) the live progress line is redrawn at most.
+PROGRESS_INTERVAL = 0.5
+
+
+def new_host():
+    return {"requests": 0, "statuses": Counter(), "errors": 0, "bytes": 0, "cache_hits": 0, "cache_misses": 0,
+            "fetch_s": 0.0, "rate_limit_wait_s": 0.0}
+
+
+@contextmanager
+def timed(stage):
+    """Add the time spent in a `with` block (or in every call of a decorated function) to `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_time(stage, time.perf_counter() - start)
+
+
+class RunStats:
+    """Counters and timings of one scraper run."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, script=None, live=False):
+        self.script = script
+        self.started = time.time()
+        self.hosts = {}
+        self.stage_times = dict.fromkeys(STAGES, 0.0)
+        self.probes = Counter()
+        self.team_started = {}
+        self.team_pending = {}
+        self.team_times = {}
+        self.teams_expected = 0
+        self.live = live
+        self.last_drawn = 0.0
+
+    def host(self, url):
+        netloc = urlsplit(url).netloc
+        if netloc not in self.hosts:
+            self.hosts[netloc] = new_host()
+        return self.hosts[netloc]
+
+    def add_time(self, stage, seconds):
+        with self.lock:
+            self.stage_times[stage] += seconds
+
+    def rate_limit_wait(self, url, seconds):
+        with self.lock:
+            self.host(url)["rate_limit_wait_s"] += seconds
+        self.add_time("rate_limit_wait", seconds)
+
+    def cache_lookup(self, url, hit, seconds=0.0):
+        with self.lock:
+            self.host(url)["cache_hits" if hit else "cache_misses"] += 1
+        self.add_time("cache", seconds)
+        self.draw()
+
+    def request(self, url, status, nbytes, seconds):
+        """Record one network request; `status` is None if it failed without a response."""
+        with self.lock:
+            host = self.host(url)
+            host["requests"] += 1
+            if status is None:
+                host["errors"] += 1
+            else:
+                host["statuses"][status] += 1
+            host["bytes"] += nbytes
+            host["fetch_s"] += seconds
+        self.add_time("fetch", seconds)
+        self.draw()
+
+    def response(self, url, response, seconds):
+        """Record a `requests` response."""
+        self.request(url, response.status_code, len(response.content), seconds)
+
+    def polite_sleep(self, url, seconds):
+        """time.sleep() between requests to the host of `url`, counted as rate-limit waiting."""
+        time.sleep(seconds)
+        self.rate_limit_wait(url, seconds)
+
+    def probe(self, season, team, player):
+        """
+        Count one candidate page tried while resolving `player` of `team` in `season` to a Basketball
+        Reference URL. Keyed by all three, so namesakes and a player's other seasons aren't merged.
+        """
+        with self.lock:
+            self.probes[(season, team, player)] += 1
+
+    # Team keys are shared by every scraper in the run, so scrapers that can run together
+    # (build_dataset.py) prefix theirs, e.g. "vorp 2023 Boston Celtics".
+    def expect_teams(self, count):
+        with self.lock:
+            self.teams_expected += count
+
+    def start_team(self, team):
+        with self.lock:
+            self.team_started.setdefault(team, time.perf_counter())
+
+    def team_items(self, team, count):
+        """`team` has `count` more items (e.g. players) to finish; it's done once they all are."""
+        with self.lock:
+            self.team_pending[team] = self.team_pending.get(team, 0) + count
+            if not self.team_pending[team]:
+                self._finish_team(team)
+        self.draw()
+
+    def team_item_done(self, team):
+        with self.lock:
+            self.team_pending[team] -= 1
+            if not self.team_pending[team]:
+                self._finish_team(team)
+        self.draw()
+
+    def finish_team(self, team):
+        with self.lock:
+            self._finish_team(team)
+        self.draw()
+
+    def _finish_team(self, team):
+        self.team_times[team] = time.perf_counter() - self.team_started.get(team, time.perf_counter())
+
+    def track_teams(self, items, key):
+        """
+        Iterate over `items`, timing each as team `key(item)` from when it's handed out until the
+        loop asks for the next one (so a `continue` finishes the team too).
+        """
+        items = list(items)
+        self.expect_teams(len(items))
+        for item in items:
+            team = key(item)
+            self.start_team(team)
+            yield item
+            self.finish_team(team)
+
+    def cache_hit_rate(self):
+        hits = sum(host["cache_hits"] for host in self.hosts.values())
+        lookups = hits + sum(host["cache_misses"] for host in self.hosts.values())
+        return hits / lookups if lookups else None
+
+    def draw(self, force=False):
+        """Redraw the live progress line (if --progress is on), at most every PROGRESS_INTERVAL seconds."""
+        if not self.live:
+            return
+        now = time.time()
+        if not force and now - self.last_drawn < PROGRESS_INTERVAL:
+            return
+        self.last_drawn = now
+        elapsed = now - self.started
+        done = len(self.team_times)
+        line = f"⏱️ {elapsed / 60:5.1f} min  teams {done}/{self.teams_expected or '?'}"
+        line += f"  requests {sum(host['requests'] for host in self.hosts.values())}"
+        hit_rate = self.cache_hit_rate()
+        if hit_rate is not None:
+            line += f"  cache {hit_rate:.0%}"
+        if done and self.teams_expected > done:
+            line += f"  ETA {elapsed / done * (self.teams_expected - done) / 60:.1f} min"
+        sys.stderr.write(f"\r{line}\033[K")
+        sys.stderr.flush()
+
+    def report(self):
+        elapsed = time.time() - self.started
+        hosts = {netloc: dict(host, statuses={str(status): n for status, n in sorted(host["statuses"].items())},
+                              fetch_s=round(host["fetch_s"], 3), rate_limit_wait_s=round(host["rate_limit_wait_s"], 3))
+                 for netloc, host in self.hosts.items()}
+        probe_counts = list(self.probes.values())
+        slowest = sorted(self.team_times.items(), key=lambda item: item[1], reverse=True)
+        return {
+            "script": self.script,
+            "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "wall_s": round(elapsed, 3),
+            "requests": sum(host["requests"] for host in self.hosts.values()),
+            "bytes": sum(host["bytes"] for host in self.hosts.values()),
+            "cache_hit_rate": self.cache_hit_rate(),
+            "hosts": hosts,
+            "stage_s": {stage: round(seconds, 3) for stage, seconds in self.stage_times.items()},
+            "slug_probes": {
+                "players": len(probe_counts),
+                "probes": sum(probe_counts),
+                "mean": sum(probe_counts) / len(probe_counts) if probe_counts else None,
+                "histogram": {str(n): count for n, count in sorted(Counter(probe_counts).items())},
+                "most": [{"season": season, "team": team, "player": player, "probes": n}
+                         for (season, team, player), n in self.probes.most_common(10)],
+            },
+            "teams": {"finished": len(self.team_times), "expected": self.teams_expected,
+                      "slowest": [[team, round(seconds, 3)] for team, seconds in slowest[:10]],
+                      "wall_s": {team: round(seconds, 3) for team, seconds in self.team_times.items()}},
+        }
+
+    def write(self, path):
+        if self.live:
+            self.draw(force=True)
+            sys.stderr.write("\n")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        print(f"📈 Run report written: {path}")
+
+
+stats = RunStats()
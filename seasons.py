@@ -0,0 +1,14 @@
+# Season helpers shared by the scrapers and the model CLIs. Kept free of third-party imports, so
+# predict.py and train_model.py can parse "--seasons 2014-2024" without pulling in the scraping stack.
+
+
+def season_label(input_season):
+    return f"{input_season - 1}-{str(input_season)[-2:]}"  # e.g., "2021-22"
+
+
+def parse_season_range(text):
+    """Parse '2023' or '2014-2025' into a list of season end years."""
+    first, _, last = text.partition("-")
+    first = int(first)
+    last = int(last) if last else first
+    return list(range(first, last + 1))
@@ -0,0 +1,55 @@
+import os
+from urllib.parse import urlsplit
+
+# Base URL of every site we scrape. Each one can be pointed somewhere else (e.g. the local replay
+# server in replayserver.py) with an environment variable, or at runtime with set_base_url():
+#   WIKIPEDIA_URL=http://127.0.0.1:8801 BASKETBALL_REFERENCE_URL=http://127.0.0.1:8802 python top10VORPold.py
+# Scrapers build URLs with url() at request time, so an override applies to every page they fetch.
+DEFAULT_BASE_URLS = {
+    "wikipedia": "https://en.wikipedia.org",
+    "basketball-reference": "https://www.basketball-reference.com",
+    "2kratings": "https://www.2kratings.com",
+}
+ENV_VARS = {
+    "wikipedia": "WIKIPEDIA_URL",
+    "basketball-reference": "BASKETBALL_REFERENCE_URL",
+    "2kratings": "TWOKRATINGS_URL",
+}
+
+base_urls = {site: (os.environ.get(ENV_VARS[site]) or default).rstrip("/")
+             for site, default in DEFAULT_BASE_URLS.items()}
+
+
+def set_base_url(site, base_url=None):
+    """Point `site` at `base_url`, or back at the real site if it's None."""
+    base_urls[site] = (base_url or DEFAULT_BASE_URLS[site]).rstrip("/")
+
+
+def base_url(site):
+    return base_urls[site]
+
+
+def url(site, path):
+    """The URL of `path` (e.g. "/wiki/LeBron_James") on `site`, honouring any override."""
+    return f"{base_urls[site]}{path}"
+
+
+def site_of(url):
+    """The site whose (current or real) host serves `url`, or None."""
+    host = urlsplit(url).netloc
+    for site in DEFAULT_BASE_URLS:
+        if host in (urlsplit(base_urls[site]).netloc, urlsplit(DEFAULT_BASE_URLS[site]).netloc):
+            return site
+    return None
+
+
+def real_host(url):
+    """The real host behind `url`, e.g. www.basketball-reference.com for a replay server URL."""
+    site = site_of(url)
+    return urlsplit(DEFAULT_BASE_URLS[site]).netloc if site else urlsplit(url).netloc
+
+
+def is_overridden(url):
+    """True if `url` is on a site that has been pointed away from its real host."""
+    site = site_of(url)
+    return site is not None and urlsplit(url).netloc != urlsplit(DEFAULT_BASE_URLS[site]).netloc
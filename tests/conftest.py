@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# The modules under test are scripts at the repo root, not an installed package.
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+MERGED_CSV = os.path.join(REPO_DIR, "merged_nba_data_all_seasons.csv")
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A Parquet store (datastore/ under a temporary working directory) filled from the merged CSV."""
+    import datastore
+    monkeypatch.chdir(tmp_path)
+    datastore.import_csv('merged', MERGED_CSV)
+    return tmp_path / datastore.STORE_DIR
@@ -0,0 +1,33 @@
+import os
+
+import replayserver
+import sites
+from benchmarks import bench_parsers
+from pagecache import PageCache
+
+
+def test_recorded_pages_bench_without_a_manifest(tmp_path):
+    # Fill a page cache with the synthetic pages, as if the scrapers had fetched them.
+    cache = PageCache(str(tmp_path / "cache.sqlite"))
+    pages = 0
+    for site in sites.DEFAULT_BASE_URLS:
+        site_dir = os.path.join(bench_parsers.FIXTURES_DIR, site)
+        for root, _, files in os.walk(site_dir):
+            for name in files:
+                path = os.path.relpath(os.path.join(root, name), site_dir).replace(os.sep, "/")
+                with open(os.path.join(root, name), "rb") as f:
+                    cache.put(f"{sites.DEFAULT_BASE_URLS[site]}/{path}", f.read(), {})
+                pages += 1
+
+    pages_dir = tmp_path / "replay_pages"
+    assert replayserver.record(cache, str(pages_dir)) == pages
+    assert not (pages_dir / "manifest.json").exists()
+
+    cases = bench_parsers.load_cases(str(pages_dir))
+    report = bench_parsers.run(cases, repeat=1)
+    assert set(report["results"]) == set(bench_parsers.PARSERS)
+
+    # Player pages are checked against the last team they list, which they must have played for.
+    by_parser = {name: [case for case in cases if case["parser"] == name] for name in bench_parsers.PARSERS}
+    assert all(bench_parsers.verify_player(case["html"], **case["args"]) for case in by_parser["verify_player"])
+    assert all(bench_parsers.team_stats(case["html"]) for case in by_parser["team_stats"])
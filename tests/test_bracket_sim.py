@@ -0,0 +1,30 @@
+import os
+
+import pandas as pd
+import pytest
+
+import bracket_sim
+from conftest import REPO_DIR
+
+
+def standings(season):
+    merged = pd.read_csv(os.path.join(REPO_DIR, "merged_nba_data_all_seasons.csv"))
+    return merged[merged['season'] == season].reset_index(drop=True)
+
+
+def test_2016_lottery_tie_does_not_block_the_bracket():
+    # Denver and Sacramento both finished 10th in the 2016 West, which has no play-in.
+    rows = standings(2016)
+    bracket = bracket_sim.bracket_teams(rows)
+    assert len(bracket) == 16
+    assert sorted(bracket['seed']) == sorted(bracket_sim.BRACKET_SEEDS * 2)
+
+    odds = bracket_sim.title_odds(bracket, 'srs', bracket_sim.DEFAULT_SCALES['srs'], n_simulations=2000)
+    assert odds['champion_%'].sum() == pytest.approx(100)
+
+
+def test_shared_bracket_seed_is_still_an_error():
+    rows = standings(2016)
+    rows.loc[rows['team'] == "Houston Rockets", 'seed'] = 7
+    with pytest.raises(ValueError, match="sharing a seed: \\[7\\]"):
+        bracket_sim.bracket_teams(rows)
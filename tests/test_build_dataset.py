@@ -0,0 +1,75 @@
+import csv
+import os
+from datetime import datetime
+
+import build_dataset
+from top10VORPold import TOP9_HEADER
+
+
+def write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def write_partition(season, teams, built_at=None):
+    """The three scrapers' CSVs for `season`, each team given as (stats name, playoffs name, VORP name)."""
+    paths = build_dataset.partition_paths(season)
+    write_csv(paths["team_stats"], ["team", "season", *build_dataset.STAT_FIELDS],
+              [[stats_name, season, i + 1, 0.5, 110.0, 108.0, 2.0, 1.9] for i, (stats_name, _, _) in enumerate(teams)])
+    write_csv(paths["playoff_experience"], ["Team", "Season", "Total Playoff Games"],
+              [[playoffs_name, season, 100 + i] for i, (_, playoffs_name, _) in enumerate(teams)])
+    write_csv(paths["top9_vorp"], TOP9_HEADER,
+              [[vorp_name, season] + [float(9 - j) for j in range(9)] for _, _, vorp_name in teams])
+    if built_at is not None:
+        for path in paths.values():
+            os.utime(path, (built_at, built_at))
+
+
+def test_partition_freshness(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    teams = [("Boston Celtics", "Boston_Celtics", "Boston Celtics")]
+    assert not build_dataset.partition_is_fresh(2014)
+
+    # A finished season is final once scraped after it ended, and stale if scraped while it was played.
+    write_partition(2014, teams, built_at=datetime(2014, 8, 1).timestamp())
+    assert build_dataset.partition_is_fresh(2014)
+    write_partition(2014, teams, built_at=datetime(2014, 3, 1).timestamp())
+    assert build_dataset.partition_is_fresh(2014, now=datetime(2014, 3, 1, 12).timestamp())
+    assert not build_dataset.partition_is_fresh(2014, now=datetime(2020, 1, 1).timestamp())
+
+    # A season in progress is fresh for MAX_PARTITION_AGE.
+    built = datetime(2030, 1, 10).timestamp()
+    write_partition(2030, teams, built_at=built)
+    assert build_dataset.partition_is_fresh(2030, now=built + build_dataset.MAX_PARTITION_AGE - 60)
+    assert not build_dataset.partition_is_fresh(2030, now=built + build_dataset.MAX_PARTITION_AGE + 60)
+
+    os.remove(build_dataset.partition_paths(2014)["top9_vorp"])
+    assert not build_dataset.partition_is_fresh(2014)
+
+
+def test_merge_joins_historical_names_and_carries_champ_scores(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_partition(2014, [
+        ("Charlotte Bobcats*", "Charlotte_Bobcats", "Charlotte Hornets"),
+        ("Los Angeles Clippers*", "Los_Angeles_Clippers", "LA Clippers"),
+        ("Brooklyn Nets", "Brooklyn_Nets", "Brooklyn Nets"),
+    ])
+    write_csv(build_dataset.MERGED_PATH, build_dataset.MERGED_HEADER, [
+        ["Charlotte Hornets", 2014] + [""] * 16 + ["0.2"],
+        ["Los Angeles Clippers", 2014] + [""] * 16 + ["0.4"],
+        ["Miami Heat", 2013] + [""] * 16 + ["1.0"],
+    ])
+
+    build_dataset.build([2014])
+    merged = {(row["team"], row["season"]): row for row in build_dataset.read_merged()}
+
+    assert sorted(merged) == [("Brooklyn Nets", "2014"), ("Charlotte Hornets", "2014"),
+                              ("Los Angeles Clippers", "2014"), ("Miami Heat", "2013")]
+    hornets, clippers, nets = (merged[(team, "2014")] for team in
+                               ("Charlotte Hornets", "Los Angeles Clippers", "Brooklyn Nets"))
+    assert (hornets["seed"], hornets["total_playoff_games"], hornets["player1vorp"]) == ("1", "100", "9.0")
+    assert (clippers["seed"], clippers["total_playoff_games"], clippers["player1vorp"]) == ("2", "101", "9.0")
+    assert (hornets["champ_scr"], clippers["champ_scr"], nets["champ_scr"]) == ("0.2", "0.4", "")
+    assert merged[("Miami Heat", "2013")]["champ_scr"] == "1.0"
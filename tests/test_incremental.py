@@ -0,0 +1,59 @@
+import datastore
+import predict
+from train_model import load_training_data
+
+PARAMS = {"n_estimators": 10, "random_state": 42}
+
+
+def test_incremental_updates_a_model_of_the_same_seasons(store):
+    df = load_training_data()
+    base = predict.get_model(df, PARAMS, incremental=True)
+
+    # A fix to a season the model was fitted on (e.g. a corrected VORP) is absorbed incrementally.
+    fixed = df.copy()
+    fixed.loc[fixed.index[0], 'player1vorp'] += 1.0
+    updated = predict.get_model(fixed, PARAMS, incremental=True)
+    assert updated["key"] != base["key"]
+    assert updated["updated_seasons"] == [int(df.loc[df.index[0], 'season'])]
+    assert len(updated["model"][-1].estimators_) > PARAMS["n_estimators"]
+
+
+def test_incremental_never_starts_from_a_model_of_other_seasons(store):
+    df = load_training_data()
+    seasons = sorted(df['season'].unique().tolist())
+    # Like bracket_sim.py's model for the latest season, which leaves that season out.
+    predict.get_model(df[df['season'] != seasons[-1]], PARAMS)
+
+    full = predict.get_model(df, PARAMS, incremental=True)
+    assert "updated_seasons" not in full
+    assert full["seasons"] == seasons
+    assert len(full["model"][-1].estimators_) == PARAMS["n_estimators"]
+
+
+def test_refreshing_the_unlabeled_current_season_keeps_the_model(store):
+    base = predict.get_model(params=PARAMS, incremental=True)
+
+    # The season being played has no champ_scr yet, so it isn't training data.
+    current = datastore.stored_seasons('merged')[-1]
+    rows = datastore.load('merged', seasons=[current])
+    assert rows['champ_scr'].isna().all()
+    rows['player1vorp'] += 1.0
+    datastore.write_partition('merged', current, rows.to_dict('records'))
+
+    assert predict.get_model(params=PARAMS, incremental=True)["key"] == base["key"]
+    assert current not in base["seasons"]
+
+
+def test_latest_artifact_only_unpickles_the_match(store, monkeypatch):
+    df = load_training_data()
+    seasons = sorted(df['season'].unique().tolist())
+    predict.get_model(df[df['season'] != seasons[-1]], PARAMS)
+    full = predict.get_model(df, PARAMS)
+
+    loaded = []
+    load = predict.joblib.load
+    monkeypatch.setattr(predict.joblib, "load", lambda path: loaded.append(path) or load(path))
+    assert predict.latest_artifact(PARAMS, seasons)["key"] == full["key"]
+    assert loaded == [predict.artifact_path(full["key"])]
+    assert predict.latest_artifact({"n_estimators": 5}, seasons) is None
+    assert len(loaded) == 1
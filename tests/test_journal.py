@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import totalplayoffgames
+from journal import Journal
+
+KEY = ("season", "team", "player")
+
+
+def write_journal(path, records):
+    journal = Journal(str(path), KEY)
+    for record in records:
+        journal.append(record)
+    journal.close()
+
+
+def test_resume_skips_journaled_work(tmp_path):
+    path = tmp_path / "run.journal.jsonl"
+    write_journal(path, [{"season": 2023, "team": "BOS", "player": "Jayson Tatum", "gp": 90},
+                         {"season": 2023, "team": "BOS", "player": "Al Horford", "gp": 160}])
+
+    journal = Journal(str(path), KEY, resume=True)
+    assert journal.get(2023, "BOS", "Jayson Tatum")["gp"] == 90
+    assert (2023, "BOS", "Al Horford") in journal
+    assert journal.get(2023, "BOS", "Jaylen Brown") is None
+    journal.append({"season": 2023, "team": "BOS", "player": "Jaylen Brown", "gp": 80})
+    journal.close()
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 3
+
+
+def test_without_resume_the_journal_starts_over(tmp_path):
+    path = tmp_path / "run.journal.jsonl"
+    write_journal(path, [{"season": 2023, "team": "BOS", "player": "Jayson Tatum", "gp": 90}])
+
+    journal = Journal(str(path), KEY, resume=False)
+    assert journal.get(2023, "BOS", "Jayson Tatum") is None
+    journal.close()
+    assert path.read_text(encoding="utf-8") == ""
+
+
+def test_torn_last_line_is_skipped_and_not_glued_onto(tmp_path):
+    path = tmp_path / "run.journal.jsonl"
+    write_journal(path, [{"season": 2023, "team": "BOS", "player": "Jayson Tatum", "gp": 90}])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"season": 2023, "team": "BOS", "player": "Al Hor')  # Crashed mid-write.
+
+    journal = Journal(str(path), KEY, resume=True)
+    assert list(journal.records) == [(2023, "BOS", "Jayson Tatum")]
+    journal.append({"season": 2023, "team": "BOS", "player": "Al Horford", "gp": 160})
+    journal.close()
+
+    resumed = Journal(str(path), KEY, resume=True)
+    assert resumed.get(2023, "BOS", "Al Horford")["gp"] == 160
+    resumed.close()
+
+
+def test_playoff_games_resume_fetches_only_unjournaled_players(tmp_path, monkeypatch):
+    path = tmp_path / "playoffs.journal.jsonl"
+    write_journal(path, [{"season": 2023, "team": "Boston_Celtics", "player": "Al Horford", "url": "/wiki/Al_Horford",
+                          "gp": 160}])
+    fetched = []
+
+    async def links(season, team, session):
+        return [("Al Horford", "/wiki/Al_Horford"), ("Jayson Tatum", "/wiki/Jayson_Tatum")]
+
+    async def history(link, session, histories, limiter, season):
+        fetched.append(link)
+        return totalplayoffgames.PlayoffHistory({2018: 19, 2022: 24})
+
+    monkeypatch.setattr(totalplayoffgames, "get_team_player_links", links)
+    monkeypatch.setattr(totalplayoffgames, "get_player_playoff_history", history)
+    journal = Journal(str(path), KEY, resume=True)
+    total = asyncio.run(totalplayoffgames.get_team_total(2023, "Boston_Celtics", None, journal, {}, None))
+    journal.close()
+
+    assert fetched == ["/wiki/Jayson_Tatum"]
+    assert total == 160 + 43
+    assert [json.loads(line)["player"] for line in path.read_text(encoding="utf-8").splitlines()] == \
+        ["Al Horford", "Jayson Tatum"]
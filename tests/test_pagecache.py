@@ -0,0 +1,29 @@
+import sqlite3
+
+import pytest
+
+import pagecache
+from pagecache import PageCache
+
+
+def test_store_does_not_share_the_aiohttp_cache_file():
+    assert pagecache.CACHE_PATH != pagecache.AIOHTTP_CACHE_NAME + ".sqlite"
+
+
+def test_aiohttp_cache_file_is_refused_with_a_hint(tmp_path):
+    path = tmp_path / "basketball_cache.sqlite"
+    conn = sqlite3.connect(path)
+    conn.executescript("CREATE TABLE responses (key TEXT PRIMARY KEY, value BLOB);"
+                       "CREATE TABLE redirects (key TEXT PRIMARY KEY, value BLOB);")
+    conn.close()
+
+    with pytest.raises(RuntimeError, match="import-aiohttp"):
+        PageCache(str(path)).get("https://www.basketball-reference.com/")
+
+
+def test_new_store_round_trips_a_page(tmp_path):
+    store = PageCache(str(tmp_path / pagecache.CACHE_PATH))
+    url = "https://www.basketball-reference.com/teams/BOS/2016.html"
+    store.put(url, b"<html>Celtics</html>", {"ETag": '"abc"'})
+    assert store.get(url).text == "<html>Celtics</html>"
+    store.close()
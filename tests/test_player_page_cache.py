@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+import top10VORPold
+from asyncfetch import FetchError
+
+URL = "https://www.basketball-reference.com/players/j/jamesle01.html"
+
+
+def test_a_failed_fetch_is_not_cached(monkeypatch):
+    calls = []
+
+    async def fetch_player_page(url, session, page_season=None):
+        calls.append(url)
+        if len(calls) == 1:
+            raise FetchError(url, "503")
+        return "page"
+
+    monkeypatch.setattr(top10VORPold, "fetch_player_page", fetch_player_page)
+
+    async def run():
+        page_cache = {}
+        with pytest.raises(FetchError):
+            await top10VORPold.get_player_page(URL, None, page_cache)
+        assert URL not in page_cache
+        assert await top10VORPold.get_player_page(URL, None, page_cache) == "page"
+        assert await top10VORPold.get_player_page(URL, None, page_cache) == "page"
+
+    asyncio.run(run())
+    assert calls == [URL, URL]
@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import playerindex
+from playerindex import PlayerIndex, build_player_index
+
+
+def make_index(tmp_path):
+    index = PlayerIndex(str(tmp_path / "player_index.sqlite"))
+    index.add_players("j", [("jamesle01", "LeBron James", 2004, 2025), ("jordami01", "Michael Jordan", 1985, 2003)])
+    index.add_players("b", [("bryanko01", "Kobe Bryant", 1997, 2016)])
+    return index
+
+
+def test_active_players_match_seasons_past_the_index(tmp_path):
+    index = make_index(tmp_path)
+    assert index.lookup("LeBron James", 2026) == ["jamesle01"]
+    assert index.lookup("Lebron Jame", 2026) == ["jamesle01"]
+    # Retired players still only match the seasons they played.
+    assert index.lookup("Michael Jordan", 2026) == []
+    assert index.lookup("Kobe Bryant", 2016) == ["bryanko01"]
+    assert index.lookup("Kobe Bryant", 2017) == []
+
+
+def test_stale_letters(tmp_path):
+    index = make_index(tmp_path)
+    assert index.stale_letters(2025) == []
+    assert index.stale_letters(2026) == ["b", "j"]
+    assert index.stale_letters(now=time.time() + playerindex.INDEX_TTL + 1) == ["b", "j"]
+
+
+def test_build_refetches_letters_for_a_newer_season(tmp_path):
+    index = make_index(tmp_path)
+    fetched = []
+
+    async def fetch(url):
+        fetched.append(url.rstrip("/").rsplit("/", 1)[-1])
+        return None
+
+    asyncio.run(build_player_index(index, fetch, season=2025))
+    assert len(fetched) == 24  # Only the letters never fetched.
+    fetched.clear()
+    asyncio.run(build_player_index(index, fetch, season=2026))
+    assert len(fetched) == 26
@@ -0,0 +1,27 @@
+import asyncio
+import threading
+
+from ratelimiter import TokenBucket
+
+
+def test_bucket_is_shared_by_two_event_loops():
+    bucket = TokenBucket(per_minute=60_000, burst=1)
+
+    async def take(n):
+        # Enough tasks at once that they queue on the lock instead of all getting it uncontended.
+        await asyncio.gather(*(bucket.acquire() for _ in range(n)))
+
+    asyncio.run(take(5))
+    errors = []
+
+    def other_loop():
+        try:
+            asyncio.run(take(5))
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=other_loop)
+    thread.start()
+    asyncio.run(take(5))
+    thread.join()
+    assert errors == []
@@ -0,0 +1,28 @@
+import asyncio
+
+import aiohttp
+
+import replayserver
+import sites
+from pagecache import PageCache
+
+
+def test_recorded_escaped_url_is_served_back(tmp_path):
+    url = sites.DEFAULT_BASE_URLS["wikipedia"] + "/wiki/Nikola_Joki%C4%87"
+    cache = PageCache(str(tmp_path / "cache.sqlite"))
+    cache.put(url, "<html>Nikola Jokić</html>".encode(), {"Content-Type": "text/html; charset=utf-8"})
+    pages_dir = tmp_path / "replay_pages"
+    assert replayserver.record(cache, str(pages_dir)) == 1
+    assert (pages_dir / "wikipedia" / "wiki" / "Nikola_Jokić.html").exists()
+
+    async def fetch():
+        server = replayserver.ReplayServer(str(pages_dir))
+        base_urls = await server.start(port=0)
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(base_urls["wikipedia"] + "/wiki/Nikola_Joki%C4%87") as response:
+                    return response.status, await response.text()
+        finally:
+            await server.close()
+
+    assert asyncio.run(fetch()) == (200, "<html>Nikola Jokić</html>")
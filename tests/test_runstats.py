@@ -0,0 +1,15 @@
+from runstats import RunStats
+
+
+def test_slug_probes_are_counted_per_season_team_and_player():
+    stats = RunStats()
+    stats.reset("test")
+    for _ in range(3):
+        stats.probe(2023, "CHI", "Marcus Morris")
+    stats.probe(2023, "LAC", "Marcus Morris")  # A namesake on another team.
+    stats.probe(2024, "CHI", "Marcus Morris")  # The same player in another season.
+
+    probes = stats.report()["slug_probes"]
+    assert (probes["players"], probes["probes"]) == (3, 5)
+    assert probes["histogram"] == {"1": 2, "3": 1}
+    assert probes["most"][0] == {"season": 2023, "team": "CHI", "player": "Marcus Morris", "probes": 3}
@@ -0,0 +1,74 @@
+from basketballreferencescrapertocsv import LEAGUE_TABLE_IDS, conference_seeds, printed_seed
+from htmlparse import find_tables
+
+
+def standings_table(table_id, teams):
+    """A league page standings table of (abbreviation, name as printed, wins, losses) rows."""
+    rows = "".join(
+        f'<tr><th data-stat="team_name"><a href="/teams/{abbr}/2014.html">{name}</a>{suffix}</th>'
+        f'<td data-stat="wins">{wins}</td><td data-stat="losses">{losses}</td></tr>'
+        for abbr, name, suffix, wins, losses in teams)
+    return f'<table id="{table_id}"><tbody>{rows}</tbody></table>'
+
+
+def league_page(*tables):
+    return "<html><body>" + "".join(tables) + "</body></html>"
+
+
+def seeds_of(html):
+    return conference_seeds(find_tables(html, LEAGUE_TABLE_IDS))
+
+
+def test_conference_standings_rank_teams_in_order():
+    html = league_page(
+        standings_table("confs_standings_E", [("CLE", "Cleveland Cavaliers", "*", 57, 25),
+                                              ("TOR", "Toronto Raptors", "*", 56, 26),
+                                              ("PHI", "Philadelphia 76ers", "", 10, 72)]),
+        standings_table("confs_standings_W", [("GSW", "Golden State Warriors", "*", 73, 9),
+                                              ("SAS", "San Antonio Spurs", "*", 67, 15)]))
+    assert seeds_of(html) == {"CLE": 1, "TOR": 2, "PHI": 3, "GSW": 1, "SAS": 2}
+
+
+def test_division_standings_use_printed_seeds_then_record():
+    # 2014 East: division winner Toronto was seeded 3rd ahead of Chicago despite a worse record.
+    html = league_page(standings_table("divs_standings_E", [
+        ("TOR", "Toronto Raptors", "* (3)", 48, 34),
+        ("BRK", "Brooklyn Nets", "* (6)", 44, 38),
+        ("NYK", "New York Knicks", "", 37, 45),
+        ("IND", "Indiana Pacers", "* (1)", 56, 26),
+        ("CHI", "Chicago Bulls", "* (4)", 48, 34),
+        ("CLE", "Cleveland Cavaliers", "", 33, 49),
+        ("DET", "Detroit Pistons", "", 29, 53),
+        ("ORL", "Orlando Magic", "", 23, 59),
+        ("PHI", "Philadelphia 76ers", "", 19, 63),
+        ("MIL", "Milwaukee Bucks", "", 15, 67),
+        ("BOS", "Boston Celtics", "", 25, 57),
+        ("CHA", "Charlotte Bobcats", "* (7)", 43, 39),
+        ("ATL", "Atlanta Hawks", "* (8)", 38, 44),
+        ("WAS", "Washington Wizards", "* (5)", 44, 38),
+        ("MIA", "Miami Heat", "* (2)", 54, 28),
+    ]))
+    seeds = seeds_of(html)
+    assert {abbr: seeds[abbr] for abbr in ("IND", "MIA", "TOR", "CHI", "WAS", "BRK", "CHA", "ATL")} == \
+        {"IND": 1, "MIA": 2, "TOR": 3, "CHI": 4, "WAS": 5, "BRK": 6, "CHA": 7, "ATL": 8}
+    assert sorted(((seed, abbr) for abbr, seed in seeds.items() if seed > 8)) == \
+        [(9, "NYK"), (10, "CLE"), (11, "DET"), (12, "BOS"), (13, "ORL"), (14, "PHI"), (15, "MIL")]
+
+
+def test_division_standings_leave_record_ties_and_unprinted_conferences_unseeded():
+    html = league_page(
+        standings_table("divs_standings_W", [("SAS", "San Antonio Spurs", "* (1)", 62, 20),
+                                             ("DEN", "Denver Nuggets", "", 33, 49),
+                                             ("SAC", "Sacramento Kings", "", 33, 49),
+                                             ("LAL", "Los Angeles Lakers", "", 21, 61)]),
+        # No seeds printed at all: record alone would misplace division winners.
+        standings_table("divs_standings_E", [("IND", "Indiana Pacers", "*", 56, 26),
+                                             ("MIL", "Milwaukee Bucks", "", 15, 67)]))
+    assert seeds_of(html) == {"SAS": 1, "LAL": 4}
+
+
+def test_printed_seed():
+    html = league_page(standings_table("divs_standings_E", [("TOR", "Toronto Raptors", "* (3)", 48, 34),
+                                                            ("NYK", "New York Knicks", "", 37, 45)]))
+    rows = find_tables(html, ["divs_standings_E"])["divs_standings_E"].find_all("tr")
+    assert [printed_seed(row) for row in rows] == [3, None]
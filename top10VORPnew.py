@@ -1,13 +1,18 @@
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
-import time
 import sys
 
+import sites
+from pagecache import cached_get
+from runstats import stats, timed
+
 # Import functions from the basketball_reference_scraper API.
 from basketball_reference_scraper.teams import get_roster
 from basketball_reference_scraper.players import get_stats
 
+REPORT_PATH = "top10VORPnew.report.json"
+
 # --- Mapping Team Abbreviations to Full Names ---
 # Note: Ensure these names match the Wikipedia page titles. Some team names might differ.
 TEAM_MAPPING = {
@@ -57,7 +62,7 @@ def construct_wikipedia_url(season_input, team_full_name):
     page_title = f"{season_en_dash} {team_full_name} season"
     # Replace spaces with underscores for the URL.
     page_title_url = page_title.replace(" ", "_")
-    url = f"https://en.wikipedia.org/wiki/{page_title_url}"
+    url = sites.url("wikipedia", f"/wiki/{page_title_url}")
     return url
 
 # --- Function to Scrape the Roster Names from a Wikipedia Season Page ---
@@ -69,35 +74,39 @@ def get_wikipedia_roster(url):
     Returns a list of player names.
     """
     try:
-        response = requests.get(url)
-        if response.status_code != 200:
-            print(f"Warning: Unable to retrieve {url} (HTTP {response.status_code})")
-            return []
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Attempt to find all tables
-        tables = soup.find_all("table", {"class": "wikitable"})
-        roster_names = []
-        for table in tables:
-            headers = [th.get_text().strip().lower() for th in table.find_all("th")]
-            # Look for a header that suggests a player column.
-            if any("player" in header for header in headers):
-                # Assume the first column contains the player names.
-                for row in table.find_all("tr")[1:]:
-                    cols = row.find_all(["td", "th"])
-                    if cols:
-                        # Clean up the player name string.
-                        player = cols[0].get_text().strip()
-                        if player:
-                            roster_names.append(player)
-                # Once a roster is found, break.
-                if roster_names:
-                    break
-        return roster_names
+        return parse_wikipedia_roster(cached_get(url, requests.get))
+    except requests.HTTPError as e:
+        print(f"Warning: Unable to retrieve {url} (HTTP {e.response.status_code})")
+        return []
     except Exception as e:
         print(f"Error scraping Wikipedia URL {url}: {e}")
         return []
 
+@timed("parse")
+def parse_wikipedia_roster(content):
+    """Return the player names in the first wikitable with a 'Player' header."""
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    # Attempt to find all tables
+    tables = soup.find_all("table", {"class": "wikitable"})
+    roster_names = []
+    for table in tables:
+        headers = [th.get_text().strip().lower() for th in table.find_all("th")]
+        # Look for a header that suggests a player column.
+        if any("player" in header for header in headers):
+            # Assume the first column contains the player names.
+            for row in table.find_all("tr")[1:]:
+                cols = row.find_all(["td", "th"])
+                if cols:
+                    # Clean up the player name string.
+                    player = cols[0].get_text().strip()
+                    if player:
+                        roster_names.append(player)
+            # Once a roster is found, break.
+            if roster_names:
+                break
+    return roster_names
+
 # --- Function to Get a Player's VORP from their Advanced Stats ---
 def get_player_vorp(player_name, season_input):
     """
@@ -107,7 +116,8 @@ def get_player_vorp(player_name, season_input):
     """
     try:
         # Fetch advanced stats; we assume non-playoffs, non-career mode returns season-specific stats.
-        stats_df = get_stats(player_name, stat_type='ADVANCED', playoffs=False, career=False)
+        with timed("fetch"):
+            stats_df = get_stats(player_name, stat_type='ADVANCED', playoffs=False, career=False)
         if stats_df is None or stats_df.empty:
             return None
         # If a 'SEASON' column exists, try to filter on season.
@@ -151,12 +161,14 @@ def main():
     # To keep a running summary of all validated players and their VORP for the season.
     validated_players_summary = []
 
+    stats.reset("top10VORPnew.py")
     # Loop over each team abbreviation in the mapping.
-    for team_abbrev, team_full_name in TEAM_MAPPING.items():
+    for team_abbrev, team_full_name in stats.track_teams(TEAM_MAPPING.items(), key=lambda item: item[0]):
         print(f"\nProcessing team: {team_full_name} ({team_abbrev}) for season {season_input}")
         # Step 1: Get the Basketball Reference roster
         try:
-            bbr_roster = get_roster(team_abbrev, season_end_year)
+            with timed("fetch"):
+                bbr_roster = get_roster(team_abbrev, season_end_year)
             # Assume the player's names are in the column 'PLAYER'
             if 'PLAYER' not in bbr_roster.columns:
                 print(f"Warning: Roster for {team_full_name} does not contain a 'PLAYER' column.")
@@ -187,7 +199,7 @@ def main():
         for player in validated_players:
             vorp = get_player_vorp(player, season_input)
             # Optionally add a short delay to be polite to remote servers
-            time.sleep(0.5)
+            stats.polite_sleep(sites.url("basketball-reference", "/"), 0.5)
             if vorp is not None:
                 team_player_vorp[player] = vorp
                 print(f"Found {player}: VORP = {vorp:.2f}")
@@ -235,6 +247,7 @@ def main():
         print(summary_group)
     else:
         print("No validated player VORP data was found.")
+    stats.write(REPORT_PATH)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,12 +1,18 @@
+import argparse
 import asyncio
-import aiohttp
-import aiohttp_client_cache
-from bs4 import BeautifulSoup, Comment
-import random
 import re
 import unicodedata
 import csv
 
+import asyncfetch
+import sites
+from asyncfetch import FetchError, cached_session, safe_get
+from htmlparse import find_captioned_tables, find_tables, page_title
+from journal import Journal
+from playerindex import PlayerIndex, build_player_index, player_url
+from runstats import stats, timed
+from seasons import parse_season_range, season_label
+
 VERBOSE = False
 
 teams = [
@@ -53,102 +59,172 @@ team_abbr_map = {
     "Orlando Magic": "ORL", "Washington Wizards": "WAS"
 }
 
-# We define a semaphore and a helper for rate limiting.
-# The original code allowed 10 req/min with a delay of 6-9 seconds.
-# Now, to allow up to 20 req/min, we set the delay to a random value between 3 and 3.5 seconds.
-RATE_LIMIT_DELAY_LOW = 3
-RATE_LIMIT_DELAY_HIGH = 3.5
-rate_limiter = asyncio.Semaphore(1)
-
-
-async def safe_get(url, session):
-    """A helper that makes a GET request while enforcing the rate limit and random delay."""
-    async with rate_limiter:
-        try:
-            async with session.get(url) as response:
-                text = await response.text()
-        except Exception as e:
-            print(f"⚠️ Error fetching {url}: {e}")
-            return None
-        # Enforce a delay before releasing the semaphore to respect rate limit
-        await asyncio.sleep(random.uniform(RATE_LIMIT_DELAY_LOW, RATE_LIMIT_DELAY_HIGH))
-        return text
-
-
 async def get_team_player_names(season, team, session):
-    url = f"https://en.wikipedia.org/wiki/{season}_{team}_season"
+    url = sites.url("wikipedia", f"/wiki/{season}_{team}_season")
     print(f"🔍 Scraping Wikipedia for team roster: {url}")
     html = await safe_get(url, session)
     if html is None:
         print(f"❌ Failed to load page: {url}")
         return []
-    soup = BeautifulSoup(html, 'html.parser')
+    return parse_team_player_names(html, season, team)
+
+
+@timed("parse")
+def parse_team_player_names(html, season, team):
+    """Return the player names in the roster table of a team's Wikipedia season page."""
     player_names = []
     season_dash = season.replace("-", "–")
     team_spaces = team.replace("_", " ")
     target_caption = f"{season_dash} {team_spaces} roster"
-    for caption in soup.find_all('caption'):
-        if target_caption in caption.text:
-            roster_table = caption.find_parent('table')
-            if roster_table:
-                for row in roster_table.find_all('tr')[1:]:
-                    cells = row.find_all('td')
-                    if len(cells) >= 3:
-                        player_tag = cells[2].find('a', href=True)
-                        if player_tag:
-                            name = player_tag.text.strip()
-                            player_names.append(name)
+    for roster_table in find_captioned_tables(html, target_caption):
+        for row in roster_table.find_all('tr')[1:]:
+            cells = row.find_all('td')
+            if len(cells) >= 3:
+                player_tag = cells[2].find('a', href=True)
+                if player_tag:
+                    name = player_tag.text.strip()
+                    player_names.append(name)
     return player_names
 
 
-def verify_player_team_season(bbr_html, target_season, target_team_abbr):
-    soup = BeautifulSoup(bbr_html, 'html.parser')
-    def process_table(table, source=""):
-        if not table:
-            if VERBOSE:
-                print(f"❌ No table found in {source}")
-            return False
+def extract_team_seasons(table):
+    """Return the (season, team abbreviation) pairs listed in a per_game_stats table."""
+    team_seasons = []
+    if not table:
         if VERBOSE:
-            print(f"🧩 Found per_game_stats table in {source}!")
-        tbody = table.find('tbody')
-        if not tbody:
-            if VERBOSE:
-                print(f"❌ <tbody> missing in {source}")
-            return False
-        rows = tbody.find_all('tr')
+            print("❌ No per_game_stats table found")
+        return team_seasons
+    tbody = table.find('tbody')
+    if not tbody:
         if VERBOSE:
-            print(f"📊 Found {len(rows)} rows in {source}")
-        for i, row in enumerate(rows):
-            season_cell = row.find('th', {'data-stat': 'year_id'})
-            team_cell = row.find('td', {'data-stat': 'team_name_abbr'})
-            if VERBOSE:
-                print(f"\n🔁 {source} Row {i+1}:")
-                if season_cell:
-                    print(f"   ✅ season: {season_cell.get_text(strip=True)}")
-                if team_cell:
-                    print(f"   ✅ team: {team_cell.get_text(strip=True)}")
-            if season_cell and team_cell:
-                season_raw = season_cell.get_text(strip=True)
-                team_raw = team_cell.get_text(strip=True)
-                if season_raw.endswith(str(target_season)[-2:]) and team_raw == target_team_abbr:
-                    if VERBOSE:
-                        print(f"✅ MATCH FOUND in {source}: {season_raw}, {team_raw}")
-                    return True
+            print("❌ <tbody> missing in per_game_stats")
+        return team_seasons
+    rows = tbody.find_all('tr')
+    if VERBOSE:
+        print(f"📊 Found {len(rows)} rows in per_game_stats")
+    for row in rows:
+        season_cell = row.find('th', {'data-stat': 'year_id'})
+        team_cell = row.find('td', {'data-stat': 'team_name_abbr'})
+        if season_cell and team_cell:
+            team_seasons.append((season_cell.get_text(strip=True), team_cell.get_text(strip=True)))
+    return team_seasons
+
+
+def extract_advanced_rows(table):
+    """Return every season row of an advanced table as a dict of data-stat -> cell text."""
+    advanced_rows = []
+    if not table:
+        return advanced_rows
+    tbody = table.find('tbody')
+    if not tbody:
+        return advanced_rows
+    for row in tbody.find_all('tr', id=lambda x: x and x.startswith("advanced.")):
+        if not row.find('th', {'data-stat': 'year_id'}):
+            continue
+        advanced_rows.append({cell['data-stat']: cell.get_text(strip=True)
+                              for cell in row.find_all(['th', 'td']) if cell.has_attr('data-stat')})
+    return advanced_rows
+
+
+class PlayerPage:
+    """
+    A Basketball Reference player page, parsed once. Holds the player's name, the seasons and teams
+    they played for (from per_game_stats) and every row of their advanced stats (VORP, BPM, WS, ...).
+    """
+
+    @timed("parse")
+    def __init__(self, html):
+        title = page_title(html)
+        self.name = title.split(" Stats")[0] if title else None
+        tables = find_tables(html, ("per_game_stats", "advanced"))
+        self.team_seasons = extract_team_seasons(tables["per_game_stats"])
+        self.advanced_rows = extract_advanced_rows(tables["advanced"])
+
+    def played_for(self, target_season, target_team_abbr):
+        """True if the player has a per-game row for `target_team_abbr` in the season ending in `target_season`."""
+        for season_raw, team_raw in self.team_seasons:
+            if season_raw.endswith(str(target_season)[-2:]) and team_raw == target_team_abbr:
+                if VERBOSE:
+                    print(f"✅ MATCH FOUND: {season_raw}, {team_raw}")
+                return True
         return False
 
-    main_table = BeautifulSoup(bbr_html, 'html.parser').find('table', id='per_game_stats')
-    if process_table(main_table, "main HTML"):
-        return True
-    for comment in BeautifulSoup(bbr_html, 'html.parser').find_all(string=lambda text: isinstance(text, Comment)):
-        comment_soup = BeautifulSoup(comment, 'html.parser')
-        table = comment_soup.find('table', id='per_game_stats')
-        if process_table(table, "HTML comment"):
-            return True
-    return False
+    def advanced_stats(self, season_str):
+        """Return the advanced stats rows for a season string like '2021-22'."""
+        return [row for row in self.advanced_rows if row.get('year_id') == season_str]
+
+    def vorp(self, season_str):
+        for row in self.advanced_stats(season_str):
+            if 'vorp' in row:
+                try:
+                    return float(row['vorp'])
+                except ValueError:
+                    return None
+        return None
+
+
+def verify_player_team_season(bbr_html, target_season, target_team_abbr):
+    return PlayerPage(bbr_html).played_for(target_season, target_team_abbr)
 
 
-async def find_bbr_url_for_player(player_name, target_season, target_team_abbr, session):
-    base_url = "https://www.basketball-reference.com/players"
+async def get_player_page(url, session, page_cache=None, page_season=None):
+    """
+    Fetch and parse a player page. Pages kept in `page_cache` (url -> task) are reused, so a
+    player found in one season costs no further fetches or parsing in the others. `page_season` is
+    the latest season needed from the page, which decides whether a cached copy is still current.
+    """
+    if page_cache is None:
+        return await fetch_player_page(url, session, page_season)
+    # The cache holds one task per URL, so concurrent lookups of the same player share a single fetch.
+    if url not in page_cache:
+        page_cache[url] = asyncio.ensure_future(fetch_player_page(url, session, page_season))
+    task = page_cache[url]
+    try:
+        return await task
+    except FetchError:
+        # Don't keep the failure: the next lookup of this player (or --resume) fetches the page again.
+        if page_cache.get(url) is task:
+            del page_cache[url]
+        raise
+
+
+async def fetch_player_page(url, session, page_season=None):
+    # A page that failed to load raises FetchError, so it isn't taken for a slug that doesn't exist.
+    html = await safe_get(url, session, page_season, raise_errors=True)
+    if not html:
+        return None
+    return PlayerPage(html)
+
+
+async def check_player_url(url, player_name, target_season, target_team_abbr, session, page_cache=None,
+                           page_season=None):
+    """Fetch a candidate player page and return it if the player was on `target_team_abbr` that season."""
+    stats.probe(target_season, target_team_abbr, player_name)
+    page = await get_player_page(url, session, page_cache, page_season or target_season)
+    if page is None:
+        return None
+    if page.played_for(target_season, target_team_abbr) and page.name is not None:
+        print(f"✅ Verified Match: {player_name} → {url} ({page.name})")
+        return page
+    print(f"❌ {player_name} not active for {target_team_abbr} in {target_season} at {url}")
+    return None
+
+
+async def find_bbr_url_for_player(player_name, target_season, target_team_abbr, session, player_index=None,
+                                  page_cache=None, page_season=None):
+    base_url = sites.url("basketball-reference", "/players")
+
+    # Look the name up in the local player index first; only fall back to probing slugs on a miss.
+    tried = set()
+    if player_index is not None:
+        for slug in player_index.lookup(player_name, target_season):
+            url = player_url(slug)
+            tried.add(url)
+            page = await check_player_url(url, player_name, target_season, target_team_abbr, session, page_cache,
+                                          page_season)
+            if page:
+                return url, page
+
     parts = player_name.strip().split()
 
     # Define suffix tokens (removing punctuation for matching)
@@ -158,7 +234,7 @@ async def find_bbr_url_for_player(player_name, target_season, target_team_abbr,
 
     if len(parts) < 2:
         print(f"⚠️ Skipping incomplete name: {player_name}")
-        return None
+        return None, None
 
     # If the first two tokens are initials (end with a period), combine them.
     if len(parts) >= 3 and parts[0].endswith('.') and parts[1].endswith('.'):
@@ -182,42 +258,19 @@ async def find_bbr_url_for_player(player_name, target_season, target_team_abbr,
     lookup_slug = (last_name_ascii[:5] + first_name_clean[:2]).lower()
     lookup_slug = re.sub(r'[^a-z]', '', lookup_slug)
 
-    def normalize_and_standardize_name(name):
-        name = unicodedata.normalize("NFKD", name)
-        name = re.sub(r'[^\w\s]', '', name)
-        tokens = name.strip().split()
-        suffixes = {"jr", "sr", "ii", "iii", "iv", "v"}
-        reordered = []
-        for token in tokens:
-            if token.lower() in suffixes:
-                reordered.insert(1, token.lower())
-            else:
-                reordered.append(token.lower())
-        return ''.join(reordered)
-
     # Try a few slug variations.
     for i in range(1, 9):
         suffix = f"{i:02d}"
         slug = f"{lookup_slug}{suffix}"
         url = f"{base_url}/{first_initial}/{slug}.html"
-        html = await safe_get(url, session)
-        if not html:
+        if url in tried:
             continue
-        if verify_player_team_season(html, target_season, target_team_abbr):
-            soup = BeautifulSoup(html, 'html.parser')
-            title_tag = soup.find('title')
-            if not title_tag:
-                continue
-            title_text = title_tag.text.strip()
-            bbr_name = title_text.split(" Stats")[0]
-            norm_bbr = normalize_and_standardize_name(bbr_name)
-            norm_target = normalize_and_standardize_name(player_name)
-            print(f"✅ Verified Match: {player_name} → {url} ({bbr_name})")
-            return url
-        else:
-            print(f"❌ {player_name} not active for {target_team_abbr} in {target_season} at {url}")
+        page = await check_player_url(url, player_name, target_season, target_team_abbr, session, page_cache,
+                                      page_season)
+        if page:
+            return url, page
     print(f"❌ No match found for {player_name}")
-    return None
+    return None, None
 
 
 async def get_player_vorp(bbr_url, season_str, session):
@@ -225,116 +278,305 @@ async def get_player_vorp(bbr_url, season_str, session):
     Given a player's Basketball Reference URL and season string (e.g., '2021-22'),
     fetch the advanced stats table (including those in HTML comments) and extract VORP.
     """
-    html = await safe_get(bbr_url, session)
+    html = await safe_get(bbr_url, session, int(season_str[:4]) + 1)
     if not html:
         print(f"❌ Could not load advanced stats for {bbr_url}")
         return None
-    soup = BeautifulSoup(html, 'html.parser')
-    advanced_table = soup.find('table', id='advanced')
-
-    def extract_vorp_from_table(table):
-        if not table:
-            return None
-        tbody = table.find('tbody')
-        if not tbody:
-            return None
-        rows = tbody.find_all('tr', id=lambda x: x and x.startswith("advanced."))
-        for row in rows:
-            year_cell = row.find('th', {'data-stat': 'year_id'})
-            if not year_cell:
-                continue
-            season_text = year_cell.get_text(strip=True)
-            if season_text == season_str:
-                vorp_cell = row.find('td', {'data-stat': 'vorp'})
-                if vorp_cell:
-                    vorp_raw = vorp_cell.get_text(strip=True)
-                    try:
-                        return float(vorp_raw)
-                    except:
-                        return None
-        return None
+    return PlayerPage(html).vorp(season_str)
 
-    vorp = extract_vorp_from_table(advanced_table)
-    if vorp is not None:
-        return vorp
-    # Fallback: check within HTML comments.
-    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-        comment_soup = BeautifulSoup(comment, 'html.parser')
-        table = comment_soup.find('table', id='advanced')
-        vorp = extract_vorp_from_table(table)
-        if vorp is not None:
-            return vorp
-    return None
 
+# Abbreviations Basketball Reference uses for past franchise names, mapped to today's team.
+franchise_abbr_map = {
+    "CHA": "CHO", "NJN": "BRK", "NOH": "NOP", "NOK": "NOP", "SEA": "OKC", "VAN": "MEM"
+}
+abbr_team_map = {abbr: name for name, abbr in team_abbr_map.items()}
+MULTI_TEAM_RE = re.compile(r"^(TOT|\dTM)$")
 
-async def main():
-    input_season = 2023 # Change this to the desired season
-    season = f"{input_season - 1}-{str(input_season)[-2:]}"  # e.g., "2021-22"
-    results = []
+
+@timed("parse")
+def parse_league_advanced(html):
+    """
+    Return (player, url, team abbreviation, vorp) for every player-team row of a season's league-wide
+    advanced table. Season-total rows of traded players (TOT / 2TM / 3TM) are skipped, so each row
+    is one stint with one team.
+    """
+    tables = find_tables(html, ("advanced", "advanced_stats"))
+    table = tables["advanced"] or tables["advanced_stats"]
+    if table is None:
+        return []
+    rows = []
+    for row in (table.find('tbody') or table).find_all('tr'):
+        name_cell = row.find('td', {'data-stat': ['name_display', 'player']})
+        team_cell = row.find('td', {'data-stat': ['team_name_abbr', 'team_id']})
+        vorp_cell = row.find('td', {'data-stat': 'vorp'})
+        if not (name_cell and team_cell and vorp_cell):
+            continue
+        team = team_cell.get_text(strip=True)
+        if MULTI_TEAM_RE.match(team):
+            continue
+        try:
+            vorp = float(vorp_cell.get_text(strip=True))
+        except ValueError:
+            continue
+        link = name_cell.find('a', href=True)
+        url = sites.url("basketball-reference", link['href']) if link else None
+        rows.append((name_cell.get_text(strip=True), url, team, vorp))
+    return rows
+
+
+async def get_league_team_vorp(input_season, session):
+    """
+    Build one season's (results, team_vorp) from the league-wide advanced stats page
+    (https://www.basketball-reference.com/leagues/NBA_{season}_advanced.html): one fetch and a local
+    group-by by team, with no roster scraping or player name resolution at all.
+    """
+    url = sites.url("basketball-reference", f"/leagues/NBA_{input_season}_advanced.html")
+    print(f"\n🔍 Scraping league advanced stats: {url}")
+    html = await safe_get(url, session)
+    if html is None:
+        print(f"❌ Failed to load page: {url}")
+        return [], {}
+    by_team = {}
+    for player_name, bbr_url, team, vorp in parse_league_advanced(html):
+        team = franchise_abbr_map.get(team, team)
+        full_team_name = abbr_team_map.get(team)
+        if full_team_name is None:
+            print(f"⚠️ Unknown team abbreviation {team} for {player_name}")
+            full_team_name = team
+        by_team.setdefault(full_team_name, []).append((full_team_name, player_name, bbr_url, vorp))
+
+    # Same team order as the roster pipeline.
+    ordered = [team.replace("_", " ") for team in teams]
+    ordered += [name for name in by_team if name not in ordered]
+    results = [result for name in ordered for result in by_team.get(name, [])]
     team_vorp = {}
+    for full_team_name, player_name, bbr_url, vorp in results:
+        team_vorp.setdefault(full_team_name, []).append((player_name, vorp))
+    return results, team_vorp
+
+
+TOP9_HEADER = ["team", "season", "player1vorp", "player2vorp", "player3vorp", "player4vorp",
+               "player5vorp", "player6vorp", "player7vorp", "player8vorp", "player9vorp"]
+
+
+def stats_team(input_season, full_team_name):
+    """The team's key in the run stats, prefixed so it can't collide with another scraper's."""
+    return f"vorp {input_season} {full_team_name}"
+
+
+# Number of concurrent workers per pipeline stage. These only bound how much work is in flight;
+# the per-host rate scheduler is what actually throttles requests.
+ROSTER_WORKERS = 4
+RESOLVE_WORKERS = 8
+STATS_WORKERS = 2
 
-    # Create an asynchronous cached session.
-    async with aiohttp_client_cache.CachedSession(
-            cache_name='basketball_cache', expire_after=86400,
-            headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Referer': 'https://www.google.com/'
-            }) as session:
-
-        # Loop through teams sequentially.
-        for team in teams:
-            full_team_name = team.replace("_", " ")
-            team_abbr = team_abbr_map.get(full_team_name)
-            wiki_url = f"https://en.wikipedia.org/wiki/{season}_{team}_season"
-            print(f"\n🔍 Scraping Wikipedia: {wiki_url}")
-            player_names = await get_team_player_names(season, team, session)
-            for player_name in player_names:
-                print(f"{full_team_name} - {player_name}")
-                bbr_url = await find_bbr_url_for_player(player_name, input_season, team_abbr, session)
-                if bbr_url:
-                    vorp = await get_player_vorp(bbr_url, season, session)
-                    if vorp is not None:
-                        print(f"   ↪ VORP for {season}: {vorp}")
-                    else:
-                        print(f"   ↪ No VORP data found for {season}")
-                    results.append((full_team_name, player_name, bbr_url, vorp))
-                    if vorp is not None:
-                        team_vorp.setdefault(full_team_name, []).append((player_name, vorp))
-                else:
-                    results.append((full_team_name, player_name, "❌ Not Found", None))
-                # (safe_get already delays, so no additional sleep required here)
-
-            print("-" * 50)
-
-        print("\n📋 FINAL RESULTS:")
-        for team_name, player, link, vorp in results:
-            print(f"{team_name} - {player}: {link} - VORP: {vorp}")
-
-        # Prepare CSV rows.
-        csv_rows = []
-        header = ["team", "season", "player1vorp", "player2vorp", "player3vorp", "player4vorp",
-                  "player5vorp", "player6vorp", "player7vorp", "player8vorp", "player9vorp"]
-        csv_rows.append(header)
-
-        print("\n🏆 TOP 9 Player VORPs by Team:")
-        for team_name, players in team_vorp.items():
-            sorted_players = sorted(players, key=lambda x: x[1], reverse=True)
-            top9 = [p[1] for p in sorted_players[:9]]
-            top9 += [""] * (9 - len(top9))
-            print(f"{team_name} ({season}):")
-            for i, (player, vorp) in enumerate(sorted_players[:9], start=1):
-                print(f"  {i}. {player} (VORP: {vorp})")
-            row = [team_name, input_season] + top9
-            csv_rows.append(row)
-
-        csv_filename = f"team_top9_vorp_{input_season}.csv"
-        with open(csv_filename, mode="w", newline="", encoding="utf-8") as f:
-            import csv
-            writer = csv.writer(f)
-            writer.writerows(csv_rows)
-        print(f"\n✅ CSV file written: {csv_filename}")
+
+async def run_stage(queue, workers, handle):
+    """Start `workers` tasks that call `handle(item)` for every item put on `queue`."""
+    async def worker():
+        while True:
+            item = await queue.get()
+            try:
+                await handle(*item)
+            except Exception as e:
+                print(f"⚠️ Error processing {item[:3]}: {e}")
+            finally:
+                queue.task_done()
+    return [asyncio.create_task(worker()) for _ in range(workers)]
+
+
+async def scrape_seasons(seasons, session, player_index, page_cache, journal=None):
+    """
+    Scrape every team's roster for each season as a staged pipeline:
+    roster stage -> identity-resolution stage -> stats stage, with a queue between stages and a
+    bounded pool of workers on each. Work from all teams (and seasons) overlaps, so the host rate
+    limits are the only throttle. Returns {season: (results, team_vorp)} in team/roster order.
+    Every finished player is written to `journal`, and players already in it are not looked up again.
+    """
+    roster_queue = asyncio.Queue()
+    resolve_queue = asyncio.Queue()
+    stats_queue = asyncio.Queue()
+    # (season, team index, player index) -> (full_team_name, player_name, bbr_url, vorp)
+    collected = {}
+    # Player pages are shared by every season in the run, so a cached copy has to be current for the latest.
+    page_season = max(seasons)
+
+    async def roster_stage(input_season, team_index, team):
+        season = season_label(input_season)
+        wiki_url = sites.url("wikipedia", f"/wiki/{season}_{team}_season")
+        print(f"\n🔍 Scraping Wikipedia: {wiki_url}")
+        team_key = stats_team(input_season, team.replace('_', ' '))
+        stats.start_team(team_key)
+        player_names = await get_team_player_names(season, team, session)
+        # The team's wall time runs until its last player has been through the stats stage.
+        stats.team_items(team_key, len(player_names))
+        for player_index_in_team, player_name in enumerate(player_names):
+            resolve_queue.put_nowait((input_season, team_index, player_index_in_team, team, player_name))
+
+    async def resolve_stage(input_season, team_index, player_index_in_team, team, player_name):
+        full_team_name = team.replace("_", " ")
+        team_abbr = team_abbr_map.get(full_team_name)
+        done = journal.get(input_season, full_team_name, player_name) if journal else None
+        if done:
+            print(f"⏭️ {full_team_name} - {player_name} already done")
+            collected[(input_season, team_index, player_index_in_team)] = (
+                full_team_name, player_name, done["url"] or "❌ Not Found", done["vorp"])
+            stats.team_item_done(stats_team(input_season, full_team_name))
+            return
+        print(f"{full_team_name} - {player_name}")
+        try:
+            bbr_url, page = await find_bbr_url_for_player(player_name, input_season, team_abbr, session,
+                                                          player_index, page_cache, page_season)
+        except FetchError as e:
+            # Not journaled, so --resume looks the player up again instead of keeping them as not found.
+            print(f"⚠️ {player_name} skipped, a page failed to load ({e}); rerun with --resume to retry")
+            collected[(input_season, team_index, player_index_in_team)] = (
+                full_team_name, player_name, "❌ Not Found", None)
+            stats.team_item_done(stats_team(input_season, full_team_name))
+            return
+        stats_queue.put_nowait((input_season, team_index, player_index_in_team, full_team_name, player_name,
+                                bbr_url, page))
+
+    async def stats_stage(input_season, team_index, player_index_in_team, full_team_name, player_name, bbr_url, page):
+        key = (input_season, team_index, player_index_in_team)
+        vorp = None
+        if bbr_url:
+            # The verified page already holds the advanced stats, so VORP needs no second fetch.
+            season = season_label(input_season)
+            vorp = page.vorp(season)
+            if vorp is not None:
+                print(f"   ↪ {player_name} VORP for {season}: {vorp}")
+            else:
+                print(f"   ↪ No VORP data found for {player_name} in {season}")
+        collected[key] = (full_team_name, player_name, bbr_url or "❌ Not Found", vorp)
+        if journal:
+            journal.append({"season": input_season, "team": full_team_name, "player": player_name,
+                            "url": bbr_url, "vorp": vorp})
+        stats.team_item_done(stats_team(input_season, full_team_name))
+
+    stats.expect_teams(len(seasons) * len(teams))
+    for input_season in seasons:
+        for team_index, team in enumerate(teams):
+            roster_queue.put_nowait((input_season, team_index, team))
+
+    workers = (await run_stage(roster_queue, ROSTER_WORKERS, roster_stage)
+               + await run_stage(resolve_queue, RESOLVE_WORKERS, resolve_stage)
+               + await run_stage(stats_queue, STATS_WORKERS, stats_stage))
+    # Each stage only feeds the next, so once a queue has drained its upstream stages are done too.
+    await roster_queue.join()
+    await resolve_queue.join()
+    await stats_queue.join()
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+
+    by_season = {}
+    for input_season in seasons:
+        results = []
+        team_vorp = {}
+        for key in sorted(k for k in collected if k[0] == input_season):
+            full_team_name, player_name, bbr_url, vorp = collected[key]
+            results.append((full_team_name, player_name, bbr_url, vorp))
+            if vorp is not None:
+                team_vorp.setdefault(full_team_name, []).append((player_name, vorp))
+        by_season[input_season] = (results, team_vorp)
+    return by_season
+
+
+def top9_rows(input_season, team_vorp):
+    """Build the CSV rows (without header) of each team's top 9 VORPs for one season."""
+    season = season_label(input_season)
+    rows = []
+    print(f"\n🏆 TOP 9 Player VORPs by Team ({season}):")
+    for team_name, players in team_vorp.items():
+        sorted_players = sorted(players, key=lambda x: x[1], reverse=True)
+        top9 = [p[1] for p in sorted_players[:9]]
+        top9 += [""] * (9 - len(top9))
+        print(f"{team_name} ({season}):")
+        for i, (player, vorp) in enumerate(sorted_players[:9], start=1):
+            print(f"  {i}. {player} (VORP: {vorp})")
+        rows.append([team_name, input_season] + top9)
+    return rows
+
+
+def write_top9_csv(csv_filename, rows):
+    with open(csv_filename, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(TOP9_HEADER)
+        writer.writerows(rows)
+    print(f"\n✅ CSV file written: {csv_filename}")
+
+
+JOURNAL_PATH = "team_top9_vorp.journal.jsonl"
+REPORT_PATH = "top10VORPold.report.json"
+
+
+async def main(seasons=(2023,), offline=False, refresh_index=False, combined=False, resume=False, source="rosters",
+               report_path=REPORT_PATH, progress=False):
+    asyncfetch.CACHE_ONLY = offline
+    # With report_path=None the caller (e.g. build_dataset.py) owns the run report.
+    if report_path:
+        stats.reset("top10VORPold.py", live=progress)
+    # A player's page holds every season of their career, so pages are parsed once and shared by all seasons.
+    page_cache = {}
+    all_rows = []
+
+    # Create an asynchronous session backed by the shared page cache (page_cache.sqlite).
+    async with cached_session() as session:
+
+        if source == "league":
+            # One league-wide page per season replaces hundreds of roster and player page fetches.
+            by_season = dict(zip(seasons, await asyncio.gather(
+                *(get_league_team_vorp(input_season, session) for input_season in seasons))))
+        else:
+            # Completed players are journaled as they finish, so an interrupted run can continue with
+            # --resume. Only roster mode opens the journal: opening it without --resume truncates it.
+            journal = Journal(JOURNAL_PATH, ("season", "team", "player"), resume=resume)
+            # Name -> slug lookups go through the local player index; missing or stale letters are fetched.
+            player_index = PlayerIndex()
+            await build_player_index(player_index, lambda url: safe_get(url, session), refresh=refresh_index,
+                                     season=max(seasons))
+            by_season = await scrape_seasons(seasons, session, player_index, page_cache, journal)
+            player_index.close()
+            journal.close()
+
+        for input_season in seasons:
+            results, team_vorp = by_season[input_season]
+
+            print("\n📋 FINAL RESULTS:")
+            for team_name, player, link, vorp in results:
+                print(f"{team_name} - {player}: {link} - VORP: {vorp}")
+
+            rows = top9_rows(input_season, team_vorp)
+            write_top9_csv(f"team_top9_vorp_{input_season}.csv", rows)
+            all_rows.extend(rows)
+
+    # One file with every season, using the column names of merged_nba_data_all_seasons.csv.
+    if combined and len(seasons) > 1:
+        write_top9_csv(f"team_top9_vorp_{seasons[0]}-{seasons[-1]}.csv", all_rows)
+    if report_path:
+        stats.write(report_path)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape the top 9 player VORPs for every NBA team.")
+    parser.add_argument("--seasons", type=parse_season_range, default=[2023],
+                        help="season end year or range of them, e.g. 2023 or 2014-2025 (default: 2023)")
+    parser.add_argument("--source", choices=["rosters", "league"], default="rosters",
+                        help="rosters: Wikipedia rosters + player pages (default); "
+                             "league: the season's league-wide advanced stats table, one fetch per season")
+    parser.add_argument("--combined", action="store_true",
+                        help="also write every season to one team_top9_vorp_{first}-{last}.csv")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"skip players already recorded in {JOURNAL_PATH} by an interrupted run")
+    parser.add_argument("--offline", action="store_true",
+                        help="cache-only mode: read pages from the page cache and never touch the network")
+    parser.add_argument("--refresh-index", action="store_true",
+                        help="re-fetch the Basketball Reference player index (e.g. to pick up new rookies)")
+    parser.add_argument("--report", default=REPORT_PATH,
+                        help=f"where to write the JSON run report (default: {REPORT_PATH})")
+    parser.add_argument("--progress", action="store_true", help="show a live progress/ETA line on stderr")
+    args = parser.parse_args()
+    asyncio.run(main(seasons=args.seasons, offline=args.offline, refresh_index=args.refresh_index,
+                     combined=args.combined, resume=args.resume, source=args.source,
+                     report_path=args.report, progress=args.progress))
@@ -1,35 +1,63 @@
+import argparse
 import csv
-import time
+import re
 import cloudscraper
-from bs4 import BeautifulSoup
+import asyncfetch
+from bs4 import SoupStrainer
+from htmlparse import make_soup
+from pagecache import cached_get
+from runstats import stats, timed
+import sites
 
-def get_top_10_ovrs(team_slug, season_label):
-    url = f"https://www.2kratings.com/teams/{team_slug}"
-    print(f"Fetching URL: {url}")
-
-    scraper = cloudscraper.create_scraper()
-    response = scraper.get(url)
-    response.encoding = 'utf-8'
-    soup = BeautifulSoup(response.text, 'html.parser')
+team_slug_map = {
+    # Western Conference:
+    # -
+    # Northwest Division:
+    "DEN": "denver-nuggets", 
+    "MIN": "minnesota-timberwolves", 
+    "POR": "portland-trail-blazers", 
+    "OKC": "oklahoma-city-thunder",
+    "UTA": "utah-jazz",
+    # Southwest Division:
+    "HOU": "houston-rockets",
+    "DAL": "dallas-mavericks",
+    "MEM": "memphis-grizzlies",
+    "NOP": "new-orleans-pelicans",
+    "SAS": "san-antonio-spurs",
+    # Pacific Division:
+    "GSW": "golden-state-warriors",
+    "LAL": "los-angeles-lakers",
+    "LAC": "los-angeles-clippers",
+    "PHO": "phoenix-suns",
+    "SAC": "sacramento-kings",
+    # ------------------------------------------------------
+    # Eastern Conference:
+    # -
+    # Atlantic Division:
+    "BOS": "boston-celtics",
+    "PHI": "philadelphia-76ers",
+    "TOR": "toronto-raptors",
+    "NYK": "new-york-knicks",
+    "BRK": "brooklyn-nets",
+    # Central Division:
+    "MIL": "milwaukee-bucks",
+    "CLE": "cleveland-cavaliers",
+    "CHI": "chicago-bulls",
+    "DET": "detroit-pistons",
+    "IND": "indiana-pacers",
+    # Southeast Division:
+    "MIA": "miami-heat",
+    "ATL": "atlanta-hawks",
+    "WAS": "washington-wizards",
+    "CHO": "charlotte-hornets",
+    "ORL": "orlando-magic"
+}
 
-    # Debug: print a small portion of page to see what it contains
-    print("Preview of page source:")
-    print(soup.prettify()[:1000])
-
-    # Find correct section using nav ID instead of p-tag text
-    nav_id = f"nav-2k{str(int(season_label.split('-')[1]))[-2:]}-tab"
-    print(f"Looking for nav section ID: {nav_id}")
-    nav_div = soup.find('h5', id=nav_id)
-    if not nav_div:
-        print(f"Could not find nav section ID {nav_id} in {team_slug}")
-        return [None] * 10
-
-    # Find the table following this div
-    table = nav_div.find_next('table')
-    if not table:
-        print(f"No table found for section ID {nav_id} in {team_slug}")
-        return [None] * 10
+NAV_ID_RE = re.compile(r"^nav-2k(\d{2})-tab$")
+REPORT_PATH = "topten2kratingscraper.report.json"
 
+def parse_ovr_table(table):
+    """Return the top 10 OVRs in a 2K roster table, padded with None to 10 entries."""
     ovr_list = []
     for row in table.find_all('tr')[1:]:
         cells = row.find_all('td')
@@ -41,72 +69,95 @@ def get_top_10_ovrs(team_slug, season_label):
                     ovr_list.append(ovr)
                 except ValueError:
                     pass
-
-    print(f"Found OVRs for {team_slug}: {ovr_list[:10]}")
     return ovr_list[:10] + [None] * (10 - len(ovr_list[:10]))
 
-def write_ovr_csv(year):
-    team_slug_map = {
-        # Western Conference:
-        # -
-        # Northwest Division:
-        "DEN": "denver-nuggets", 
-        "MIN": "minnesota-timberwolves", 
-        "POR": "portland-trail-blazers", 
-        "OKC": "oklahoma-city-thunder",
-        "UTA": "utah-jazz",
-        # Southwest Division:
-        "HOU": "houston-rockets",
-        "DAL": "dallas-mavericks",
-        "MEM": "memphis-grizzlies",
-        "NOP": "new-orleans-pelicans",
-        "SAS": "san-antonio-spurs",
-        # Pacific Division:
-        "GSW": "golden-state-warriors",
-        "LAL": "los-angeles-lakers",
-        "LAC": "los-angeles-clippers",
-        "PHO": "phoenix-suns",
-        "SAC": "sacramento-kings",
-        # ------------------------------------------------------
-        # Eastern Conference:
-        # -
-        # Atlantic Division:
-        "BOS": "boston-celtics",
-        "PHI": "philadelphia-76ers",
-        "TOR": "toronto-raptors",
-        "NYK": "new-york-knicks",
-        "BRK": "brooklyn-nets",
-        # Central Division:
-        "MIL": "milwaukee-bucks",
-        "CLE": "cleveland-cavaliers",
-        "CHI": "chicago-bulls",
-        "DET": "detroit-pistons",
-        "IND": "indiana-pacers",
-        # Southeast Division:
-        "MIA": "miami-heat",
-        "ATL": "atlanta-hawks",
-        "WAS": "washington-wizards",
-        "CHO": "charlotte-hornets",
-        "ORL": "orlando-magic"
-    }
+@timed("parse")
+def extract_all_ovrs(html):
+    """
+    Return {season end year: top 10 OVRs} for every 2K year on a team page. Each year is an
+    <h5 id="nav-2kNN-tab"> followed by its roster table; the page is parsed once, keeping only
+    those headings and tables.
+    """
+    soup = make_soup(html, SoupStrainer(['h5', 'table']))
+    ovrs_by_year = {}
+    for nav in soup.find_all('h5', id=NAV_ID_RE):
+        table = nav.find_next('table')
+        if table:
+            year = 2000 + int(NAV_ID_RE.match(nav['id']).group(1))
+            ovrs_by_year[year] = parse_ovr_table(table)
+    return ovrs_by_year
 
+def get_all_top_10_ovrs(team_slug, scraper, season=None):
+    """
+    Fetch a team page once and return the top 10 OVRs of every 2K year on it. `season` is the
+    latest year needed from the page: a cached copy fetched after that season ended is used as is.
+    Returns {} if the page couldn't be loaded (e.g. a 403 or a Cloudflare challenge).
+    """
+    url = sites.url("2kratings", f"/teams/{team_slug}")
+    print(f"Fetching URL: {url}")
+
+    try:
+        # Takes its slot from the shared per-host scheduler, which cached pages skip.
+        html = cached_get(url, scraper.get, season, scheduler=asyncfetch.rate_scheduler)
+    except Exception as e:
+        print(f"⚠️ Could not load {url}: {e}")
+        return {}
+    ovrs_by_year = extract_all_ovrs(html)
+    print(f"Found 2K years for {team_slug}: {sorted(ovrs_by_year)}")
+    return ovrs_by_year
+
+def get_top_10_ovrs(team_slug, season_label, scraper=None):
+    year = int(season_label.split('-')[1])
+    ovrs_by_year = get_all_top_10_ovrs(team_slug, scraper or cloudscraper.create_scraper(), year)
+    if year not in ovrs_by_year:
+        print(f"Could not find nav section ID nav-2k{str(year)[-2:]}-tab in {team_slug}")
+        return [None] * 10
+    print(f"Found OVRs for {team_slug}: {ovrs_by_year[year]}")
+    return ovrs_by_year[year]
+
+def write_ovr_csvs(years=None):
+    """
+    Write top_10_ovrs_{year}.csv for every 2K year found on the team pages (or only `years`).
+    Each team page already holds every year, so this is 30 fetches in total over one scraper session.
+    """
+    scraper = cloudscraper.create_scraper()
     fieldnames = ['team', 'season'] + [f'player_{i+1}' for i in range(10)]
-    all_data = []
+    rows_by_year = {}
 
+    stats.expect_teams(len(team_slug_map))
     for abbr, slug in team_slug_map.items():
-        season_label = f"{year - 1}-{year}"
-        print(f"\nScraping {abbr} for {season_label}...")
-        ovrs = get_top_10_ovrs(slug, season_label)
-        row = {'team': abbr, 'season': year}  # Use END year of season
-        for i in range(10):
-            row[f'player_{i+1}'] = ovrs[i]
-        all_data.append(row)
-        time.sleep(1)
+        print(f"\nScraping {abbr}...")
+        stats.start_team(abbr)
+        ovrs_by_year = get_all_top_10_ovrs(slug, scraper, max(years) if years else None)
+        for year, ovrs in ovrs_by_year.items():
+            if years is not None and year not in years:
+                continue
+            row = {'team': abbr, 'season': year}  # Use END year of season
+            for i in range(10):
+                row[f'player_{i+1}'] = ovrs[i]
+            rows_by_year.setdefault(year, []).append(row)
+        stats.finish_team(abbr)
 
-    with open(f"top_10_ovrs_{year}.csv", mode='w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in all_data:
-            writer.writerow(row)
+    for year in sorted(set(rows_by_year) | set(years or ())):
+        # A team whose page failed to load or has no section for the year still gets a row, of None OVRs.
+        found = {row['team']: row for row in rows_by_year.get(year, [])}
+        with open(f"top_10_ovrs_{year}.csv", mode='w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for abbr in team_slug_map:
+                writer.writerow(found.get(abbr) or {'team': abbr, 'season': year,
+                                                     **{f'player_{i+1}': None for i in range(10)}})
+        print(f"Wrote top_10_ovrs_{year}.csv")
+
+def write_ovr_csv(year):
+    write_ovr_csvs([year])
 
-write_ovr_csv(2015) # Change this to the desired season as needed
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape every team's top 10 2K ratings for every 2K year.")
+    parser.add_argument("--report", default=REPORT_PATH,
+                        help=f"where to write the JSON run report (default: {REPORT_PATH})")
+    parser.add_argument("--progress", action="store_true", help="show a live progress/ETA line on stderr")
+    args = parser.parse_args()
+    stats.reset("topten2kratingscraper.py", live=args.progress)
+    write_ovr_csvs() # Pass a list of years (e.g. [2015]) to only write some seasons
+    stats.write(args.report)
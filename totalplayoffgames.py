@@ -1,14 +1,21 @@
-import requests
-from bs4 import BeautifulSoup
-import time
+import asyncio
 import csv
+import argparse
+from bisect import bisect_left
+from contextlib import nullcontext
+from itertools import accumulate
+
+import sites
+from asyncfetch import FetchError, cached_session, safe_get
+from htmlparse import find_after, find_captioned_tables
+from journal import Journal
+from runstats import stats, timed
+from seasons import parse_season_range, season_label
 
 # ----------- Editable Field -----------
 input_season = 2015
 # --------------------------------------
 
-season_start_year = input_season - 1
-season = f"{season_start_year}-{str(input_season)[-2:]}"
 
 # NBA teams in Wikipedia URL format
 teams = [
@@ -35,55 +42,52 @@ headers = {
     'User-Agent': 'Mozilla/5.0'
 }
 
-def get_team_player_links(season, team):
-    url = f"https://en.wikipedia.org/wiki/{season}_{team}_season"
+# Upper bound on player pages being fetched at once. The per-host rate scheduler still decides
+# how fast requests actually go out to Wikipedia.
+MAX_CONCURRENT_REQUESTS = 8
+
+async def get_team_player_links(season, team, session):
+    url = sites.url("wikipedia", f"/wiki/{season}_{team}_season")
     print(f"\n🔍 Scraping: {url}")
 
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-    except Exception as e:
+    html = await safe_get(url, session)
+    if html is None:
         print(f"❌ Failed to load page: {url}")
         return []
+    return parse_team_player_links(html, season, team)
 
-    soup = BeautifulSoup(response.content, 'html.parser')
+@timed("parse")
+def parse_team_player_links(html, season, team):
+    """Return (name, Wikipedia URL) of every player in the roster table of a team's season page."""
     player_links = []
 
     season_dash = season.replace("-", "–")
     team_spaces = team.replace("_", " ")
     target_caption = f"{season_dash} {team_spaces} roster"
 
-    for caption in soup.find_all('caption'):
-        if target_caption in caption.text:
-            roster_table = caption.find_parent('table')
-            if roster_table:
-                for row in roster_table.find_all('tr')[1:]:
-                    cells = row.find_all('td')
-                    if len(cells) >= 3:
-                        player_tag = cells[2].find('a', href=True)
-                        if player_tag:
-                            name = player_tag.text.strip()
-                            link = f"https://en.wikipedia.org{player_tag['href']}"
-                            player_links.append((name, link))
+    for roster_table in find_captioned_tables(html, target_caption):
+        for row in roster_table.find_all('tr')[1:]:
+            cells = row.find_all('td')
+            if len(cells) >= 3:
+                player_tag = cells[2].find('a', href=True)
+                if player_tag:
+                    name = player_tag.text.strip()
+                    link = sites.url("wikipedia", player_tag['href'])
+                    player_links.append((name, link))
     return player_links
 
-def get_player_playoff_games(player_url, cutoff_year):
-    try:
-        response = requests.get(player_url, headers=headers)
-        response.raise_for_status()
-    except:
-        return 0
-
-    soup = BeautifulSoup(response.content, 'html.parser')
-    playoffs_heading = soup.find(id="Playoffs")
-    if not playoffs_heading:
-        return 0
+@timed("parse")
+def parse_playoff_games_by_year(html):
+    """
+    Return {season end year: playoff games played} from a player's Wikipedia Playoffs table, whose
+    Year column is the year the playoffs were played in (2016 for the 2015-16 season).
+    """
+    games_by_year = {}
 
-    table = playoffs_heading.find_next('table', class_='wikitable')
+    # Only the part of the page after the "Playoffs" heading is parsed.
+    table = find_after(html, "Playoffs", "table", {"class": "wikitable"})
     if not table:
-        return 0
-
-    total_gp = 0
+        return games_by_year
 
     for row in table.find_all('tr'):
         cells = row.find_all('td')
@@ -96,42 +100,131 @@ def get_player_playoff_games(player_url, cutoff_year):
         except ValueError:
             continue
 
-        if year >= cutoff_year:
-            continue
-
         try:
             gp = int(cells[2].text.strip().replace("*", "").replace("†", ""))
-            total_gp += gp
         except ValueError:
             continue
-
-    return total_gp
-
-# Main loop
-output_rows = []
-
-for team in teams:
-    player_links = get_team_player_links(season, team)
-    team_total = 0
-    player_data = []
-
-    for name, link in player_links:
-        gp = get_player_playoff_games(link, input_season)
-        team_total += gp
-        player_data.append((name, gp))
+        # Players traded mid-season have one row per team for the same year.
+        games_by_year[year] = games_by_year.get(year, 0) + gp
+
+    return games_by_year
+
+class PlayoffHistory:
+    """
+    A player's playoff games by year, stored once with cumulative sums so that
+    "games before season X" is a lookup for any cutoff instead of a fresh fetch and parse.
+    """
+
+    def __init__(self, games_by_year):
+        self.years = sorted(games_by_year)
+        self.cumulative = list(accumulate(games_by_year[year] for year in self.years))
+
+    def games_before(self, cutoff_year):
+        i = bisect_left(self.years, cutoff_year)
+        return self.cumulative[i - 1] if i else 0
+
+async def fetch_playoff_history(player_url, session, limiter=None, season=None):
+    async with limiter or nullcontext():
+        # A page that failed to load raises FetchError instead of counting as no playoff games.
+        html = await safe_get(player_url, session, season, raise_errors=True)
+    if html is None:
+        return PlayoffHistory({})
+    return PlayoffHistory(parse_playoff_games_by_year(html))
+
+async def get_player_playoff_history(player_url, session, histories=None, limiter=None, season=None):
+    """
+    Return the PlayoffHistory of a player. `histories` (url -> task) keeps one entry per player,
+    so a veteran who shows up on rosters in many seasons is fetched and parsed only once.
+    `season` is the latest season whose playoffs are needed from the page (see cachepolicy.py).
+    """
+    if histories is None:
+        return await fetch_playoff_history(player_url, session, limiter, season)
+    if player_url not in histories:
+        histories[player_url] = asyncio.ensure_future(fetch_playoff_history(player_url, session, limiter, season))
+    return await histories[player_url]
+
+async def get_player_playoff_games(player_url, cutoff_year, session, histories=None):
+    history = await get_player_playoff_history(player_url, session, histories, season=cutoff_year - 1)
+    return history.games_before(cutoff_year)
+
+JOURNAL_PATH = "team_playoff_experience.journal.jsonl"
+REPORT_PATH = "totalplayoffgames.report.json"
+
+async def get_team_total(input_season, team, session, journal, histories, limiter, history_season=None):
+    # Prefixed, so it can't collide with the VORP scraper's key for the team in a shared run.
+    team_key = f"playoffs {input_season} {team.replace('_', ' ')}"
+    stats.start_team(team_key)
+    player_links = await get_team_player_links(season_label(input_season), team, session)
+
+    async def player_games(name, link):
+        done = journal.get(input_season, team, name)
+        if done:
+            return done["gp"]
+        try:
+            history = await get_player_playoff_history(link, session, histories, limiter,
+                                                       history_season or input_season - 1)
+        except FetchError as e:
+            # Not journaled, so --resume fetches the player again instead of keeping 0 games.
+            print(f"⚠️ {name} counted as 0 playoff games, the page failed to load ({e}); rerun with --resume to retry")
+            return 0
+        gp = history.games_before(input_season)
+        journal.append({"season": input_season, "team": team, "player": name, "url": link, "gp": gp})
+        return gp
+
+    games = await asyncio.gather(*(player_games(name, link) for name, link in player_links))
+    for (name, link), gp in zip(player_links, games):
         print(f"{name}: {gp} playoff games")
-        time.sleep(0.5)
-
-    print(f"\n🧍 Total players: {len(player_data)}")
-    print(f"📊 {team.replace('_', ' ')} total playoff games: {team_total}\n")
-
-    output_rows.append([team.replace("_", " "), input_season, team_total])
-
-# Write to CSV
-csv_filename = f"team_playoff_experience_{input_season}.csv"
-with open(csv_filename, mode='w', newline='', encoding='utf-8') as file:
-    writer = csv.writer(file)
-    writer.writerow(["Team", "Season", "Total Playoff Games"])
-    writer.writerows(output_rows)
 
-print(f"✅ CSV file saved as: {csv_filename}")
\ No newline at end of file
+    team_total = sum(games)
+    print(f"\n🧍 Total players: {len(player_links)}")
+    print(f"📊 {team.replace('_', ' ')} {input_season} total playoff games: {team_total}\n")
+    stats.finish_team(team_key)
+    return team_total
+
+async def main(seasons=(input_season,), resume=False, report_path=REPORT_PATH, progress=False):
+    # With report_path=None the caller (e.g. build_dataset.py) owns the run report.
+    if report_path:
+        stats.reset("totalplayoffgames.py", live=progress)
+    stats.expect_teams(len(seasons) * len(teams))
+    # Every player is journaled as soon as their games are counted, so an interrupted run can
+    # continue with --resume instead of starting from scratch.
+    journal = Journal(JOURNAL_PATH, ("season", "team", "player"), resume=resume)
+    limiter = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    # One playoff history per unique player, shared by every season in the run. Each season counts
+    # the playoffs before it, so a cached page has to be current up to the latest season's previous one.
+    histories = {}
+    history_season = max(seasons) - 1
+
+    # All teams are scraped concurrently over one pooled, keep-alive session on the shared page cache.
+    async with cached_session(headers=headers, max_connections=MAX_CONCURRENT_REQUESTS) as session:
+        totals = await asyncio.gather(*(get_team_total(year, team, session, journal, histories, limiter,
+                                                       history_season)
+                                        for year in seasons for team in teams))
+    journal.close()
+
+    totals = iter(totals)
+    for year in seasons:
+        output_rows = [[team.replace("_", " "), year, next(totals)] for team in teams]
+
+        # Write to CSV
+        csv_filename = f"team_playoff_experience_{year}.csv"
+        with open(csv_filename, mode='w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(["Team", "Season", "Total Playoff Games"])
+            writer.writerows(output_rows)
+
+        print(f"✅ CSV file saved as: {csv_filename}")
+    if report_path:
+        stats.write(report_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count every team's total playoff games of experience.")
+    parser.add_argument("--seasons", type=parse_season_range, default=[input_season],
+                        help=f"season end year or range of them, e.g. 2015 or 2014-2025 (default: {input_season})")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"skip players already recorded in {JOURNAL_PATH} by an interrupted run")
+    parser.add_argument("--report", default=REPORT_PATH,
+                        help=f"where to write the JSON run report (default: {REPORT_PATH})")
+    parser.add_argument("--progress", action="store_true", help="show a live progress/ETA line on stderr")
+    args = parser.parse_args()
+    asyncio.run(main(seasons=args.seasons, resume=args.resume, report_path=args.report, progress=args.progress))
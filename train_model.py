@@ -0,0 +1,187 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import randint, uniform
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+import datastore
+
+# The model from BBallPredictionModel.ipynb as an importable module, evaluated with
+# leave-one-season-out cross-validation: every scored season is held out once and predicted by a
+# model trained on all the others.
+#   python train_model.py                          # grid search over PARAM_GRID
+#   python train_model.py --search random --n-iter 200
+# Every (candidate, held-out season) fit runs on a process pool, and each forest gets its share of
+# the cores through n_jobs.
+
+FEATURE_COLS = [
+    'seed', 'win_pct', 'off_rtg', 'def_rtg', 'net_rtg', 'srs', 'total_playoff_games',
+    'player1vorp', 'player2vorp', 'player3vorp', 'player4vorp', 'player5vorp',
+    'player6vorp', 'player7vorp', 'player8vorp', 'player9vorp'
+]
+TARGET = 'champ_scr'
+
+# The notebook's model.
+BASELINE_PARAMS = {"n_estimators": 100, "random_state": 42}
+
+PARAM_GRID = {
+    "n_estimators": [100, 300],
+    "max_depth": [None, 4, 8],
+    "min_samples_leaf": [1, 3, 5],
+    "max_features": [1.0, 0.5, "sqrt"],
+}
+
+PARAM_DISTRIBUTIONS = {
+    "n_estimators": randint(50, 500),
+    "max_depth": [None, 3, 4, 6, 8, 12],
+    "min_samples_leaf": randint(1, 10),
+    "max_features": uniform(0.2, 0.8),
+}
+
+METRICS_PATH = "loso_metrics.csv"
+
+
+def load_training_data(seasons=None):
+    """
+    The model's columns for every season with championship scores (i.e. finished seasons).
+    Teams without a score in a finished season scored 0.
+    """
+    df = datastore.load('merged', columns=['team', 'season', TARGET] + FEATURE_COLS, seasons=seasons)
+    scored = df.groupby('season')[TARGET].transform(lambda scores: scores.notna().any())
+    df = df[scored].reset_index(drop=True)
+    df[TARGET] = df[TARGET].fillna(0)
+    return df
+
+
+def make_model(params=BASELINE_PARAMS, n_jobs=1):
+    """StandardScaler + RandomForestRegressor, as fitted in the notebook."""
+    params = {"random_state": 42, **params, "n_jobs": n_jobs}
+    return make_pipeline(StandardScaler(), RandomForestRegressor(**params))
+
+
+def train(df=None, params=BASELINE_PARAMS, n_jobs=-1):
+    """Fit the model on every season of `df` (default: all finished seasons)."""
+    df = load_training_data() if df is None else df
+    return make_model(params, n_jobs).fit(df[FEATURE_COLS], df[TARGET])
+
+
+def season_metrics(season, teams, y_true, y_pred):
+    """Errors on one held-out season, plus where the model ranked that season's champion."""
+    order = np.argsort(-y_pred)
+    champion = int(np.argmax(y_true))
+    return {
+        "season": season,
+        "rmse": mean_squared_error(y_true, y_pred) ** 0.5,
+        "r2": r2_score(y_true, y_pred),
+        "champion": teams[champion],
+        "champion_rank": int(np.flatnonzero(order == champion)[0]) + 1,
+        "predicted_champion": teams[order[0]],
+    }
+
+
+# Each pool process receives the training data once, through the initializer, instead of with every task.
+_data = None
+
+
+def _init_worker(df):
+    global _data
+    _data = df
+
+
+def evaluate_fold(candidate, params, season, n_jobs=1):
+    """Train without `season`, then score it. Runs in a pool process."""
+    train_df = _data[_data['season'] != season]
+    test_df = _data[_data['season'] == season]
+    model = make_model(params, n_jobs).fit(train_df[FEATURE_COLS], train_df[TARGET])
+    metrics = season_metrics(season, test_df['team'].tolist(), test_df[TARGET].to_numpy(),
+                             model.predict(test_df[FEATURE_COLS]))
+    metrics["candidate"] = candidate
+    return metrics
+
+
+def candidate_params(strategy="grid", n_iter=50, random_state=42):
+    """The hyperparameter sets to evaluate: all of PARAM_GRID, or `n_iter` draws from PARAM_DISTRIBUTIONS."""
+    if strategy == "grid":
+        return list(ParameterGrid(PARAM_GRID))
+    return [{name: value.item() if isinstance(value, np.generic) else value for name, value in params.items()}
+            for params in ParameterSampler(PARAM_DISTRIBUTIONS, n_iter, random_state=random_state)]
+
+
+def cross_validate(df, candidates, workers=None, n_jobs=None):
+    """
+    Leave-one-season-out cross-validation of every candidate. Returns one row of metrics per
+    (candidate, season). Fits are spread over `workers` processes (default: one per core), and each
+    forest uses `n_jobs` threads (default: the cores left per worker), so the two don't oversubscribe.
+    """
+    cores = os.cpu_count() or 1
+    workers = workers or cores
+    n_jobs = n_jobs or max(1, cores // workers)
+    seasons = sorted(df['season'].unique().tolist())
+    tasks = [(candidate, params, season) for candidate, params in enumerate(candidates) for season in seasons]
+    print(f"🏀 {len(candidates)} candidates x {len(seasons)} seasons = {len(tasks)} fits "
+          f"on {workers} workers x {n_jobs} threads")
+
+    if workers == 1:
+        _init_worker(df)
+        results = [evaluate_fold(*task, n_jobs) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(df,)) as pool:
+            results = list(pool.map(evaluate_fold, *zip(*tasks), [n_jobs] * len(tasks),
+                                    chunksize=max(1, len(tasks) // (workers * 4))))
+    return pd.DataFrame(results)
+
+
+def summarize(metrics, candidates):
+    """One row per candidate, best (lowest mean held-out RMSE) first."""
+    summary = metrics.groupby('candidate').agg(
+        rmse=('rmse', 'mean'), r2=('r2', 'mean'), champion_rank=('champion_rank', 'mean'),
+        champions_picked=('champion_rank', lambda ranks: int((ranks == 1).sum())))
+    summary['params'] = [candidates[candidate] for candidate in summary.index]
+    return summary.sort_values('rmse')
+
+
+def search(df=None, strategy="grid", n_iter=50, workers=None, n_jobs=None):
+    """Run the hyperparameter search. Returns (per-season metrics, per-candidate summary, candidates)."""
+    df = load_training_data() if df is None else df
+    candidates = candidate_params(strategy, n_iter)
+    metrics = cross_validate(df, candidates, workers, n_jobs)
+    return metrics, summarize(metrics, candidates), candidates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Leave-one-season-out hyperparameter search for the title model.")
+    parser.add_argument("--search", choices=["grid", "random", "baseline"], default="grid",
+                        help="grid: all of PARAM_GRID (default); random: --n-iter draws from PARAM_DISTRIBUTIONS; "
+                             "baseline: only the notebook's model")
+    parser.add_argument("--n-iter", type=int, default=50, help="candidates drawn by --search random (default: 50)")
+    parser.add_argument("--workers", type=int, help="processes fitting folds (default: one per core)")
+    parser.add_argument("--n-jobs", type=int, help="threads per forest (default: cores / workers)")
+    parser.add_argument("--output", default=METRICS_PATH,
+                        help=f"CSV of every candidate's per-season metrics (default: {METRICS_PATH})")
+    args = parser.parse_args()
+
+    df = load_training_data()
+    if args.search == "baseline":
+        candidates = [BASELINE_PARAMS]
+        metrics = cross_validate(df, candidates, args.workers, args.n_jobs)
+        summary = summarize(metrics, candidates)
+    else:
+        metrics, summary, candidates = search(df, strategy=args.search, n_iter=args.n_iter,
+                                                 workers=args.workers, n_jobs=args.n_jobs)
+    metrics.to_csv(args.output, index=False)
+
+    pd.set_option("display.width", 200)
+    pd.set_option("display.max_colwidth", 120)
+    print("\n📊 Top candidates (mean over held-out seasons):")
+    print(summary.head(10).to_string())
+    best = summary.index[0]
+    print(f"\n🏆 Best candidate {best}: {candidates[best]}")
+    print(metrics[metrics['candidate'] == best].drop(columns='candidate').to_string(index=False))
+    print(f"\n✅ Per-season metrics of all {len(candidates)} candidates written to {args.output}")